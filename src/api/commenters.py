@@ -1,22 +1,76 @@
-import json
-from fastapi import HTTPException
+import asyncio
+import weakref
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Optional
 from datetime import datetime
-from src.core.language_detector import LanguageDetector, Language
-from src.dto.commenters import CommentResponse, CommentRequest, GenerateRequest, GenerateResponse, Message, Choice
+from src.dto.commenters import (
+    CommentRequest, ExtractResponse, GenerateRequest, GenerateResponse, Message, Choice,
+    IncrementalExtractRequest, ChunkChoice, Delta, GenerateChunk,
+)
 
 from src.core.language_detector import LanguageDetector, Language
 from src.core.parser_factory import ParserFactory
+from src.core.admission import AdmissionController, AdmissionRejectedError, parse_priority
+from src.core.llm_client import LLMClient
+from src.core.comment_cache import CommentCache, comment_key
+from src.core.generation_batcher import GenerationBatcher, GenerationQueueFullError
+from src.core.parse_cache import ParseCache
+from src.core.parse_executor import ParseExecutor
+from src.core.archive_reader import (
+    ARCHIVE_FORMATS, ArchiveError, EntryFilter, UnsupportedArchiveError,
+    iter_archive, iter_spooled, spool_stream,
+)
+from src.core.response_formats import COLUMNAR_MEDIA_TYPES, NotAcceptableError, ResponseEncoder, dumps, negotiate
+from src.config import ArchiveConfig, ResponseConfig
 import httpx
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request
+from fastapi import File, UploadFile, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from src.api.base import BaseRoutes
-from src.models.function_description import FunctionDescription
-from src.utils.logger import SimpleLogger
+from src.models.function_description import FIELD_NAMES, FunctionDescription, to_normalized
+from src.parsers.base_parser import BaseParser
+from src.utils.logger import SimpleLogger, process_logger
 from src.utils.prompt_extractor import PromptExtractorService
+from src.utils.text_edit import DiffError, apply_unified_diff
+
+FIELDS_DESCRIPTION = (
+    "Поля описаний функций, которые нужно вернуть (можно повторять параметр или перечислять "
+    "через запятую); остальные поля не возвращаются, а отложенные из них (тексты, docstring, "
+    "сигнатуры) и не вычисляются. По умолчанию — все"
+)
+SHAPES = ("flat", "normalized")
+SHAPE_DESCRIPTION = (
+    "flat — у каждой функции свои class_name/class_description/namespace; normalized — таблица "
+    "scopes файла (классы и пространства имён), на которую функции ссылаются по class_id/namespace_id. "
+    "Колоночные форматы (Arrow, Parquet) всегда плоские"
+)
+
 
 class CommentersRoutes(BaseRoutes):
     """Маршруты генерации комментариев."""
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(
+        self,
+        logging_service: SimpleLogger,
+        llm_client: LLMClient,
+        parse_executor: ParseExecutor,
+        parse_cache: ParseCache,
+        parser_factory: Optional[ParserFactory] = None,
+        archive_config: Optional[ArchiveConfig] = None,
+        response_config: Optional[ResponseConfig] = None,
+        comment_cache: Optional[CommentCache] = None,
+        generation_batcher: Optional[GenerationBatcher] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        super().__init__(logging_service)
+        self.llm_client = llm_client
+        self.parse_executor = parse_executor
+        self.parse_cache = parse_cache
+        self.parser_factory = parser_factory or parse_executor.parser_factory
+        self.detector = LanguageDetector()
+        self.archive_config = archive_config or ArchiveConfig()
+        self.encoder = ResponseEncoder(response_config)
+        self.comment_cache = comment_cache or CommentCache()
+        # Не запущенный планировщик (start не вызывался) передаёт запросы в llm_client напрямую
+        self.generation_batcher = generation_batcher or GenerationBatcher(llm_client)
+        self.admission = admission or AdmissionController()
         self._setup_routes()
 
     def _setup_routes(self):
@@ -33,20 +87,44 @@ class CommentersRoutes(BaseRoutes):
             "/extract",
             self.extract,
             methods=["POST"],
-            response_model=CommentResponse,
+            response_model=ExtractResponse,
             summary="Генерация комментария к функциям из файла",
             description="Генерирует текст на основе файла с кодом"
         )
 
-    async def prompt(self, request: Request, req: GenerateRequest) -> GenerateResponse:
-        detector = LanguageDetector()
-        factory = ParserFactory()
+        self.router.add_api_route(
+            "/extract/incremental",
+            self.extract_incremental,
+            methods=["POST"],
+            response_model=ExtractResponse,
+            summary="Повторное извлечение функций после правки файла",
+            description="Принимает content_hash базовой версии и unified diff (или новое содержимое); "
+                        "заново разбирается только затронутый правкой участок"
+        )
+
+        self.router.add_api_route(
+            "/extract/archive",
+            self.extract_archive,
+            methods=["POST"],
+            response_model=ExtractResponse,
+            summary="Извлечение функций из архива репозитория",
+            description="Принимает .zip/.tar.gz/.tar.zst в теле запроса и разбирает файлы по мере чтения"
+        )
+
+    async def prompt(self, request: Request, req: GenerateRequest, response: Response) -> GenerateResponse:
+        detector = self.detector
+        factory = self.parser_factory
         prompt_extractor = PromptExtractorService()
         
         request_id : str = f"frogcom-{datetime.now().timestamp()}"
 
+        read_cache, write_cache = _cache_control(request.headers.get("cache-control"))
+        try:
+            priority = parse_priority(request.headers.get(PRIORITY_HEADER))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         data = req.model_dump(exclude_unset=True)
-        print(data)
+        process_logger.debug("Prompt request: %s", data)
         try:
             prompt = prompt_extractor.extract_prompt(data)
         except Exception as e:
@@ -56,7 +134,7 @@ class CommentersRoutes(BaseRoutes):
         if not prompt.strip():
             raise HTTPException(status_code=400, detail="Не предоставлен промпт")
 
-        print(prompt)
+        process_logger.debug("Prompt: %s", prompt)
 
         # Парсим .prompt на задачу и функцию.   
         try:
@@ -95,7 +173,7 @@ class CommentersRoutes(BaseRoutes):
                 language_parser = factory.get_parser(language)
             except NotImplementedError as e:
                 raise HTTPException(status_code=501, detail=str(e))
-            functions = language_parser.parse_content(code)
+            functions = await self._parse(language, language_parser, code)
             if len(functions) != 1:
                 error = "Неправильно распаршенный код"
                 self.logging_service.log_error(error, context={
@@ -121,21 +199,28 @@ class CommentersRoutes(BaseRoutes):
             function=str(function)
         )
 
-        try:
-            async def generate_comment(request : CommentRequest) -> dict:
-                BACKEND_URL = "http://localhost:8888"
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{BACKEND_URL}/generate",
-                        json=request.model_dump(),
-                        timeout=600
-                    )
-                    response.raise_for_status()
-                    return response.json()
+        # Ключ — по задаче и коду без комментариев и разницы в пробелах
+        key = comment_key(prompt_task, str(code), language, self.comment_cache.config.version)
+        if req.stream:
+            return await self._stream_prompt(request_id, request, key, read_cache, write_cache, priority)
+
+        async def generate() -> dict:
+            # Место занимает только вызов бэкенда: ответы из кеша лимит не расходуют
+            async with self.admission.admit(priority):
+                return await self.generation_batcher.generate(request)
 
-            llm_response: dict = await generate_comment(request)
+        try:
+            # Отказ в допуске зависит от приоритета начавшего вызов: ждавшие его пробуют сами
+            llm_response, cache_status = await self.comment_cache.get_or_generate(
+                key, generate, read=read_cache, write=write_cache, retry_errors=(AdmissionRejectedError,),
+            )
+        except AdmissionRejectedError as e:
+            raise _too_many_requests(e)
         except httpx.HTTPError as e:
             raise HTTPException(status_code=503, detail=f"LLM Service unavailable: {e}")
+        except GenerationQueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        response.headers[CACHE_STATUS_HEADER] = cache_status
         
         # Add merge comment and code
         #answer = f"{llm_response.comment}\n{request.code}"
@@ -157,31 +242,413 @@ class CommentersRoutes(BaseRoutes):
 
         return final_response
 
-    async def extract(self, files: list[UploadFile] = File(...)) -> CommentResponse:
-        detector = LanguageDetector()
-        factory = ParserFactory()
+    async def _stream_prompt(
+        self,
+        request_id: str,
+        request: CommentRequest,
+        key: str,
+        read_cache: bool,
+        write_cache: bool,
+        priority: int,
+    ) -> StreamingResponse:
+        """
+        Ответ /prompt по мере генерации: SSE-события data: с фрагментами GenerateChunk, затем [DONE].
+        Ответ начинается с первым фрагментом от бэкенда, поэтому недоступный бэкенд — по-прежнему 503.
+        Ответ из кеша отдаётся одним фрагментом; полностью полученный от бэкенда — сохраняется в кеш.
+        Генерация занимает место в admission до конца потока.
+        """
+        cached = await self.comment_cache.get(key) if read_cache else None
+        ticket = None
+        if cached is not None:
+            cache_status = "hit"
+            chunks = _replay(cached["comment"])
+        else:
+            cache_status = "miss" if write_cache and self.comment_cache.config.enabled else "bypass"
+            try:
+                ticket = await self.admission.acquire(priority)
+            except AdmissionRejectedError as e:
+                raise _too_many_requests(e)
+            chunks = self.llm_client.generate_stream(request)
+        try:
+            first: Optional[str] = await anext(chunks)
+        except StopAsyncIteration:
+            first = None
+        except httpx.HTTPError as e:
+            if ticket is not None:
+                ticket.release(False)
+            raise HTTPException(status_code=503, detail=f"LLM Service unavailable: {e}")
+        except BaseException:
+            if ticket is not None:
+                ticket.release(None)
+            raise
+
+        created = int(datetime.now().timestamp())
+
+        def event(delta: Delta, finish_reason: Optional[str] = None) -> bytes:
+            chunk = GenerateChunk(
+                id=request_id,
+                created=created,
+                model="frogcom",
+                choices=[ChunkChoice(index=0, delta=delta, finish_reason=finish_reason)],
+            )
+            return b"data: " + chunk.model_dump_json().encode("utf-8") + b"\n\n"
+
+        async def events() -> AsyncIterator[bytes]:
+            # Отключение клиента отменяет этот генератор, а aclose в finally закрывает запрос к бэкенду
+            finish_reason = "Generation success."
+            parts = [first or ""]
+            try:
+                yield event(Delta(role="assistant", content=first or ""))
+                async for text in chunks:
+                    parts.append(text)
+                    yield event(Delta(content=text))
+            except httpx.HTTPError as e:
+                self.logging_service.log_exception(e, context={"request_id": request_id})
+                finish_reason = "error"
+            finally:
+                await chunks.aclose()
+                if ticket is not None:
+                    ticket.release(finish_reason != "error")
+            if cache_status == "miss" and finish_reason != "error":
+                await self.comment_cache.put(key, {"comment": "".join(parts)})
+            yield event(Delta(), finish_reason)
+            yield b"data: [DONE]\n\n"
+
+        body = events()
+        if ticket is not None:
+            # Поток, который так и не начали читать (клиент отключился сразу), тоже освобождает место
+            weakref.finalize(body, ticket.release, None).atexit = False
+        return StreamingResponse(
+            body,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", CACHE_STATUS_HEADER: cache_status},
+        )
+
+    async def extract(
+        self,
+        request: Request,
+        files: list[UploadFile] = File(...),
+        stream: bool = Query(False, description="Отдавать результаты построчно (NDJSON) по мере готовности"),
+        fields: Optional[list[str]] = Query(None, description=FIELDS_DESCRIPTION),
+        shape: str = Query("flat", description=SHAPE_DESCRIPTION),
+    ) -> ExtractResponse:
+        detector = self.detector
+        factory = self.parser_factory
+        selected = _requested_fields(fields)
+        _check_shape(shape)
+        as_stream = stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+        media_type = None if as_stream else _media_type(request)
+        if media_type in COLUMNAR_MEDIA_TYPES:
+            shape = "flat"
+
+        async def sources() -> AsyncIterator[tuple[str, Callable[[], Awaitable[bytes]]]]:
+            for f in files:
+                yield f.filename, f.read
+
+        records = self._extract_many(
+            sources(), detector, factory, keep_sources=True, fields=selected, shape=shape
+        )
+
+        if as_stream:
+            return StreamingResponse(_ndjson(records), media_type=NDJSON_MEDIA_TYPE)
 
-        results = []
-        for f in files:
-            language = detector.detect_language(f.filename)
-            if language is None:
-                results.append({"file": f.filename, "error": "Unsupported file extension"})
-                continue
+        indexed = [item async for item in records]
+        indexed.sort(key=lambda item: item[0])
+        return self._response(request, media_type, [record for _, record in indexed])
 
+    async def extract_incremental(self, request: Request, req: IncrementalExtractRequest) -> ExtractResponse:
+        """
+        Новая версия файла — base_hash + diff или новое содержимое. Если результат базовой версии
+        есть в кеше, парсер переиспользует его и разбирает заново только затронутый правкой участок;
+        иначе файл разбирается целиком. mode в записи: cached | incremental | full.
+        """
+        media_type = _media_type(request)
+        shape = "flat" if media_type in COLUMNAR_MEDIA_TYPES else req.shape
+        language = self.detector.detect_language(req.file)
+        if language is None:
+            raise HTTPException(status_code=400, detail="Unsupported file extension")
+        try:
+            parser = self.parser_factory.get_parser(language)
+        except NotImplementedError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+        base = await self.parse_cache.get_source(req.base_hash)
+        if req.diff is not None:
+            if base is None:
+                raise HTTPException(status_code=409, detail="Base version is not cached, send the full content")
             try:
-                parser = factory.get_parser(language)
-            except NotImplementedError as e:
-                results.append({"file": f.filename, "error": str(e)})
-                continue
+                content = apply_unified_diff(base, req.diff)
+            except DiffError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+        else:
+            content = req.content
+
+        record = {"file": req.file, "language": language.value, "content_hash": ParseCache.content_hash(content)}
+        try:
+            functions = await self.parse_cache.get(language, parser.VERSION, content)
+            mode = "cached"
+            if functions is None:
+                base_functions = None
+                if base is not None:
+                    base_functions = await self.parse_cache.get(language, parser.VERSION, base)
+                if base_functions is not None:
+                    functions = await self.parse_executor.reparse(language, base, base_functions, content)
+                    mode = "incremental"
+                else:
+                    functions = await self.parse_executor.parse(language, content)
+                    mode = "full"
+                await self.parse_cache.put(language, parser.VERSION, content, functions)
+            await self.parse_cache.put_source(content)
+        except Exception as e:
+            self.logging_service.log_exception(e, context={"file": req.file, "language": language.value})
+            return self._response(request, media_type, [{**record, "error": f"Parse error: {e}"}])
+
+        return self._response(request, media_type, [{
+            **record,
+            "base_hash": req.base_hash,
+            "mode": mode,
+            **_functions_record(functions, None, shape),
+        }])
+
+    async def extract_archive(
+        self,
+        request: Request,
+        include: Optional[list[str]] = Query(None, description="Glob-шаблоны путей, которые нужно разобрать"),
+        exclude: Optional[list[str]] = Query(None, description="Glob-шаблоны путей, которые нужно пропустить"),
+        max_entry_bytes: Optional[int] = Query(None, ge=1, description="Лимит размера одного файла"),
+        archive_format: Optional[str] = Query(None, alias="format", description="zip | tar | tar.gz | tar.zst"),
+        stream: bool = Query(False, description="Отдавать результаты построчно (NDJSON) по мере готовности"),
+        fields: Optional[list[str]] = Query(None, description=FIELDS_DESCRIPTION),
+        shape: str = Query("flat", description=SHAPE_DESCRIPTION),
+    ) -> ExtractResponse:
+        if archive_format is not None and archive_format not in ARCHIVE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported archive format '{archive_format}'")
+        selected = _requested_fields(fields)
+        _check_shape(shape)
+        as_stream = stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+        media_type = None if as_stream else _media_type(request)
+        if media_type in COLUMNAR_MEDIA_TYPES:
+            shape = "flat"
+
+        detector = self.detector
+        factory = self.parser_factory
+        cfg = self.archive_config
+        entry_filter = EntryFilter(
+            include=include or [],
+            exclude=(exclude or []) + cfg.default_exclude,
+            max_entry_bytes=min(max_entry_bytes or cfg.max_entry_bytes, cfg.max_entry_bytes),
+            # Файлы без парсера пропускаем до распаковки, а не после
+            accept_name=lambda name: detector.detect_language(name) is not None,
+        )
+
+        body: AsyncIterator[bytes] = request.stream()
+        if as_stream:
+            # StreamingResponse слушает receive() ради disconnect, поэтому тело
+            # запроса нельзя дочитывать после начала ответа: сначала буферизуем
+            try:
+                spool = await spool_stream(body, cfg.max_archive_bytes, cfg.spool_max_memory)
+            except ArchiveError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            body = iter_spooled(spool)
+
+        async def sources() -> AsyncIterator[tuple[str, Callable[[], Awaitable[bytes]]]]:
+            entries = iter_archive(
+                body,
+                entry_filter,
+                archive_format=archive_format,
+                max_archive_bytes=cfg.max_archive_bytes,
+                spool_max_memory=cfg.spool_max_memory,
+            )
+            async for entry in entries:
+                yield entry.name, entry.read
+
+        records = self._extract_many(sources(), detector, factory, fields=selected, shape=shape)
+
+        if as_stream:
+            return StreamingResponse(_archive_ndjson(records), media_type=NDJSON_MEDIA_TYPE)
+
+        try:
+            indexed = [item async for item in records]
+        except UnsupportedArchiveError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        except ArchiveError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        indexed.sort(key=lambda item: item[0])
+        return self._response(request, media_type, [record for _, record in indexed])
+
+    def _response(self, request: Request, media_type: str, results: list[dict]) -> Response:
+        """Ответ в формате media_type, сжатый по Accept-Encoding; модель ExtractResponse не строится."""
+        return self.encoder.response(media_type, results, request.headers.get("accept-encoding"))
+
+    async def _extract_many(
+        self,
+        sources: AsyncIterable[tuple[str, Callable[[], Awaitable[bytes]]]],
+        detector: LanguageDetector,
+        factory: ParserFactory,
+        keep_sources: bool = False,
+        fields: Optional[list[str]] = None,
+        shape: str = "flat",
+    ) -> AsyncIterator[tuple[int, dict]]:
+        """
+        Обрабатывает файлы параллельно и отдаёт (порядковый номер, запись) по мере готовности.
+        Следующий файл не читается, пока все слоты исполнителя заняты, поэтому
+        в памяти одновременно находится ограниченное число файлов.
+        keep_sources: сохранить исходники в кеше как базы для /extract/incremental.
+        fields: только эти поля описаний функций, None — все; shape — форма записи (SHAPES).
+        """
+        slots = asyncio.Semaphore(self.parse_executor.concurrency)
+        pending: set[asyncio.Task] = set()
+
+        async def run(index: int, name: str, read: Callable[[], Awaitable[bytes]]) -> tuple[int, dict]:
+            try:
+                return index, await self._extract_file(
+                    name, read, detector, factory, keep_sources, fields, shape
+                )
+            finally:
+                slots.release()
+
+        try:
+            index = 0
+            async for name, read in sources:
+                await slots.acquire()
+                pending.add(asyncio.create_task(run(index, name, read)))
+                index += 1
+
+                finished = {task for task in pending if task.done()}
+                pending -= finished
+                for task in finished:
+                    yield task.result()
+
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    yield task.result()
+        finally:
+            # Клиент отключился или генератор закрыт: незавершённая работа не нужна
+            for task in pending:
+                task.cancel()
+
+    async def _extract_file(
+        self,
+        name: str,
+        read: Callable[[], Awaitable[bytes]],
+        detector: LanguageDetector,
+        factory: ParserFactory,
+        keep_source: bool = False,
+        fields: Optional[list[str]] = None,
+        shape: str = "flat",
+    ) -> dict:
+        """Извлечь функции из одного файла; ошибки возвращаются записью, а не исключением."""
+        language = detector.detect_language(name)
+        if language is None:
+            return {"file": name, "error": "Unsupported file extension"}
+
+        try:
+            parser = factory.get_parser(language)
+        except NotImplementedError as e:
+            return {"file": name, "error": str(e)}
+
+        try:
+            content = (await read()).decode("utf-8", errors="replace")
+        except ArchiveError as e:
+            return {"file": name, "language": language.value, "error": str(e)}
+
+        try:
+            functions = await self._parse(language, parser, content, fields)
+            if keep_source:
+                await self.parse_cache.put_source(content)
+        except Exception as e:
+            self.logging_service.log_exception(e, context={"file": name, "language": language.value})
+            return {"file": name, "language": language.value, "error": f"Parse error: {e}"}
+
+        return {
+            "file": name,
+            "language": language.value,
+            "content_hash": ParseCache.content_hash(content),
+            **_functions_record(functions, fields, shape),
+        }
+
+    async def _parse(
+        self, language: Language, parser: BaseParser, content: str, fields: Optional[list[str]] = None
+    ) -> list[FunctionDescription]:
+        """Распарсить содержимое через кеш и исполнитель парсинга; fields — проекция результата."""
+        functions = await self.parse_cache.get(language, parser.VERSION, content, fields)
+        if functions is None:
+            functions = await self.parse_executor.parse(language, content, fields)
+            await self.parse_cache.put(language, parser.VERSION, content, functions, fields)
+        return functions
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Откуда ответ /prompt: hit | miss | shared | bypass (CommentCache.get_or_generate)
+CACHE_STATUS_HEADER = "X-Cache"
+PRIORITY_HEADER = "X-Priority"
+
+
+def _too_many_requests(error: AdmissionRejectedError) -> HTTPException:
+    """429 с Retry-After: генерации сейчас не хватает места."""
+    return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
+
+def _cache_control(header: Optional[str]) -> tuple[bool, bool]:
+    """
+    Читать ли кеш ответов и сохранять ли в него по Cache-Control запроса:
+    no-cache — сгенерировать заново (и обновить кеш), no-store — мимо кеша совсем.
+    """
+    directives = {part.strip().lower() for part in (header or "").split(",")}
+    if "no-store" in directives:
+        return False, False
+    return "no-cache" not in directives, True
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    """Сохранённый комментарий как поток из одного фрагмента."""
+    yield text
+
+
+def _requested_fields(fields: Optional[list[str]]) -> Optional[list[str]]:
+    """Разобрать параметр fields: список имён полей FunctionDescription без повторов или None."""
+    if not fields:
+        return None
+    names = sorted({name.strip() for value in fields for name in value.split(",") if name.strip()})
+    unknown = [name for name in names if name not in FIELD_NAMES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names or None
+
+
+def _media_type(request: Request) -> str:
+    """Формат ответа по Accept; 406, если принимаются только недоступные форматы."""
+    try:
+        return negotiate(request.headers.get("accept"))
+    except NotAcceptableError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+
+def _check_shape(shape: str) -> None:
+    if shape not in SHAPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported response shape '{shape}'")
+
+
+def _functions_record(
+    functions: list[FunctionDescription], fields: Optional[list[str]], shape: str
+) -> dict:
+    """Число и описания функций файла в форме shape: плоские словари или scopes + functions."""
+    if shape == "normalized":
+        return {"count": len(functions), **to_normalized(functions, fields)}
+    return {"count": len(functions), "functions": [fd.to_dict(fields) for fd in functions]}
+
 
-            content = (await f.read()).decode("utf-8", errors="replace")
-            functions = parser.parse_content(content)
+async def _ndjson(records: AsyncIterable[tuple[int, dict]]) -> AsyncIterator[bytes]:
+    """Сериализует записи в NDJSON: одна JSON-строка на файл."""
+    async for _, record in records:
+        yield dumps(record) + b"\n"
 
-            results.append({
-                "file": f.filename,
-                "language": language.value,
-                "count": len(functions),
-                "functions": [fd.__dict__ for fd in functions],
-            })
 
-        return None
\ No newline at end of file
+async def _archive_ndjson(records: AsyncIterable[tuple[int, dict]]) -> AsyncIterator[bytes]:
+    """NDJSON для архива: ошибка чтения посреди потока становится последней записью."""
+    try:
+        async for chunk in _ndjson(records):
+            yield chunk
+    except ArchiveError as e:
+        yield dumps({"error": str(e)}) + b"\n"
@@ -1,15 +1,41 @@
 from datetime import datetime
+from typing import Optional
 from fastapi import HTTPException
 
+from src.core.admission import AdmissionController
 from src.core.language_detector import LanguageDetector
-from src.dto.health import HealthResponse, StatusResponse
+from src.core.comment_cache import CommentCache
+from src.core.generation_batcher import GenerationBatcher
+from src.core.llm_client import LLMClient
+from src.core.parse_cache import ParseCache
+from src.core.parse_executor import ParseExecutor
+from src.dto.health import (
+    HealthResponse, StatusResponse, LLMClientStats, ParseExecutorStats, ParseCacheStats, CommentCacheStats,
+    GenerationBatcherStats, AdmissionStats,
+)
 from src.api.base import BaseRoutes
+from src.utils.logger import SimpleLogger
 
 class HealthRoutes(BaseRoutes):
     """Маршруты проверки состояния сервиса."""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(
+        self,
+        logging_service: SimpleLogger,
+        llm_client: Optional[LLMClient] = None,
+        parse_executor: Optional[ParseExecutor] = None,
+        parse_cache: Optional[ParseCache] = None,
+        comment_cache: Optional[CommentCache] = None,
+        generation_batcher: Optional[GenerationBatcher] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        super().__init__(logging_service)
+        self.llm_client = llm_client
+        self.parse_executor = parse_executor
+        self.parse_cache = parse_cache
+        self.comment_cache = comment_cache
+        self.generation_batcher = generation_batcher
+        self.admission = admission
         self._setup_routes()
 
     def _setup_routes(self):
@@ -49,7 +75,17 @@ class HealthRoutes(BaseRoutes):
             return StatusResponse(
                 status="ok",
                 timestamp=datetime.now(),
-                supported_languages=[lang.value for lang in detector.supported_languages()]
+                supported_languages=[lang.value for lang in detector.supported_languages()],
+                llm_client=LLMClientStats(**self.llm_client.stats()) if self.llm_client else None,
+                parse_executor=(
+                    ParseExecutorStats(**self.parse_executor.stats()) if self.parse_executor else None
+                ),
+                parse_cache=ParseCacheStats(**self.parse_cache.stats()) if self.parse_cache else None,
+                comment_cache=CommentCacheStats(**self.comment_cache.stats()) if self.comment_cache else None,
+                generation_batcher=(
+                    GenerationBatcherStats(**self.generation_batcher.stats()) if self.generation_batcher else None
+                ),
+                admission=AdmissionStats(**self.admission.stats()) if self.admission else None,
             )
         except Exception as e:
             self.logging_service.log_error(e)
@@ -3,14 +3,228 @@ from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+@dataclass
+class LoggerConfig:
+    """Настройки одного логгера SimpleLogger (error_logger, process_logger)."""
+
+    file: Optional[str] = None                    # имя файла в log_dir; None — без файла
+    level: str = os.getenv("LOG_LEVEL", "DEBUG")  # записи ниже уровня даже не собираются
+    console: bool = True
+    debug_sample_rate: float = 1.0                # доля DEBUG-записей, попадающих в лог
+
+
 @dataclass
 class LoggingConfig:
     """Конфигурация системы логирования."""
     
-    log_dir: str = "logs"
-    log_file: str = "err.log"
+    log_dir: str = os.getenv("LOG_DIR", "logs")
+    error: LoggerConfig = field(default_factory=lambda: LoggerConfig(file="err.log"))
+    process: LoggerConfig = field(default_factory=lambda: LoggerConfig(file="process.log"))
+
+    # Записи пишет отдельный поток (QueueHandler/QueueListener): обработчик запроса
+    # только кладёт запись в очередь. При переполнении очереди записи отбрасываются.
+    queue_size: int = 10_000
+    # Крупные данные в записи обрезаются до сериализации
+    max_string_chars: int = 2000                  # длина строки
+    max_items: int = 50                           # элементов списка/словаря
     
     @property
     def log_file_path(self) -> Path:
-        """Полный путь к файлу логов."""
-        return Path(self.log_dir) / self.log_file
+        """Полный путь к файлу логов ошибок."""
+        return Path(self.log_dir) / self.error.file
+
+
+@dataclass
+class BackendPoolConfig:
+    """Балансировка между репликами LLM бэкенда, их проверка и дублирование медленных запросов."""
+
+    # Реплики бэкенда; пусто — одна реплика LLMClientConfig.base_url
+    urls: list[str] = field(default_factory=lambda: [
+        url.strip() for url in os.getenv("LLM_BACKEND_URLS", "").split(",") if url.strip()
+    ])
+
+    # Периодическая проверка реплик: GET health_path; ошибка соединения или 5xx — сбой
+    health_path: Optional[str] = "/health"  # None — без проверок
+    health_interval: float = 5.0            # сек. между проверками
+    health_timeout: float = 2.0
+
+    # Circuit breaker: после failure_threshold сбоев подряд реплика исключается на open_seconds,
+    # затем получает один пробный запрос (или успешную проверку) и возвращается при успехе
+    failure_threshold: int = 3
+    open_seconds: float = 30.0
+
+    # Hedging: если ответа нет дольше hedge_percentile времени ответа, тот же запрос
+    # уходит на другую реплику и берётся первый ответ. Потоковая генерация не дублируется.
+    hedge: bool = os.getenv("LLM_HEDGE", "0") == "1"
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20             # до стольких ответов задержка неизвестна, дублей нет
+    hedge_min_delay_ms: float = 50.0
+    latency_window: int = 256               # последних ответов для оценки перцентиля
+
+
+@dataclass
+class LLMClientConfig:
+    """Конфигурация общего HTTP-клиента к LLM бэкенду."""
+
+    base_url: str = os.getenv("LLM_BACKEND_URL", "http://localhost:8888")
+    generate_path: str = "/generate"
+    # Потоковая генерация (stream=true в /prompt): POST сюда с "stream": true в теле;
+    # бэкенд отвечает SSE, NDJSON, просто текстом по частям или, если не умеет, одним JSON
+    stream_path: Optional[str] = None      # None — generate_path
+    # Пакетная генерация: POST {"batch": [запросы]} -> [ответы] или {"batch": [ответы]}
+    batch_path: Optional[str] = None       # None — generate_path
+
+    # Пул соединений
+    max_connections: int = 100             # всего соединений к бэкенду
+    max_keepalive_connections: int = 20    # из них держим открытыми в простое
+    keepalive_expiry: float = 30.0         # сек., после которых простаивающее соединение закрывается
+    http2: bool = False                    # требует пакет h2, иначе откатываемся на HTTP/1.1
+
+    # Таймауты по фазам (сек.). Генерация долгая, поэтому read большой.
+    connect_timeout: float = 5.0
+    read_timeout: float = 600.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0             # ожидание свободного соединения из пула
+
+    pool: BackendPoolConfig = field(default_factory=BackendPoolConfig)
+
+
+@dataclass
+class GenerationBatchConfig:
+    """Сборка одновременных запросов /prompt в пакетные вызовы бэкенда."""
+
+    enabled: bool = True
+    mode: str = "batch"                    # batch | per_item (по одному запросу, как без пакетов)
+    max_batch_size: int = 8                # запросов в пакете
+    max_wait_ms: float = 5.0               # сколько первый запрос пакета ждёт остальных
+    max_queue: int = 1000                  # запросов в очереди; сверх — отказ
+    # Бэкенд не понимает пакеты (404/405/400/422/501 или ответ не той длины) — перейти на per_item
+    auto_fallback: bool = True
+
+
+@dataclass
+class AdmissionConfig:
+    """Ограничение числа одновременных генераций /prompt и очередь ожидания перед ними."""
+
+    enabled: bool = True
+    # gradient — лимит следует за отношением базового времени ответа к текущему;
+    # aimd — +1/limit за быстрый ответ, *backoff_ratio за медленный или ошибку; fixed — не меняется
+    algorithm: str = "gradient"
+    initial_limit: int = 32
+    min_limit: int = 4
+    max_limit: int = 256
+    tolerance: float = 1.5                 # во сколько раз ответ может быть медленнее базового
+    backoff_ratio: float = 0.9             # множитель лимита при ошибке бэкенда
+    smoothing: float = 0.2                 # доля нового значения лимита (gradient)
+    baseline_window: int = 100             # ответов в скользящем базовом времени ответа
+
+    # Очередь: сверх лимита запросы ждут по приоритету (X-Priority), не дольше max_queue_ms;
+    # при полной очереди запрос отклоняется сразу, если в ней нет менее приоритетного
+    max_queue: int = 256
+    max_queue_ms: float = 30_000.0
+
+    # Retry-After при отказе: время ответа * (очередь + 1) / лимит
+    default_latency_s: float = 30.0        # пока нет измерений
+    retry_after_max_s: int = 600
+
+
+@dataclass
+class ParseExecutorConfig:
+    """Конфигурация выполнения парсинга вне цикла событий."""
+
+    mode: str = "process"                  # process | thread | inline
+    max_workers: Optional[int] = None      # процессов в пуле, None -> os.cpu_count()
+    thread_workers: int = 4                # потоков для небольших файлов
+    inline_threshold: int = 4 * 1024       # байт; меньше — парсим прямо в обработчике
+    thread_threshold: int = 64 * 1024      # байт; меньше — в пуле потоков, больше — в процессах
+    prewarm: bool = True                   # поднять процессы и парсеры при старте
+    start_method: str = "spawn"            # fork небезопасен при уже запущенных потоках
+
+
+@dataclass
+class PythonParserConfig:
+    """Что извлекает PythonParser."""
+
+    # declarations — функции модуля и методы классов (операторы модуля и тел классов);
+    # all — все def/async def за один обход операторов: вложенные функции, методы
+    # классов внутри функций, объявления внутри if/try/with/for и т.п.
+    scope: str = "declarations"
+    max_depth: Optional[int] = None         # для all: сколько объемлющих функций допустимо, None — без ограничения
+    lambdas: bool = False                   # лямбды, присвоенные имени (f = lambda x: ...)
+
+
+@dataclass
+class ParserFactoryConfig:
+    """Конфигурация реестра парсеров."""
+
+    # Языки (значения Language), парсеры которых создаются при старте
+    # и в каждом воркере; None -> все зарегистрированные.
+    prewarm_languages: Optional[list[str]] = field(default_factory=lambda: (
+        [lang.strip() for lang in os.environ["PARSER_PREWARM_LANGUAGES"].split(",") if lang.strip()]
+        if os.getenv("PARSER_PREWARM_LANGUAGES") is not None else None
+    ))
+    python: PythonParserConfig = field(default_factory=PythonParserConfig)
+
+
+@dataclass
+class ParseCacheConfig:
+    """Конфигурация кеша результатов парсинга."""
+
+    enabled: bool = True
+    memory_max_bytes: int = 64 * 1024 * 1024      # LRU в памяти процесса
+    disk_path: Optional[str] = os.getenv("PARSE_CACHE_PATH")  # SQLite, общий для воркеров uvicorn
+    disk_max_entries: int = 100_000
+    keep_sources: bool = True                     # хранить исходники для /extract/incremental (diff от base_hash)
+
+
+@dataclass
+class CommentCacheConfig:
+    """Кеш ответов LLM для /prompt."""
+
+    enabled: bool = True
+    ttl_seconds: float = 24 * 60 * 60             # старше — генерируем заново
+    memory_max_bytes: int = 16 * 1024 * 1024      # LRU в памяти процесса
+    disk_path: Optional[str] = os.getenv("COMMENT_CACHE_PATH")  # SQLite, общий для воркеров uvicorn
+    disk_max_entries: int = 100_000
+    # Входит в ключ: смена модели на бэкенде — новая версия, старые ответы не используются
+    version: str = os.getenv("COMMENT_CACHE_VERSION", "1")
+
+
+@dataclass
+class ArchiveConfig:
+    """Ограничения для загрузки архивов в /extract/archive."""
+
+    max_archive_bytes: int = 512 * 1024 * 1024    # размер тела запроса
+    max_entry_bytes: int = 1024 * 1024            # записи крупнее пропускаются до распаковки
+    spool_max_memory: int = 16 * 1024 * 1024      # zip буферизуется в памяти до этого размера
+    default_exclude: list[str] = field(default_factory=lambda: [
+        "*/node_modules/*", "node_modules/*",
+        "*/vendor/*", "vendor/*",
+        "*.min.js",
+    ])
+
+
+@dataclass
+class ResponseConfig:
+    """Форматы и сжатие ответов /extract."""
+
+    compress_min_bytes: int = 1024                # меньшие ответы не сжимаются
+    gzip_level: int = 6
+    zstd_level: int = 3                           # требует пакет zstandard, иначе только gzip
+    arrow_batch_rows: int = 64 * 1024             # строк в одном record batch Arrow / row group Parquet
+
+
+@dataclass
+class AppConfig:
+    """Корневая конфигурация приложения."""
+
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    llm_client: LLMClientConfig = field(default_factory=LLMClientConfig)
+    generation_batch: GenerationBatchConfig = field(default_factory=GenerationBatchConfig)
+    admission: AdmissionConfig = field(default_factory=AdmissionConfig)
+    parsers: ParserFactoryConfig = field(default_factory=ParserFactoryConfig)
+    parse_executor: ParseExecutorConfig = field(default_factory=ParseExecutorConfig)
+    parse_cache: ParseCacheConfig = field(default_factory=ParseCacheConfig)
+    comment_cache: CommentCacheConfig = field(default_factory=CommentCacheConfig)
+    archive: ArchiveConfig = field(default_factory=ArchiveConfig)
+    response: ResponseConfig = field(default_factory=ResponseConfig)
@@ -0,0 +1,238 @@
+"""
+Допуск запросов /prompt к генерации (admission control).
+
+Одновременно генерируется не больше limit запросов. Лимит подстраивается под время ответа
+бэкенда: пока ответы не медленнее базового времени (скользящего среднего) больше чем
+в tolerance раз, он растёт, при замедлении и ошибках — снижается (gradient или AIMD).
+Запросы сверх лимита ждут в очереди по приоритету не дольше max_queue_ms; при полной очереди
+новый запрос вытесняет менее приоритетный или сразу получает отказ с оценкой Retry-After.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Optional
+
+from src.config import AdmissionConfig
+
+ALGORITHMS = ("gradient", "aimd", "fixed")
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = PRIORITIES["normal"]
+
+
+class AdmissionRejectedError(Exception):
+    """Запрос не допущен к генерации; повторить не раньше чем через retry_after секунд."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    future: asyncio.Future = field(compare=False)
+    enqueued: float = field(compare=False)
+
+
+class Ticket:
+    """Допущенный запрос. release() можно вызывать повторно: учитывается первый вызов."""
+
+    def __init__(self, controller: AdmissionController):
+        self._controller = controller
+        self._started = controller._clock()
+        self._released = False
+
+    def release(self, ok: Optional[bool]) -> None:
+        """ok — ответ получен; False — ошибка бэкенда; None — без вывода (запрос отменён)."""
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self._controller._clock() - self._started, ok)
+
+
+class AdmissionController:
+    """Адаптивный лимит одновременных генераций с приоритетной очередью ожидания."""
+
+    def __init__(self, config: Optional[AdmissionConfig] = None, clock: Callable[[], float] = time.monotonic):
+        self.config = config or AdmissionConfig()
+        if self.config.algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown admission algorithm '{self.config.algorithm}'")
+        self._clock = clock
+        self.limit = float(min(max(self.config.initial_limit, self.config.min_limit), self.config.max_limit))
+        self.in_flight = 0
+        self._heap: list[_Waiter] = []
+        self._queued = 0
+        self._seq = itertools.count()
+        self._baseline: Optional[float] = None   # базовое время ответа, сек.
+        self._latency: Optional[float] = None    # недавнее время ответа, сек.
+
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected_total = 0
+        self.evicted_total = 0
+        self.timed_out_total = 0
+        self.peak_queue_depth = 0
+        self._queue_wait_total = 0.0
+        self._dequeued_total = 0
+
+    @asynccontextmanager
+    async def admit(self, priority: int = DEFAULT_PRIORITY) -> AsyncIterator[None]:
+        """Выполнить блок в пределах лимита; исключение в блоке считается ошибкой бэкенда."""
+        ticket = await self.acquire(priority)
+        ok: Optional[bool] = None
+        try:
+            yield
+            ok = True
+        except Exception:
+            ok = False
+            raise
+        finally:
+            ticket.release(ok)
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> Ticket:
+        """Дождаться места; AdmissionRejectedError — очередь полна, запрос вытеснен или ждал слишком долго."""
+        if not self.config.enabled or (self._queued == 0 and self.in_flight < int(self.limit)):
+            return self._admit()
+
+        if self._queued >= self.config.max_queue:
+            worst = max((w for w in self._heap if not w.future.done()), default=None)
+            if worst is None or worst.priority <= priority:
+                self.rejected_total += 1
+                raise AdmissionRejectedError("Generation queue is full", self.retry_after())
+            self._queued -= 1
+            self.evicted_total += 1
+            worst.future.set_exception(
+                AdmissionRejectedError("Displaced by a higher priority request", self.retry_after())
+            )
+
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future(), self._clock())
+        heapq.heappush(self._heap, waiter)
+        self._queued += 1
+        self.queued_total += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self._queued)
+        try:
+            await asyncio.wait((waiter.future,), timeout=self.config.max_queue_ms / 1000)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.future.done():
+            self._abandon(waiter)
+            self.timed_out_total += 1
+            raise AdmissionRejectedError("Timed out in the generation queue", self.retry_after())
+        waiter.future.result()     # вытесненный запрос получает свой отказ
+        self._queue_wait_total += self._clock() - waiter.enqueued
+        self._dequeued_total += 1
+        return Ticket(self)
+
+    def retry_after(self) -> int:
+        """Через сколько секунд освободится место для нового запроса: оценка по времени ответа."""
+        latency = self._latency if self._latency is not None else self.config.default_latency_s
+        estimate = latency * (self._queued + 1) / int(self.limit)
+        return int(min(self.config.retry_after_max_s, max(1, math.ceil(estimate))))
+
+    def _admit(self) -> Ticket:
+        self.in_flight += 1
+        self.admitted_total += 1
+        return Ticket(self)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        # Место могли выдать одновременно с отменой или таймаутом: возвращаем его
+        if waiter.future.done():
+            if not waiter.future.cancelled() and waiter.future.exception() is None:
+                Ticket(self).release(None)
+            return
+        waiter.future.cancel()
+        self._queued -= 1
+
+    def _release(self, latency: float, ok: Optional[bool]) -> None:
+        if ok is not None:
+            self._adjust(latency, ok)
+        self.in_flight -= 1
+        self._grant()
+
+    def _grant(self) -> None:
+        while self._heap and self.in_flight < int(self.limit):
+            waiter = heapq.heappop(self._heap)
+            if waiter.future.done():
+                continue
+            self._queued -= 1
+            self.in_flight += 1
+            self.admitted_total += 1
+            waiter.future.set_result(None)
+        # Отменённые и вытесненные остаются в куче до извлечения; не даём им копиться
+        if len(self._heap) > 2 * max(self._queued, self.config.max_queue):
+            self._heap = [w for w in self._heap if not w.future.done()]
+            heapq.heapify(self._heap)
+
+    def _adjust(self, latency: float, ok: bool) -> None:
+        cfg = self.config
+        if ok:
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            if self._baseline is None:
+                self._baseline = latency
+        if cfg.algorithm == "fixed":
+            return
+
+        limit = self.limit
+        # Лимит не растёт, пока он не используется хотя бы наполовину
+        utilized = self.in_flight >= limit / 2
+        if not ok:
+            limit *= cfg.backoff_ratio
+        elif cfg.algorithm == "aimd":
+            if latency > cfg.tolerance * self._baseline:
+                limit *= cfg.backoff_ratio
+            elif utilized:
+                limit += 1 / limit
+        else:
+            gradient = min(1.0, max(0.5, cfg.tolerance * self._baseline / max(latency, 1e-9)))
+            target = limit * gradient + math.sqrt(limit)
+            if target > limit and not utilized:
+                target = limit
+            limit = (1 - cfg.smoothing) * limit + cfg.smoothing * target
+        self.limit = min(max(limit, cfg.min_limit), cfg.max_limit)
+
+        if ok:
+            self._baseline += (latency - self._baseline) / cfg.baseline_window
+
+    def stats(self) -> dict[str, Any]:
+        """Лимит, занятость, очередь и отказы."""
+        return {
+            "enabled": self.config.enabled,
+            "algorithm": self.config.algorithm,
+            "limit": int(self.limit),
+            "min_limit": self.config.min_limit,
+            "max_limit": self.config.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self._queued,
+            "max_queue": self.config.max_queue,
+            "peak_queue_depth": self.peak_queue_depth,
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "rejected_total": self.rejected_total,
+            "evicted_total": self.evicted_total,
+            "timed_out_total": self.timed_out_total,
+            "avg_queue_wait_ms": (
+                self._queue_wait_total / self._dequeued_total * 1000 if self._dequeued_total else 0.0
+            ),
+            "latency_ms": self._latency * 1000 if self._latency is not None else None,
+            "baseline_latency_ms": self._baseline * 1000 if self._baseline is not None else None,
+            "retry_after_s": self.retry_after(),
+        }
+
+
+def parse_priority(value: Optional[str]) -> int:
+    """Приоритет из заголовка X-Priority: high, normal (по умолчанию) или low."""
+    if value is None or not value.strip():
+        return DEFAULT_PRIORITY
+    try:
+        return PRIORITIES[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown priority '{value}', expected one of: {', '.join(PRIORITIES)}") from None
@@ -0,0 +1,255 @@
+"""
+Потоковое чтение архивов (.zip, .tar, .tar.gz, .tar.zst) из тела запроса.
+
+Записи перебираются по одной, на диск ничего не распаковывается: tar читается
+прямо из входящего потока, zip (оглавление лежит в конце файла) буферизуется
+в SpooledTemporaryFile. Фильтр по имени и размеру применяется по заголовку
+записи, поэтому отфильтрованные данные не попадают в память.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import io
+import tarfile
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz", "tar.zst")
+
+_ZIP_MAGIC = b"PK\x03\x04"
+_ZIP_EMPTY_MAGIC = b"PK\x05\x06"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class ArchiveError(ValueError):
+    """Архив повреждён или превышает лимиты."""
+
+
+class UnsupportedArchiveError(ArchiveError):
+    """Формат архива не поддерживается (или не установлена нужная зависимость)."""
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """Запись архива: либо данные файла, либо причина пропуска."""
+    name: str
+    data: Optional[bytes] = None
+    skipped: Optional[str] = None
+
+    async def read(self) -> bytes:
+        if self.skipped is not None:
+            raise ArchiveError(self.skipped)
+        return self.data
+
+
+@dataclass
+class EntryFilter:
+    """Отбор записей по glob-шаблонам пути, размеру и произвольному предикату."""
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    max_entry_bytes: Optional[int] = None
+    accept_name: Optional[Callable[[str], bool]] = None
+
+    def wanted(self, name: str) -> bool:
+        if self.include and not any(fnmatch.fnmatch(name, p) for p in self.include):
+            return False
+        if any(fnmatch.fnmatch(name, p) for p in self.exclude):
+            return False
+        return self.accept_name is None or self.accept_name(name)
+
+    def too_large(self, size: int) -> bool:
+        return self.max_entry_bytes is not None and size > self.max_entry_bytes
+
+
+def sniff_format(head: bytes) -> str:
+    """Определить формат по сигнатуре; всё, что не zip/zstd, отдаётся tarfile (tar/gz/bz2/xz)."""
+    if head.startswith(_ZIP_MAGIC) or head.startswith(_ZIP_EMPTY_MAGIC):
+        return "zip"
+    if head.startswith(_ZSTD_MAGIC):
+        return "tar.zst"
+    return "tar"
+
+
+def iter_zip(fileobj, entry_filter: EntryFilter) -> Iterator[ArchiveEntry]:
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Invalid zip archive: {e}") from e
+
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not entry_filter.wanted(info.filename):
+                continue
+            if entry_filter.too_large(info.file_size):
+                yield ArchiveEntry(info.filename, skipped="Entry too large")
+                continue
+            with archive.open(info) as member:
+                yield ArchiveEntry(info.filename, data=_read_limited(member, entry_filter))
+
+
+def iter_tar(fileobj, entry_filter: EntryFilter, compression: Optional[str] = None) -> Iterator[ArchiveEntry]:
+    if compression == "zst":
+        if zstandard is None:
+            raise UnsupportedArchiveError("tar.zst archives require the 'zstandard' package")
+        fileobj = zstandard.ZstdDecompressor().stream_reader(fileobj)
+        mode = "r|"
+    else:
+        mode = "r|*"
+
+    try:
+        # Потоковый режим "r|": записи идут строго по порядку, без seek назад
+        with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+            for member in archive:
+                if not member.isfile() or not entry_filter.wanted(member.name):
+                    continue
+                if entry_filter.too_large(member.size):
+                    yield ArchiveEntry(member.name, skipped="Entry too large")
+                    continue
+                extracted = archive.extractfile(member)
+                yield ArchiveEntry(member.name, data=_read_limited(extracted, entry_filter))
+    except (tarfile.TarError, EOFError, OSError) as e:
+        raise ArchiveError(f"Invalid tar archive: {e}") from e
+
+
+def _read_limited(member, entry_filter: EntryFilter) -> bytes:
+    # Размер из заголовка мог соврать: читаем не больше лимита + 1 байт
+    if entry_filter.max_entry_bytes is None:
+        return member.read()
+    data = member.read(entry_filter.max_entry_bytes + 1)
+    if len(data) > entry_filter.max_entry_bytes:
+        raise ArchiveError("Archive entry exceeds declared size limit")
+    return data
+
+
+class AsyncStreamReader(io.RawIOBase):
+    """
+    Синхронный file-like поверх асинхронного потока байт.
+    Читается из рабочего потока; за очередным чанком обращается в цикл событий.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        loop: asyncio.AbstractEventLoop,
+        head: bytes = b"",
+        max_bytes: Optional[int] = None,
+    ):
+        self._chunks = chunks
+        self._loop = loop
+        self._buffer = head
+        self._total = len(head)
+        self._max_bytes = max_bytes
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer and not self._eof:
+            chunk = asyncio.run_coroutine_threadsafe(self._next_chunk(), self._loop).result()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer = chunk
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+        self._total += len(chunk)
+        if self._max_bytes is not None and self._total > self._max_bytes:
+            raise ArchiveError("Archive exceeds maximum allowed size")
+        return chunk
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    max_archive_bytes: Optional[int] = None,
+    spool_max_memory: int = 16 * 1024 * 1024,
+    head: bytes = b"",
+) -> tempfile.SpooledTemporaryFile:
+    """Дочитать поток в SpooledTemporaryFile (в памяти до spool_max_memory, дальше на диск)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_max_memory)
+    total = len(head)
+    spool.write(head)
+    async for chunk in chunks:
+        total += len(chunk)
+        if max_archive_bytes is not None and total > max_archive_bytes:
+            spool.close()
+            raise ArchiveError("Archive exceeds maximum allowed size")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def iter_spooled(spool, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Отдать содержимое spool_stream чанками; файл закрывается по окончании."""
+    try:
+        while chunk := spool.read(chunk_size):
+            yield chunk
+    finally:
+        spool.close()
+
+
+async def iter_archive(
+    chunks: AsyncIterator[bytes],
+    entry_filter: EntryFilter,
+    archive_format: Optional[str] = None,
+    max_archive_bytes: Optional[int] = None,
+    spool_max_memory: int = 16 * 1024 * 1024,
+) -> AsyncIterator[ArchiveEntry]:
+    """Асинхронно перебрать записи архива, читая тело запроса по мере надобности."""
+    if archive_format is not None and archive_format not in ARCHIVE_FORMATS:
+        raise UnsupportedArchiveError(f"Unsupported archive format '{archive_format}'")
+
+    head = b""
+    async for chunk in chunks:
+        head = chunk
+        if chunk:
+            break
+    if not head:
+        raise ArchiveError("Empty archive")
+    archive_format = archive_format or sniff_format(head)
+
+    loop = asyncio.get_running_loop()
+    if archive_format == "zip":
+        spool = await spool_stream(chunks, max_archive_bytes, spool_max_memory, head=head)
+        source = spool
+        entries = iter_zip(spool, entry_filter)
+    else:
+        source = io.BufferedReader(AsyncStreamReader(chunks, loop, head, max_archive_bytes))
+        compression = "zst" if archive_format == "tar.zst" else None
+        entries = iter_tar(source, entry_filter, compression)
+
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(asyncio.to_thread(next, entries, None))
+            entry = await asyncio.shield(pending)
+            pending = None
+            if entry is None:
+                break
+            yield entry
+    finally:
+        if pending is not None:
+            # Отмена не останавливает рабочий поток: пока он внутри генератора, закрывать
+            # генератор и источник нельзя. Его результат и ошибка уже не нужны
+            await asyncio.wait((pending,))
+            if not pending.cancelled():
+                pending.exception()
+        entries.close()
+        source.close()
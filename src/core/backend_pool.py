@@ -0,0 +1,178 @@
+"""
+Состояние реплик LLM бэкенда для LLMClient.
+
+Запрос уходит на доступную реплику с наименьшим числом незавершённых запросов
+(least outstanding requests). Сбои (ошибка соединения, таймаут, 5xx) считает circuit breaker:
+после failure_threshold сбоев подряд реплика исключается на open_seconds, затем пропускает
+один пробный запрос — успех возвращает её, сбой исключает снова. По времени успешных ответов
+оценивается задержка для дублирования (hedging) медленных запросов.
+Сетевые вызовы делает LLMClient; здесь только выбор реплики и учёт.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Optional
+
+import httpx
+
+from src.config import BackendPoolConfig
+from src.utils.logger import error_logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Ответы, после которых реплика считается сбойной; 4xx — ошибка запроса, а не реплики
+FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class NoBackendAvailableError(httpx.HTTPError):
+    """Все реплики бэкенда исключены circuit breaker'ом."""
+
+
+class Backend:
+    """Одна реплика бэкенда: незавершённые запросы, состояние breaker'а и счётчики."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.state = CLOSED
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.healthy: Optional[bool] = None   # результат последней проверки; None — не проверялась
+
+        self.requests_total = 0
+        self.failures_total = 0
+        self.ejections_total = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "state": self.state,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests_total": self.requests_total,
+            "failures_total": self.failures_total,
+            "consecutive_failures": self.consecutive_failures,
+            "ejections_total": self.ejections_total,
+        }
+
+
+class BackendPool:
+    """Выбор реплики, circuit breaker и окно времени ответов для hedging."""
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        config: Optional[BackendPoolConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config or BackendPoolConfig()
+        self.backends = [Backend(url) for url in urls]
+        if not self.backends:
+            raise ValueError("Backend pool needs at least one backend URL")
+        self._clock = clock
+        # Смещение при равенстве нагрузки: одинаково загруженные реплики получают запросы по кругу
+        self._rotation = itertools.count()
+        self._latencies: dict[str, deque[float]] = {}
+
+    def acquire(self, exclude: Iterable[Backend] = ()) -> Backend:
+        """Реплика для запроса; вызывающий обязан передать её в release()."""
+        backend = self._pick(exclude)
+        if backend is None:
+            raise NoBackendAvailableError("All LLM backends are ejected by the circuit breaker")
+        backend.outstanding += 1
+        backend.requests_total += 1
+        return backend
+
+    def can_acquire(self, exclude: Iterable[Backend] = ()) -> bool:
+        """Есть ли доступная реплика кроме exclude (для дублирующего запроса); ничего не занимает."""
+        excluded = {id(backend) for backend in exclude}
+        return any(id(backend) not in excluded and self._available(backend) for backend in self.backends)
+
+    def release(self, backend: Backend, failed: Optional[bool]) -> None:
+        """Запрос к реплике завершён; failed=None — без вывода о реплике (запрос отменён)."""
+        backend.outstanding -= 1
+        if failed:
+            self.record_failure(backend)
+        elif failed is not None:
+            self.record_success(backend)
+
+    def record_success(self, backend: Backend) -> None:
+        backend.consecutive_failures = 0
+        backend.state = CLOSED
+
+    def record_failure(self, backend: Backend) -> None:
+        backend.failures_total += 1
+        backend.consecutive_failures += 1
+        if backend.state == HALF_OPEN or (
+            backend.state == CLOSED and backend.consecutive_failures >= self.config.failure_threshold
+        ):
+            backend.state = OPEN
+            backend.opened_at = self._clock()
+            backend.ejections_total += 1
+            error_logger.log_error("LLM backend ejected", context={
+                "backend": backend.url,
+                "consecutive_failures": backend.consecutive_failures,
+                "open_seconds": self.config.open_seconds,
+            })
+
+    def record_probe(self, backend: Backend, ok: bool) -> None:
+        """Результат проверки реплики. Успешная проверка не возвращает реплику раньше open_seconds."""
+        backend.healthy = ok
+        if not ok:
+            self.record_failure(backend)
+        elif backend.state != OPEN or self._cooled_down(backend):
+            self.record_success(backend)
+
+    def record_latency(self, kind: str, seconds: float) -> None:
+        window = self._latencies.get(kind)
+        if window is None:
+            window = self._latencies[kind] = deque(maxlen=self.config.latency_window)
+        window.append(seconds)
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """Через сколько секунд дублировать запрос вида kind; None — не дублировать."""
+        if not self.config.hedge or len(self.backends) < 2:
+            return None
+        window = self._latencies.get(kind)
+        if window is None or len(window) < self.config.hedge_min_samples:
+            return None
+        return max(_percentile(window, self.config.hedge_percentile), self.config.hedge_min_delay_ms / 1000)
+
+    def _pick(self, exclude: Iterable[Backend]) -> Optional[Backend]:
+        excluded = {id(backend) for backend in exclude}
+        start = next(self._rotation) % len(self.backends)
+        best: Optional[Backend] = None
+        for i in range(len(self.backends)):
+            backend = self.backends[(start + i) % len(self.backends)]
+            if id(backend) in excluded or not self._available(backend):
+                continue
+            if best is None or backend.outstanding < best.outstanding:
+                best = backend
+        if best is not None and best.state == OPEN:
+            best.state = HALF_OPEN
+        return best
+
+    def _available(self, backend: Backend) -> bool:
+        if backend.state == CLOSED:
+            return True
+        if backend.state == OPEN:
+            return self._cooled_down(backend)
+        # half_open: только один пробный запрос одновременно
+        return backend.outstanding == 0
+
+    def _cooled_down(self, backend: Backend) -> bool:
+        return self._clock() - backend.opened_at >= self.config.open_seconds
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [backend.stats() for backend in self.backends]
+
+
+def _percentile(values: Iterable[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
@@ -0,0 +1,220 @@
+"""
+Кеш ответов LLM для /prompt.
+
+Ключ — sha256 от версии кеша, языка, нормализованной задачи и токенов кода без комментариев:
+повторный запрос комментария к той же функции — переформатированной или с другими
+комментариями — отдаётся из кеша. Ответы живут ttl_seconds; хранятся в LRU в памяти
+и, если задан disk_path, в SQLite. Одинаковые одновременные запросы ждут один вызов
+бэкенда (single-flight).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import re
+import textwrap
+import time
+import tokenize
+from typing import Any, Awaitable, Callable, Optional
+
+from src.config import CommentCacheConfig
+from src.models import Language
+from src.utils.cache import LRUCache, SQLiteCache
+from src.utils.logger import error_logger
+
+# Строки сохраняются как есть, комментарии выбрасываются, остальное — слова и отдельные символы
+_C_TOKEN_RE = re.compile(
+    r"""
+      (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<token>\w+|\S)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_HASH_TOKEN_RE = re.compile(
+    r"""
+      (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<comment>\#[^\n]*)
+    | (?P<token>\w+|\S)
+    """,
+    re.VERBOSE,
+)
+_PYTHON_SKIPPED = frozenset({tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER})
+# Структура блоков Python — в отступах: они становятся скобками, чтобы ключ их учитывал
+_PYTHON_MARKERS = {tokenize.NEWLINE: ";", tokenize.INDENT: "{", tokenize.DEDENT: "}"}
+
+
+def normalize_task(task: str) -> str:
+    """Задача без разницы в пробелах и регистре."""
+    return " ".join(task.split()).casefold()
+
+
+def normalize_code(code: str, language: Optional[Language] = None) -> str:
+    """Токены кода через пробел: без комментариев, без разницы в пробелах и переносах строк."""
+    if language == Language.PYTHON:
+        try:
+            return " ".join(_python_tokens(code))
+        except (tokenize.TokenError, SyntaxError):
+            pass
+    pattern = _HASH_TOKEN_RE if language == Language.PYTHON else _C_TOKEN_RE
+    return " ".join(m.group() for m in pattern.finditer(code) if m.lastgroup != "comment")
+
+
+def _python_tokens(code: str) -> list[str]:
+    # Код из промпта может целиком стоять с отступом
+    readline = io.StringIO(textwrap.dedent(code)).readline
+    return [
+        _PYTHON_MARKERS.get(token.type, token.string)
+        for token in tokenize.generate_tokens(readline)
+        if token.type not in _PYTHON_SKIPPED
+    ]
+
+
+def comment_key(task: str, code: str, language: Optional[Language], version: str) -> str:
+    """Ключ кеша комментария к коду code по задаче task."""
+    parts = (version, language.value if language is not None else "", normalize_task(task), normalize_code(code, language))
+    return hashlib.sha256("\0".join(parts).encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class CommentCache:
+    """
+    Кеш ответов бэкенда по comment_key. Сначала проверяется LRU в памяти, затем SQLite;
+    просроченные записи считаются промахом и перезаписываются новым ответом.
+    """
+
+    def __init__(self, config: Optional[CommentCacheConfig] = None):
+        self.config = config or CommentCacheConfig()
+        self._memory = LRUCache(self.config.memory_max_bytes)
+        self._disk: Optional[SQLiteCache] = None
+        if self.config.enabled and self.config.disk_path:
+            try:
+                self._disk = SQLiteCache(
+                    self.config.disk_path,
+                    table="comments",
+                    max_entries=self.config.disk_max_entries,
+                )
+            except Exception as e:
+                error_logger.log_exception(e, context={"comment_cache_path": self.config.disk_path})
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.shared = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Ответ бэкенда из кеша или None (нет, просрочен или кеш выключен)."""
+        if not self.config.enabled:
+            return None
+
+        data = self._memory.get(key)
+        if data is not None:
+            response = self._fresh(data)
+            if response is not None:
+                self.memory_hits += 1
+                return response
+            # Просроченная в памяти запись могла быть обновлена в общем SQLite другим воркером
+            self._memory.delete(key)
+        if self._disk is not None:
+            data = await asyncio.to_thread(self._disk.get, key)
+            response = self._fresh(data) if data is not None else None
+            if response is not None:
+                self.disk_hits += 1
+                self._memory.put(key, data)
+                return response
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, response: dict) -> None:
+        if not self.config.enabled:
+            return
+
+        data = json.dumps({"created": time.time(), "response": response}, ensure_ascii=False).encode("utf-8")
+        self._memory.put(key, data)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, data)
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[dict]],
+        read: bool = True,
+        write: bool = True,
+        retry_errors: tuple[type[BaseException], ...] = (),
+    ) -> tuple[dict, str]:
+        """
+        Ответ из кеша или от generate() и откуда он: hit | miss | shared | bypass.
+        shared — ответ вызова, уже начатого для того же ключа другим запросом.
+        read=False — не читать кеш (Cache-Control: no-cache); write=False — ещё и не сохранять
+        ответ и не объединять запрос с другими (no-store).
+        retry_errors — ошибки, которые касаются только начавшего вызов запроса (например, отказ
+        в допуске по его приоритету): ждавшие его запросы не получают их, а пробуют сами.
+        Отмена ожидающего запроса не отменяет вызов бэкенда: его ответ попадёт в кеш.
+        """
+        if not (self.config.enabled and write):
+            return await generate(), "bypass"
+        if read:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached, "hit"
+
+        while (task := self._in_flight.get(key)) is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(task), "shared"
+            except retry_errors:
+                # Вызов снят из _in_flight до пробуждения ждущих: следующий круг начнёт новый
+                # или присоединится к начатому другим ждавшим
+                continue
+
+        task = asyncio.ensure_future(self._generate(key, generate))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task), "miss"
+
+    async def _generate(self, key: str, generate: Callable[[], Awaitable[dict]]) -> dict:
+        response = await generate()
+        await self.put(key, response)
+        return response
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Ждущих могло не остаться: ошибка считается полученной
+            task.exception()
+
+    def _fresh(self, data: bytes) -> Optional[dict]:
+        value = json.loads(data)
+        if time.time() - value["created"] > self.config.ttl_seconds:
+            self.expired += 1
+            return None
+        return value["response"]
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики попаданий, промахов, объединённых запросов и вытеснений."""
+        return {
+            "enabled": self.config.enabled,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "shared": self.shared,
+            "in_flight": len(self._in_flight),
+            "memory_evictions": self._memory.evictions,
+            "disk_evictions": self._disk.evictions if self._disk is not None else 0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory.size_bytes,
+            "memory_max_bytes": self.config.memory_max_bytes,
+            "disk_enabled": self._disk is not None,
+        }
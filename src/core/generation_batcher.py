@@ -0,0 +1,179 @@
+"""
+Сборка одновременных запросов на генерацию в пакетные вызовы LLM бэкенда.
+
+Запросы копятся в очереди; первый запрос пакета ждёт остальных не дольше max_wait_ms,
+пакет уходит, как только набралось max_batch_size. Пакет отправляется одним вызовом
+LLMClient.generate_batch, а ответы раздаются ждущим запросам. Если бэкенд не понимает
+пакеты, планировщик переходит в режим per_item: запросы пакета уходят по одному, параллельно.
+Следующий пакет собирается, не дожидаясь ответа на предыдущий.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from src.config import GenerationBatchConfig
+from src.core.llm_client import BatchNotSupportedError, LLMClient
+from src.dto.commenters import CommentRequest
+from src.utils.logger import error_logger
+
+MODES = ("batch", "per_item")
+
+
+class GenerationQueueFullError(Exception):
+    """Очередь запросов на генерацию заполнена."""
+
+
+@dataclass
+class _Pending:
+    request: CommentRequest
+    future: asyncio.Future
+    enqueued: float
+
+
+class GenerationBatcher:
+    """Планировщик пакетов между обработчиками /prompt и LLMClient; start/close — из lifespan."""
+
+    def __init__(self, llm_client: LLMClient, config: Optional[GenerationBatchConfig] = None):
+        self.llm_client = llm_client
+        self.config = config or GenerationBatchConfig()
+        if self.config.mode not in MODES:
+            raise ValueError(f"Unknown generation batch mode '{self.config.mode}'")
+        self.mode = self.config.mode
+        self._queue: Optional[asyncio.Queue[_Pending]] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: set[asyncio.Task] = set()
+
+        self.batches_total = 0
+        self.items_total = 0
+        self.peak_batch_size = 0
+        self.rejected_total = 0
+        self.fallbacks_total = 0
+        self._wait_total = 0.0
+
+    @property
+    def is_started(self) -> bool:
+        return self._worker is not None
+
+    async def start(self) -> None:
+        if self._worker is not None or not self.config.enabled:
+            return
+        self._queue = asyncio.Queue(self.config.max_queue)
+        self._worker = asyncio.create_task(self._collect())
+
+    async def close(self) -> None:
+        """Остановить сборку пакетов; запросы из очереди и неотвеченные пакеты получают ошибку."""
+        if self._worker is None:
+            return
+        worker, self._worker = self._worker, None
+        worker.cancel()
+        for task in list(self._dispatches):
+            task.cancel()
+        await asyncio.gather(worker, *self._dispatches, return_exceptions=True)
+        while not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("GenerationBatcher is closed"))
+
+    async def generate(self, request: CommentRequest) -> dict:
+        """Ответ бэкенда на request; без запущенного планировщика — прямой вызов LLMClient."""
+        if self._worker is None:
+            return await self.llm_client.generate(request)
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_Pending(request, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected_total += 1
+            raise GenerationQueueFullError(f"Generation queue is full ({self.config.max_queue} requests)")
+        # Отмена ждущего (клиент отключился) отменяет future: из пакета запрос выпадет
+        return await future
+
+    async def _collect(self) -> None:
+        max_wait = self.config.max_wait_ms / 1000
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + max_wait
+            while len(batch) < self.config.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [pending for pending in batch if not pending.future.done()]
+            if not batch:
+                continue
+            now = time.monotonic()
+            self.batches_total += 1
+            self.items_total += len(batch)
+            self.peak_batch_size = max(self.peak_batch_size, len(batch))
+            self._wait_total += sum(now - pending.enqueued for pending in batch)
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: list[_Pending]) -> None:
+        if self.mode == "batch" and len(batch) > 1:
+            try:
+                responses = await self.llm_client.generate_batch([pending.request for pending in batch])
+            except BatchNotSupportedError as e:
+                if not self.config.auto_fallback:
+                    _fail(batch, e)
+                    return
+                self.mode = "per_item"
+                self.fallbacks_total += 1
+                error_logger.log_error("Backend does not support batches, switching to per_item", context={
+                    "reason": str(e),
+                })
+            except Exception as e:
+                _fail(batch, e)
+                return
+            else:
+                for pending, response in zip(batch, responses):
+                    if not pending.future.done():
+                        pending.future.set_result(response)
+                return
+
+        results = await asyncio.gather(
+            *(self.llm_client.generate(pending.request) for pending in batch), return_exceptions=True
+        )
+        for pending, result in zip(batch, results):
+            if pending.future.done():
+                continue
+            if isinstance(result, BaseException):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        """Размеры пакетов, ожидание в очереди и её глубина."""
+        return {
+            "enabled": self.config.enabled,
+            "started": self.is_started,
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.config.max_queue,
+            "max_batch_size": self.config.max_batch_size,
+            "max_wait_ms": self.config.max_wait_ms,
+            "in_flight_batches": len(self._dispatches),
+            "batches_total": self.batches_total,
+            "items_total": self.items_total,
+            "avg_batch_size": self.items_total / self.batches_total if self.batches_total else 0.0,
+            "peak_batch_size": self.peak_batch_size,
+            "avg_wait_ms": self._wait_total / self.items_total * 1000 if self.items_total else 0.0,
+            "rejected_total": self.rejected_total,
+            "fallbacks_total": self.fallbacks_total,
+        }
+
+
+def _fail(batch: list[_Pending], error: BaseException) -> None:
+    for pending in batch:
+        if not pending.future.done():
+            pending.future.set_exception(error)
@@ -9,6 +9,21 @@ from typing import Optional
 from src.models import Language, LANGUAGE_PATTERNS
 from src.utils.logger import process_logger
 
+
+# Паттерны компилируются один раз при импорте, а не ищутся в кеше re при каждом вызове.
+# Тяжёлые идут первыми: так победитель определяется раньше и остальные можно не проверять
+_COMPILED_PATTERNS: list[tuple[Language, re.Pattern, int]] = sorted(
+    (
+        (lang, re.compile(pattern, re.MULTILINE), weight)
+        for lang, patterns in LANGUAGE_PATTERNS.items()
+        for pattern, weight in patterns
+    ),
+    key=lambda item: -item[2],
+)
+_TOTAL_WEIGHTS: dict[Language, int] = {
+    lang: sum(weight for _, weight in LANGUAGE_PATTERNS.get(lang, ())) for lang in Language
+}
+
 @dataclass(frozen=True)
 class LanguageDetector:
     """
@@ -44,22 +59,35 @@ class LanguageDetector:
         ext = Path(file_path).suffix.lower()
         return cls.FILE_EXTENSIONS.get(ext)
     
+    # Для определения по содержимому хватает начала файла
+    MAX_PATTERN_SCAN_CHARS = 64 * 1024
+
     @classmethod
-    def detect_language_patterns(cls, code: str) -> Optional[Language]:
-        """Определить язык по языковому паттерну"""
-        scores: dict[Language, int] = {lang: 0 for lang in Language}
+    def detect_language_patterns(cls, code: str, max_chars: Optional[int] = None) -> Optional[Language]:
+        """Определить язык по языковому паттерну (смотрится не больше max_chars символов)"""
+        limit = cls.MAX_PATTERN_SCAN_CHARS if max_chars is None else max_chars
+        if len(code) > limit:
+            # Обрезаем по границе строки, чтобы не обрывать паттерны с '^' на середине
+            cut = code.rfind("\n", 0, limit)
+            code = code[:cut if cut > 0 else limit]
 
-        for lang, patterns in LANGUAGE_PATTERNS.items():
-            for pattern, weight in patterns:
-                if re.search(pattern, code, re.MULTILINE):
-                    scores[lang] += weight
+        scores: dict[Language, int] = {lang: 0 for lang in Language}
+        remaining = dict(_TOTAL_WEIGHTS)
+        for lang, pattern, weight in _COMPILED_PATTERNS:
+            remaining[lang] -= weight
+            if pattern.search(code):
+                scores[lang] += weight
+            # Лидера уже не догнать (даже до ничьей): остальные паттерны результат не изменят
+            leader = max(scores, key=scores.get)
+            if all(scores[other] + remaining[other] < scores[leader] for other in scores if other is not leader):
+                break
 
         best_lang = max(scores, key=scores.get)
 
         if scores[best_lang] == 0:
             return None
         
-        process_logger.debug(f"Detected language={best_lang.value}, scores={scores}")
+        process_logger.debug("Detected language=%s, scores=%s", best_lang.value, scores)
 
         return best_lang
 
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import time
+from typing import Any, AsyncIterator, Iterable, Optional, Union
+
+import httpx
+
+from src.config import LLMClientConfig
+from src.core.backend_pool import FAILURE_STATUSES, Backend, BackendPool
+from src.dto.commenters import CommentRequest
+from src.utils.logger import error_logger
+
+
+class BatchNotSupportedError(Exception):
+    """Бэкенд не принимает пакетные запросы на генерацию."""
+
+
+# Ответы бэкенда, означающие, что пакетный формат ему незнаком
+_BATCH_UNSUPPORTED_STATUSES = frozenset({400, 404, 405, 422, 501})
+
+
+class LLMClient:
+    """
+    Долгоживущий HTTP-клиент к LLM бэкенду.
+    Создаётся один раз на приложение (start/close вызываются из lifespan),
+    поэтому соединения к бэкенду переиспользуются через keep-alive.
+    Реплики бэкенда (config.pool.urls) делят один пул соединений; реплику для запроса
+    выбирает BackendPool, он же исключает сбойные. Фоновая задача проверяет реплики.
+    """
+
+    def __init__(
+        self,
+        config: Optional[LLMClientConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.config = config or LLMClientConfig()
+        self._transport = transport     # подменяется в тестах
+        self._client: Optional[httpx.AsyncClient] = None
+        self._http2_enabled = False
+        self.pool = BackendPool(self.config.pool.urls or [self.config.base_url], self.config.pool)
+        self._probe_task: Optional[asyncio.Task] = None
+
+        # Счётчики для подбора размера пула
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests_total = 0
+        self._errors_total = 0
+        self._hedged_total = 0
+        self._hedge_wins_total = 0
+
+    @property
+    def is_started(self) -> bool:
+        return self._client is not None
+
+    async def start(self) -> None:
+        """Создать клиент и пул соединений."""
+        if self._client is not None:
+            return
+
+        cfg = self.config
+        http2 = cfg.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            error_logger.log_error(
+                "HTTP/2 requested but 'h2' package is not installed, falling back to HTTP/1.1"
+            )
+            http2 = False
+        self._http2_enabled = http2
+
+        # Адреса запросов абсолютные: у каждой реплики свой URL, а пул соединений общий
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive_connections,
+                keepalive_expiry=cfg.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=cfg.connect_timeout,
+                read=cfg.read_timeout,
+                write=cfg.write_timeout,
+                pool=cfg.pool_timeout,
+            ),
+        )
+        if cfg.pool.health_path and cfg.pool.health_interval > 0:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def close(self) -> None:
+        """Закрыть все соединения пула."""
+        if self._client is None:
+            return
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+        client, self._client = self._client, None
+        await client.aclose()
+
+    async def generate(self, request: CommentRequest) -> dict:
+        """Отправить запрос на генерацию комментария и вернуть JSON ответа."""
+        if self._client is None:
+            raise RuntimeError("LLMClient is not started")
+
+        self._in_flight += 1
+        self._requests_total += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            response = await self._post("generate", self.config.generate_path, request.model_dump())
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError:
+            self._errors_total += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    async def generate_batch(self, requests: list[CommentRequest]) -> list[dict]:
+        """
+        Один вызов бэкенда на несколько запросов: ответы в том же порядке.
+        BatchNotSupportedError — бэкенд не понимает пакетный формат.
+        """
+        if self._client is None:
+            raise RuntimeError("LLMClient is not started")
+
+        self._in_flight += 1
+        self._requests_total += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            response = await self._post(
+                "batch",
+                self.config.batch_path or self.config.generate_path,
+                {"batch": [request.model_dump() for request in requests]},
+            )
+            if response.status_code in _BATCH_UNSUPPORTED_STATUSES:
+                raise BatchNotSupportedError(f"Backend answered {response.status_code} to a batch request")
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError:
+            self._errors_total += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        results = data.get("batch") if isinstance(data, dict) else data
+        if not isinstance(results, list) or len(results) != len(requests):
+            raise BatchNotSupportedError("Backend response is not a batch of the same size")
+        return results
+
+    async def generate_stream(self, request: CommentRequest) -> AsyncIterator[str]:
+        """
+        Генерация по частям: фрагменты текста комментария по мере их прихода от бэкенда.
+        Закрытие генератора (клиент отключился) закрывает и ответ бэкенда, а с ним — запрос.
+        """
+        if self._client is None:
+            raise RuntimeError("LLMClient is not started")
+
+        self._in_flight += 1
+        self._requests_total += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            backend = self.pool.acquire()
+            failed: Optional[bool] = None
+            try:
+                async with self._client.stream(
+                    "POST",
+                    backend.url + (self.config.stream_path or self.config.generate_path),
+                    json={**request.model_dump(), "stream": True},
+                    headers={"Accept": _STREAM_ACCEPT},
+                ) as response:
+                    failed = response.status_code in FAILURE_STATUSES
+                    response.raise_for_status()
+                    async for text in _stream_texts(response):
+                        if text:
+                            yield text
+            except httpx.TransportError:
+                failed = True
+                raise
+            finally:
+                self.pool.release(backend, failed)
+        except httpx.HTTPError:
+            self._errors_total += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    async def check_backends(self) -> None:
+        """Проверить все реплики: GET health_path; ошибка соединения или 5xx — сбой реплики."""
+        await asyncio.gather(*(self._probe(backend) for backend in self.pool.backends))
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.pool.health_interval)
+            await self.check_backends()
+
+    async def _probe(self, backend: Backend) -> None:
+        try:
+            response = await self._client.get(
+                backend.url + self.config.pool.health_path, timeout=self.config.pool.health_timeout
+            )
+            ok = response.status_code not in FAILURE_STATUSES
+        except httpx.HTTPError:
+            ok = False
+        self.pool.record_probe(backend, ok)
+
+    async def _post(self, kind: str, path: str, payload: Any) -> httpx.Response:
+        """
+        POST на наименее загруженную реплику. Если ответа нет дольше задержки hedging,
+        тот же запрос уходит на другую реплику: возвращается первый несбойный ответ,
+        оставшийся запрос отменяется.
+        """
+        delay = self.pool.hedge_delay(kind)
+        if delay is None:
+            return await self._send(kind, path, payload)
+
+        # Реплику выбирает сам _send: задача, отменённая до первого шага, её не занимает
+        picked: list[Backend] = []
+        primary = asyncio.ensure_future(self._send(kind, path, payload, picked=picked))
+        tasks = [primary]
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done and self.pool.can_acquire(exclude=picked):
+                self._hedged_total += 1
+                tasks.append(asyncio.ensure_future(self._send(kind, path, payload, exclude=list(picked))))
+                pending.add(tasks[-1])
+
+            first: Optional[asyncio.Future] = None
+            while True:
+                for task in done:
+                    if task.exception() is None and task.result().status_code not in FAILURE_STATUSES:
+                        if task is not primary:
+                            self._hedge_wins_total += 1
+                        return task.result()
+                    first = first or task
+                if not pending:
+                    # Обе реплики ответили сбоем: отдаём первый результат как есть
+                    return first.result()
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()    # ошибка проигравшего запроса считается полученной
+
+    async def _send(
+        self,
+        kind: str,
+        path: str,
+        payload: Any,
+        exclude: Iterable[Backend] = (),
+        picked: Optional[list[Backend]] = None,
+    ) -> httpx.Response:
+        """Один POST на реплику из пула; реплика занята ровно до конца этого вызова."""
+        backend = self.pool.acquire(exclude)
+        if picked is not None:
+            picked.append(backend)
+        started = time.monotonic()
+        failed: Optional[bool] = None
+        try:
+            response = await self._client.post(backend.url + path, json=payload)
+        except httpx.TransportError:
+            failed = True
+            raise
+        else:
+            failed = response.status_code in FAILURE_STATUSES
+            if not failed:
+                self.pool.record_latency(kind, time.monotonic() - started)
+            return response
+        finally:
+            self.pool.release(backend, failed)
+
+    def stats(self) -> dict[str, Any]:
+        """Статистика использования пула соединений и реплик бэкенда."""
+        connections = self._pool_connections()
+        idle = sum(1 for c in connections if _safe_call(c, "is_idle"))
+        return {
+            "started": self.is_started,
+            "http2": self._http2_enabled,
+            "max_connections": self.config.max_connections,
+            "max_keepalive_connections": self.config.max_keepalive_connections,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "requests_total": self._requests_total,
+            "errors_total": self._errors_total,
+            "hedged_total": self._hedged_total,
+            "hedge_wins_total": self._hedge_wins_total,
+            "hedge_delay_ms": _ms(self.pool.hedge_delay("generate")),
+            "backends": self.pool.stats(),
+        }
+
+    def _pool_connections(self) -> list:
+        # httpx не отдаёт состояние пула публично: смотрим в httpcore-пул транспорта,
+        # а при несовпадении версий просто возвращаем пустой список.
+        if self._client is None:
+            return []
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []) or [])
+
+
+_STREAM_ACCEPT = "text/event-stream, application/x-ndjson, text/plain, application/json;q=0.5"
+_NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+_TEXT_KEYS = ("comment", "token", "text", "content")
+
+
+async def _stream_texts(response: httpx.Response) -> AsyncIterator[str]:
+    """Фрагменты текста из потокового ответа бэкенда по его Content-Type."""
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "text/event-stream":
+        data: list[str] = []
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                value = line[len("data:"):]
+                data.append(value[1:] if value.startswith(" ") else value)
+            elif not line and data:
+                payload, data = "\n".join(data), []
+                if payload.strip() == "[DONE]":
+                    return
+                yield _payload_text(payload)
+        if data and "\n".join(data).strip() != "[DONE]":
+            yield _payload_text("\n".join(data))
+    elif content_type in _NDJSON_TYPES:
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield _payload_text(line)
+    elif content_type == "application/json":
+        # Бэкенд без потоковой генерации: весь комментарий одним фрагментом
+        yield _payload_text(await response.aread())
+    else:
+        async for text in response.aiter_text():
+            yield text
+
+
+def _payload_text(payload: Union[str, bytes]) -> str:
+    """
+    Текст из события бэкенда: JSON с comment/token/text/content или в форме OpenAI
+    (choices[0].delta.content), JSON-строка или просто текст.
+    """
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return payload.decode("utf-8", errors="replace") if isinstance(payload, bytes) else payload
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        for key in _TEXT_KEYS:
+            if isinstance(data.get(key), str):
+                return data[key]
+        choices = data.get("choices")
+        if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+            choice = choices[0]
+            message = choice.get("delta") or choice.get("message") or {}
+            return message.get("content") or choice.get("text") or ""
+        return ""
+    # Число или литерал — сам текст фрагмента
+    return payload.decode("utf-8", errors="replace") if isinstance(payload, bytes) else payload
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return seconds * 1000 if seconds is not None else None
+
+
+def _safe_call(obj: Any, method: str) -> bool:
+    try:
+        return bool(getattr(obj, method)())
+    except Exception:
+        return False
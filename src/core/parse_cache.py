@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Optional
+
+from src.config import ParseCacheConfig
+from src.models import FunctionDescription, Language
+from src.models.function_description import from_normalized, to_normalized
+from src.utils.cache import LRUCache, SQLiteCache
+from src.utils.logger import error_logger
+
+
+class ParseCache:
+    """
+    Контентно-адресуемый кеш результатов парсинга.
+    Ключ — (язык, версия парсера, sha256 содержимого), значение — сериализованный
+    список FunctionDescription. Сначала проверяется LRU в памяти, затем SQLite.
+    Проекции (результаты только с частью полей) хранятся под своей версией: версия|поля.
+    Результат хранится в нормализованной форме: комментарий класса — один раз на класс.
+    Там же по sha256 хранятся исходники файлов — базы для инкрементального извлечения.
+    """
+
+    def __init__(self, config: Optional[ParseCacheConfig] = None):
+        self.config = config or ParseCacheConfig()
+        self._memory = LRUCache(self.config.memory_max_bytes)
+        self._disk: Optional[SQLiteCache] = None
+        if self.config.enabled and self.config.disk_path:
+            try:
+                self._disk = SQLiteCache(
+                    self.config.disk_path,
+                    table="parse_results",
+                    max_entries=self.config.disk_max_entries,
+                )
+            except Exception as e:
+                error_logger.log_exception(e, context={"parse_cache_path": self.config.disk_path})
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """sha256 содержимого: адрес исходника в кеше и base_hash инкрементального извлечения."""
+        return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+    @staticmethod
+    def make_key(language: Language, parser_version: str, content: str) -> str:
+        return f"{language.value}:{parser_version}:{ParseCache.content_hash(content)}"
+
+    @staticmethod
+    def projection_version(parser_version: str, fields: Optional[list[str]]) -> str:
+        """Версия для ключа проекции: полный результат и проекции на разные поля не смешиваются."""
+        if fields is None:
+            return parser_version
+        return f"{parser_version}|{','.join(sorted(fields))}"
+
+    async def get(
+        self, language: Language, parser_version: str, content: str, fields: Optional[list[str]] = None
+    ) -> Optional[list[FunctionDescription]]:
+        """
+        Вернуть закешированный результат или None.
+        С fields подходит и полный результат, и проекция ровно на эти поля.
+        """
+        if not self.config.enabled:
+            return None
+
+        versions = [parser_version]
+        if fields is not None:
+            versions.append(self.projection_version(parser_version, fields))
+        keys = [self.make_key(language, version, content) for version in versions]
+        for key in keys:
+            data = self._memory.get(key)
+            if data is not None:
+                self.memory_hits += 1
+                return self._loads(data)
+
+        if self._disk is not None:
+            for key in keys:
+                data = await asyncio.to_thread(self._disk.get, key)
+                if data is not None:
+                    self.disk_hits += 1
+                    self._memory.put(key, data)
+                    return self._loads(data)
+
+        self.misses += 1
+        return None
+
+    async def put(
+        self,
+        language: Language,
+        parser_version: str,
+        content: str,
+        functions: list[FunctionDescription],
+        fields: Optional[list[str]] = None,
+    ) -> None:
+        """Сохранить результат парсинга в оба уровня; fields — результат это проекция на эти поля."""
+        if not self.config.enabled:
+            return
+
+        key = self.make_key(language, self.projection_version(parser_version, fields), content)
+        data = self._dumps(functions, fields)
+        self._memory.put(key, data)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, data)
+
+    async def get_source(self, digest: str) -> Optional[str]:
+        """Исходник по его content_hash, если он сохранён (база для diff в /extract/incremental)."""
+        if not self.config.enabled:
+            return None
+
+        key = f"source:{digest}"
+        data = self._memory.get(key)
+        if data is None and self._disk is not None:
+            data = await asyncio.to_thread(self._disk.get, key)
+            if data is not None:
+                self._memory.put(key, data)
+        return data.decode("utf-8", errors="surrogatepass") if data is not None else None
+
+    async def put_source(self, content: str) -> None:
+        """Сохранить исходник под его content_hash (если включено keep_sources)."""
+        if not (self.config.enabled and self.config.keep_sources):
+            return
+
+        data = content.encode("utf-8", errors="surrogatepass")
+        key = f"source:{hashlib.sha256(data).hexdigest()}"
+        self._memory.put(key, data)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, data)
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict[str, Any]:
+        """Счётчики попаданий, промахов и вытеснений."""
+        return {
+            "enabled": self.config.enabled,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": self._memory.evictions,
+            "disk_evictions": self._disk.evictions if self._disk is not None else 0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory.size_bytes,
+            "memory_max_bytes": self.config.memory_max_bytes,
+            "disk_enabled": self._disk is not None,
+        }
+
+    @staticmethod
+    def _dumps(functions: list[FunctionDescription], fields: Optional[list[str]] = None) -> bytes:
+        return json.dumps(to_normalized(functions, fields), ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _loads(data: bytes) -> list[FunctionDescription]:
+        value = json.loads(data)
+        if isinstance(value, list):
+            # Записи в плоской форме, сделанные до нормализованной
+            return [FunctionDescription.from_dict(item) for item in value]
+        return from_normalized(value)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+
+from src.config import ParseExecutorConfig, ParserFactoryConfig
+from src.core.parser_factory import ParserFactory
+from src.models import FunctionDescription, Language
+
+# Реестр парсеров процесса-воркера; создаётся инициализатором пула процессов.
+_factory: Optional[ParserFactory] = None
+
+
+def _get_factory() -> ParserFactory:
+    global _factory
+    if _factory is None:
+        _factory = ParserFactory()
+    return _factory
+
+
+def _init_worker(languages: list[str], config: Optional[ParserFactoryConfig] = None) -> None:
+    """Инициализатор процесса-воркера: реестр с конфигурацией родителя, парсеры выбранных языков."""
+    global _factory
+    _factory = ParserFactory(config)
+    _factory.warm_up(Language(value) for value in languages)
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _parse_task(language: str, content: str, fields: Optional[list[str]] = None) -> list[FunctionDescription]:
+    """
+    Задача парсинга для пула процессов, поэтому принимает только picklable аргументы.
+    Проекция на fields делается в воркере: обратно передаются только запрошенные поля.
+    """
+    parser = _get_factory().get_parser(Language(language))
+    return parser.extract(content, fields)
+
+
+class ParseExecutor:
+    """
+    Слой выполнения парсинга вне цикла событий.
+    Маленькие файлы парсятся прямо в обработчике, средние — в пуле потоков,
+    большие — в пуле процессов (ast/regex держат GIL и блокируют uvicorn).
+    """
+
+    MODES = ("process", "thread", "inline")
+
+    def __init__(
+        self,
+        config: Optional[ParseExecutorConfig] = None,
+        parser_factory: Optional[ParserFactory] = None,
+    ):
+        self.config = config or ParseExecutorConfig()
+        # Реестр приложения: им пользуются inline-разбор и пул потоков
+        self.parser_factory = parser_factory or ParserFactory()
+        if self.config.mode not in self.MODES:
+            raise ValueError(f"Unknown parse executor mode '{self.config.mode}'")
+
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+        # Очередь: задачи, отправленные в пул и ещё не завершённые
+        self._pending = {"thread": 0, "process": 0}
+        self._completed = {"inline": 0, "thread": 0, "process": 0}
+
+    @property
+    def max_workers(self) -> int:
+        return self.config.max_workers or os.cpu_count() or 1
+
+    @property
+    def concurrency(self) -> int:
+        """Сколько файлов имеет смысл обрабатывать одновременно."""
+        if self.config.mode == "inline":
+            return 1
+        workers = self.config.thread_workers
+        if self.config.mode == "process":
+            workers += self.max_workers
+        return workers
+
+    async def start(self) -> None:
+        """Создать пулы и, при необходимости, прогреть воркеры."""
+        if self.config.mode == "inline" or self._thread_pool is not None:
+            return
+
+        # Потокам нужны свои экземпляры парсеров, не допускающих общий доступ
+        languages = self.parser_factory.prewarm_languages()
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.config.thread_workers,
+            thread_name_prefix="parse",
+            initializer=self.parser_factory.warm_up,
+            initargs=(languages,),
+        )
+        if self.config.mode == "process":
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.config.start_method),
+                initializer=_init_worker,
+                initargs=([language.value for language in languages], self.parser_factory.config),
+            )
+
+        if self.config.prewarm:
+            await self._prewarm()
+
+    async def close(self) -> None:
+        """Остановить пулы; незапущенные задачи отменяются."""
+        pools = [self._process_pool, self._thread_pool]
+        self._process_pool = self._thread_pool = None
+        for pool in pools:
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    async def parse(
+        self, language: Language, content: str, fields: Optional[list[str]] = None
+    ) -> list[FunctionDescription]:
+        """
+        Распарсить содержимое файла в подходящем по размеру исполнителе.
+        fields — только эти поля описаний (BaseParser.extract), None — все.
+        """
+        tier = self._select_tier(content)
+        if tier == "inline":
+            result = self._parse_local(language, content, fields)
+        else:
+            self._pending[tier] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                if tier == "process":
+                    result = await loop.run_in_executor(
+                        self._process_pool, _parse_task, language.value, content, fields
+                    )
+                else:
+                    result = await loop.run_in_executor(
+                        self._thread_pool, self._parse_local, language, content, fields
+                    )
+            finally:
+                self._pending[tier] -= 1
+        self._completed[tier] += 1
+        return result
+
+    async def reparse(
+        self,
+        language: Language,
+        old_content: str,
+        old_functions: list[FunctionDescription],
+        new_content: str,
+    ) -> list[FunctionDescription]:
+        """
+        Разобрать новую версию файла по результату старой (BaseParser.reparse).
+        Пул процессов не используется: состояние прошлых разборов (границы, деревья)
+        хранят экземпляры парсеров этого процесса, а заново разбирается лишь участок файла.
+        """
+        tier = self._select_tier(new_content)
+        if tier == "process":
+            tier = "thread"
+        if tier == "inline":
+            result = self._reparse_local(language, old_content, old_functions, new_content)
+        else:
+            self._pending[tier] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._thread_pool, self._reparse_local, language, old_content, old_functions, new_content
+                )
+            finally:
+                self._pending[tier] -= 1
+        self._completed[tier] += 1
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Текущее состояние очередей исполнителя."""
+        return {
+            "mode": self.config.mode,
+            "process_workers": self.max_workers if self._process_pool is not None else 0,
+            "thread_workers": self.config.thread_workers if self._thread_pool is not None else 0,
+            "queue_depth": sum(self._pending.values()),
+            "pending_thread": self._pending["thread"],
+            "pending_process": self._pending["process"],
+            "completed_inline": self._completed["inline"],
+            "completed_thread": self._completed["thread"],
+            "completed_process": self._completed["process"],
+        }
+
+    def _parse_local(
+        self, language: Language, content: str, fields: Optional[list[str]] = None
+    ) -> list[FunctionDescription]:
+        return self.parser_factory.get_parser(language).extract(content, fields)
+
+    def _reparse_local(
+        self,
+        language: Language,
+        old_content: str,
+        old_functions: list[FunctionDescription],
+        new_content: str,
+    ) -> list[FunctionDescription]:
+        return self.parser_factory.get_parser(language).reparse(old_content, old_functions, new_content)
+
+    def _select_tier(self, content: str) -> str:
+        if self._thread_pool is None:
+            return "inline"
+        # Порог в байтах, но len(str) — дешёвая и достаточная оценка
+        size = len(content)
+        if size < self.config.inline_threshold:
+            return "inline"
+        if self._process_pool is None or size < self.config.thread_threshold:
+            return "thread"
+        return "process"
+
+    async def _prewarm(self) -> None:
+        # Пул процессов запускает воркеры лениво: одновременная отправка
+        # max_workers задач поднимает их все сразу, вместе с инициализатором.
+        loop = asyncio.get_running_loop()
+        tasks = [loop.run_in_executor(self._thread_pool, _warm_up)]
+        if self._process_pool is not None:
+            tasks += [loop.run_in_executor(self._process_pool, _warm_up) for _ in range(self.max_workers)]
+        await asyncio.gather(*tasks)
@@ -1,25 +1,98 @@
 from __future__ import annotations
 
+import threading
+from importlib import import_module
+from typing import Iterable, Optional
+
+from src.config import ParserFactoryConfig
 from src.core.language_detector import Language
 from src.parsers.base_parser import BaseParser
-from src.parsers import *
+from src.utils.logger import process_logger
 
 
 class ParserFactory:
-    """Фабрика парсеров по Language."""
+    """
+    Реестр парсеров по Language, один на приложение (и по одному на процесс-воркер).
+    Классы парсеров импортируются при первом обращении, экземпляры переиспользуются:
+    потокобезопасные — общие, остальные (BaseParser.THREAD_SAFE = False) — свои у каждого потока.
+    """
 
-    _registry: dict[Language, type[BaseParser]] = {
-        Language.PYTHON: PythonParser,
-        Language.JAVA: JavaParser,
-        Language.PROMPT: PromptParser,
-        # Дальше добавим: C/C++/C#/Go/Java/JS
+    _registry: dict[Language, str] = {
+        Language.PYTHON: "src.parsers.python_parser:PythonParser",
+        Language.JAVA: "src.parsers.java_parser:JavaParser",
+        Language.PROMPT: "src.parsers.prompt_parser:PromptParser",
+        Language.GO: "src.parsers.go_parser:GoParser",
+        Language.JAVASCRIPT: "src.parsers.javascript_parser:JavaScriptParser",
+        Language.CSHARP: "src.parsers.csharp_parser:CSharpParser",
+        Language.C: "src.parsers.c_parser:CParser",
+        Language.CPP: "src.parsers.cpp_parser:CppParser",
     }
 
+    def __init__(self, config: Optional[ParserFactoryConfig] = None):
+        self.config = config or ParserFactoryConfig()
+        self._classes: dict[Language, type[BaseParser]] = {}
+        self._shared: dict[Language, BaseParser] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
     def get_parser(self, language: Language) -> BaseParser:
-        parser_cls = self._registry.get(language)
-        if not parser_cls:
-            raise NotImplementedError(f"Parser for language '{language.value}' is not implemented")
-        return parser_cls()
+        parser = self._shared.get(language)
+        if parser is not None:
+            return parser
+
+        per_thread: dict[Language, BaseParser] = getattr(self._local, "parsers", None)
+        if per_thread is None:
+            per_thread = self._local.parsers = {}
+        parser = per_thread.get(language)
+        if parser is not None:
+            return parser
+
+        parser_cls = self._load(language)
+        if not parser_cls.THREAD_SAFE:
+            parser = per_thread[language] = parser_cls.from_config(self.config)
+            return parser
+
+        with self._lock:
+            parser = self._shared.get(language)
+            if parser is None:
+                parser = self._shared[language] = parser_cls.from_config(self.config)
+        return parser
 
     def get_supported_languages(self) -> list[Language]:
-        return list(self._registry.keys())
\ No newline at end of file
+        return list(self._registry.keys())
+
+    def prewarm_languages(self) -> list[Language]:
+        """Языки, парсеры которых создаются заранее (по умолчанию — все зарегистрированные)."""
+        if self.config.prewarm_languages is None:
+            return self.get_supported_languages()
+        return [Language(value) for value in self.config.prewarm_languages]
+
+    def warm_up(self, languages: Optional[Iterable[Language]] = None) -> list[Language]:
+        """Заранее импортировать и создать парсеры; возвращает языки, которые удалось поднять."""
+        ready: list[Language] = []
+        for language in self.prewarm_languages() if languages is None else languages:
+            try:
+                self.get_parser(language)
+            except NotImplementedError as e:
+                process_logger.debug("Parser warm-up skipped: %s", e)
+                continue
+            ready.append(language)
+        return ready
+
+    def _load(self, language: Language) -> type[BaseParser]:
+        parser_cls = self._classes.get(language)
+        if parser_cls is not None:
+            return parser_cls
+
+        path = self._registry.get(language)
+        if not path:
+            raise NotImplementedError(f"Parser for language '{language.value}' is not implemented")
+
+        module_name, _, class_name = path.partition(":")
+        try:
+            parser_cls = getattr(import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            raise NotImplementedError(f"Parser for language '{language.value}' is not available: {e}") from e
+
+        self._classes[language] = parser_cls
+        return parser_cls
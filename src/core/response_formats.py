@@ -0,0 +1,252 @@
+"""
+Сериализация результатов /extract по заголовкам Accept и Accept-Encoding.
+
+- application/json — записи сериализуются orjson (если установлен) прямо из словарей,
+  без модели ответа pydantic и jsonable_encoder
+- application/msgpack — те же записи в MessagePack (пакет msgpack)
+- application/vnd.apache.arrow.stream, application/vnd.apache.parquet — колоночная выгрузка
+  (пакет pyarrow): строка на функцию, колонки файла повторяются в каждой строке,
+  повторяющиеся строки кодируются словарём
+Форматы, библиотека которых не установлена, не предлагаются: если клиент принимает только их,
+отвечаем 406. Тело ответа сжимается gzip или zstd (пакет zstandard), если клиент их принимает.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import io
+import json
+from typing import Any, Iterable, Optional
+
+from fastapi.responses import Response
+
+from src.config import ResponseConfig
+from src.models.function_description import FIELD_NAMES, FunctionDescription
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+COLUMNAR_MEDIA_TYPES = frozenset({ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE})
+
+_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.apache.arrow.file": ARROW_MEDIA_TYPE,
+    "application/x-parquet": PARQUET_MEDIA_TYPE,
+}
+_WILDCARDS = ("*/*", "application/*")
+
+# Ключи записи файла, которые не переходят в колонки: описания функций раскладываются по строкам
+_NESTED_KEYS = frozenset({"count", "functions", "scopes"})
+FILE_COLUMNS = ("file", "language", "content_hash", "error")
+# Строковые колонки с малым числом различных значений — словарное кодирование в Arrow
+_DICTIONARY_COLUMNS = frozenset({
+    "file", "language", "content_hash", "error", "mode", "base_hash",
+    "namespace", "class_name", "class_description", "visibility", "return_type",
+})
+# Parquet сжат сам по себе: повторное сжатие тела только тратит CPU
+_PRECOMPRESSED = frozenset({PARQUET_MEDIA_TYPE})
+
+
+class NotAcceptableError(ValueError):
+    """Клиент принимает только форматы, библиотеки которых не установлены."""
+
+
+def available_media_types() -> list[str]:
+    """Форматы ответа, которые можно отдать с установленными библиотеками."""
+    media_types = [JSON_MEDIA_TYPE]
+    if msgpack is not None:
+        media_types.append(MSGPACK_MEDIA_TYPE)
+    if pyarrow is not None:
+        media_types.extend((ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE))
+    return media_types
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Формат ответа по заголовку Accept: первый доступный по убыванию q.
+    Без заголовка, с */* или без известных форматов — JSON, как раньше;
+    NotAcceptableError — если перечислены только известные, но недоступные форматы.
+    """
+    available = available_media_types()
+    known = False
+    for value in _accept_values(accept):
+        if value in _WILDCARDS:
+            return JSON_MEDIA_TYPE
+        value = _ALIASES.get(value, value)
+        if value in available:
+            return value
+        known = known or value in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE)
+    if known:
+        raise NotAcceptableError(f"Supported response formats: {', '.join(available)}")
+    return JSON_MEDIA_TYPE
+
+
+def _accept_values(header: Optional[str]) -> list[str]:
+    """Значения заголовка Accept/Accept-Encoding по убыванию q; q=0 (запрет) отбрасывается."""
+    items: list[tuple[float, int, str]] = []
+    for i, part in enumerate((header or "").split(",")):
+        value, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, number = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        if value and q > 0:
+            items.append((-q, i, value.lower()))
+    return [value for _, _, value in sorted(items)]
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON в UTF-8: orjson, если установлен, иначе стандартный json."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # Одиночные суррогаты в строках orjson не кодирует, json — экранирует
+            return json.dumps(obj, separators=(",", ":")).encode("ascii")
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:
+        return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+def _field_kinds() -> dict[str, str]:
+    """Тип колонки по значению по умолчанию поля FunctionDescription: bool | int | list | str."""
+    kinds = {}
+    for f in dataclasses.fields(FunctionDescription):
+        if f.name not in FIELD_NAMES:
+            continue
+        default = f.default_factory() if f.default_factory is not dataclasses.MISSING else f.default
+        if isinstance(default, bool):
+            kinds[f.name] = "bool"
+        elif isinstance(default, int):
+            kinds[f.name] = "int"
+        elif isinstance(default, list):
+            kinds[f.name] = "list"
+        else:
+            kinds[f.name] = "str"
+    return kinds
+
+
+FIELD_KINDS: dict[str, str] = _field_kinds()
+
+
+def function_columns(results: Iterable[dict]) -> dict[str, list]:
+    """
+    Колонки выгрузки из записей файлов в плоской форме: строка на функцию. Колонки файла
+    (file, language, content_hash, error и прочие скалярные ключи записи) повторяются
+    в каждой строке; файл без функций или с ошибкой — одна строка с пустыми полями функции.
+    """
+    results = list(results)
+    file_columns = list(FILE_COLUMNS)
+    function_fields: dict[str, None] = {}
+    for record in results:
+        for key in record:
+            if key not in _NESTED_KEYS and key not in file_columns:
+                file_columns.append(key)
+        for fd in record.get("functions") or ():
+            function_fields.update(dict.fromkeys(fd))
+    # Порядок колонок функций — как у полей FunctionDescription; language уже есть у файла
+    fields = [name for name in FIELD_NAMES if name in function_fields and name not in file_columns]
+
+    columns: dict[str, list] = {name: [] for name in (*file_columns, *fields)}
+    for record in results:
+        functions = record.get("functions") or [{}]
+        for fd in functions:
+            for name in file_columns:
+                columns[name].append(record.get(name))
+            for name in fields:
+                columns[name].append(fd.get(name))
+    return columns
+
+
+def _arrow_table(results: Iterable[dict]) -> Any:
+    arrays = []
+    names = []
+    for name, values in function_columns(results).items():
+        kind = FIELD_KINDS.get(name, "str")
+        if kind == "bool":
+            array = pyarrow.array(values, type=pyarrow.bool_())
+        elif kind == "int":
+            array = pyarrow.array(values, type=pyarrow.int64())
+        elif kind == "list":
+            array = pyarrow.array(values, type=pyarrow.list_(pyarrow.string()))
+        else:
+            array = pyarrow.array(values, type=pyarrow.string())
+            if name in _DICTIONARY_COLUMNS:
+                array = array.dictionary_encode()
+        arrays.append(array)
+        names.append(name)
+    return pyarrow.Table.from_arrays(arrays, names=names)
+
+
+class ResponseEncoder:
+    """Тело ответа /extract в согласованном формате, сжатое по Accept-Encoding."""
+
+    def __init__(self, config: Optional[ResponseConfig] = None):
+        self.config = config or ResponseConfig()
+
+    def encode(self, media_type: str, results: list[dict]) -> bytes:
+        """Записи файлов results в формате media_type (значение из available_media_types)."""
+        if media_type == MSGPACK_MEDIA_TYPE:
+            return msgpack.packb({"results": results}, use_bin_type=True, unicode_errors="surrogatepass")
+        if media_type in COLUMNAR_MEDIA_TYPES:
+            table = _arrow_table(results)
+            sink = io.BytesIO()
+            if media_type == PARQUET_MEDIA_TYPE:
+                pyarrow.parquet.write_table(
+                    table, sink, row_group_size=self.config.arrow_batch_rows, compression="zstd"
+                )
+            else:
+                with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table, max_chunksize=self.config.arrow_batch_rows)
+            return sink.getvalue()
+        return dumps({"results": results})
+
+    def compress(self, body: bytes, accept_encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        """Сжатое тело и значение Content-Encoding; небольшие тела не сжимаются."""
+        if len(body) < self.config.compress_min_bytes:
+            return body, None
+        for value in _accept_values(accept_encoding):
+            if value in ("zstd", "*") and zstandard is not None:
+                return zstandard.ZstdCompressor(level=self.config.zstd_level).compress(body), "zstd"
+            if value in ("gzip", "x-gzip", "*"):
+                return gzip.compress(body, compresslevel=self.config.gzip_level, mtime=0), "gzip"
+        return body, None
+
+    def response(self, media_type: str, results: list[dict], accept_encoding: Optional[str]) -> Response:
+        body = self.encode(media_type, results)
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if media_type not in _PRECOMPRESSED:
+            body, encoding = self.compress(body, accept_encoding)
+            if encoding is not None:
+                headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=media_type, headers=headers)
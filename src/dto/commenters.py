@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 
 class CommentResponse(BaseModel):
@@ -8,6 +8,30 @@ class CommentResponse(BaseModel):
     comment: str = Field(..., description="Комментарий к функции")
 
 
+class ExtractResponse(BaseModel):
+    """Модель ответа с функциями, извлечёнными из загруженных файлов."""
+
+    results: List[Dict[str, Any]] = Field(..., description="Результат по каждому файлу")
+
+
+class IncrementalExtractRequest(BaseModel):
+    """Модель запроса инкрементального извлечения: базовая версия файла и правка к ней."""
+
+    file: str = Field(..., description="Имя файла; по расширению определяется язык")
+    base_hash: str = Field(..., description="content_hash базовой версии из ответа /extract")
+    diff: Optional[str] = Field(None, description="Unified diff от базовой версии к новой")
+    content: Optional[str] = Field(None, description="Новое содержимое файла целиком")
+    shape: Literal["flat", "normalized"] = Field(
+        "flat", description="Форма списка функций: flat или normalized (таблица scopes и ссылки на неё)"
+    )
+
+    @model_validator(mode="after")
+    def _diff_or_content(self) -> "IncrementalExtractRequest":
+        if (self.diff is None) == (self.content is None):
+            raise ValueError("Exactly one of 'diff' and 'content' must be provided")
+        return self
+
+
 class CommentRequest(BaseModel):
     """Модель запроса для создания комментариев к списку функций."""
 
@@ -28,6 +52,28 @@ class Choice(BaseModel):
     message: Message = Field(..., description="Сообщение ассистента")
     finish_reason: str = Field(..., description="Причина завершения генерации")
 
+class Delta(BaseModel):
+    """Приращение сообщения в потоковом ответе."""
+
+    role: Optional[str] = Field(None, description="Роль; только в первом фрагменте")
+    content: Optional[str] = Field(None, description="Очередной фрагмент текста")
+
+class ChunkChoice(BaseModel):
+    """Вариант в фрагменте потокового ответа."""
+
+    index: int = Field(..., description="Индекс выбора")
+    delta: Delta = Field(..., description="Приращение сообщения")
+    finish_reason: Optional[str] = Field(None, description="Причина завершения; только в последнем фрагменте")
+
+class GenerateChunk(BaseModel):
+    """Фрагмент потокового ответа на запрос генерации (событие SSE data:)."""
+
+    id: str = Field(..., description="Идентификатор запроса, общий для всех фрагментов")
+    object: str = Field(default="text_completion.chunk", description="Тип объекта")
+    created: int = Field(..., description="Время создания в Unix timestamp")
+    model: str = Field(..., description="Использованная модель")
+    choices: List[ChunkChoice] = Field(..., description="Фрагменты вариантов")
+
 class GenerateResponse(BaseModel):
     """Модель ответа на запрос генерации."""
     
@@ -48,3 +94,4 @@ class GenerateRequest(BaseModel):
     stop: Optional[List[str]] = Field(None, description="Список стоп-слов")
     seed: Optional[int] = Field(None, description="Сид для воспроизводимости")
     model: Optional[str] = Field(None, description="Название модели (игнорируется, используется текущая)")
+    stream: bool = Field(False, description="Отдавать комментарий по мере генерации (SSE, фрагменты GenerateChunk)")
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -8,10 +8,131 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="Статус сервиса")
     timestamp: datetime = Field(..., description="Время проверки")
 
+class BackendStats(BaseModel):
+    """Состояние одной реплики LLM бэкенда."""
+
+    url: str = Field(..., description="Адрес реплики")
+    state: str = Field(..., description="Состояние circuit breaker: closed, open или half_open")
+    healthy: Optional[bool] = Field(None, description="Результат последней проверки; null — не проверялась")
+    outstanding: int = Field(..., description="Незавершённых запросов к реплике")
+    requests_total: int = Field(..., description="Всего запросов к реплике")
+    failures_total: int = Field(..., description="Всего сбоев реплики")
+    consecutive_failures: int = Field(..., description="Сбоев подряд")
+    ejections_total: int = Field(..., description="Сколько раз реплика исключалась")
+
+class LLMClientStats(BaseModel):
+    """Статистика пула соединений к LLM бэкенду."""
+
+    started: bool = Field(..., description="Клиент создан и принимает запросы")
+    http2: bool = Field(..., description="Используется ли HTTP/2")
+    max_connections: int = Field(..., description="Лимит соединений пула")
+    max_keepalive_connections: int = Field(..., description="Лимит keep-alive соединений")
+    open_connections: int = Field(..., description="Открытых соединений сейчас")
+    idle_connections: int = Field(..., description="Простаивающих соединений")
+    active_connections: int = Field(..., description="Занятых соединений")
+    in_flight: int = Field(..., description="Запросов к бэкенду в процессе")
+    peak_in_flight: int = Field(..., description="Пиковое число одновременных запросов")
+    requests_total: int = Field(..., description="Всего запросов к бэкенду")
+    errors_total: int = Field(..., description="Всего ошибок запросов к бэкенду")
+    hedged_total: int = Field(..., description="Запросов, продублированных на другую реплику")
+    hedge_wins_total: int = Field(..., description="Дублей, ответивших раньше исходного запроса")
+    hedge_delay_ms: Optional[float] = Field(None, description="Текущая задержка дублирования; null — дублей нет")
+    backends: List[BackendStats] = Field(..., description="Реплики бэкенда")
+
+class ParseExecutorStats(BaseModel):
+    """Статистика исполнителя парсинга."""
+
+    mode: str = Field(..., description="Режим исполнителя (process/thread/inline)")
+    process_workers: int = Field(..., description="Процессов в пуле")
+    thread_workers: int = Field(..., description="Потоков в пуле")
+    queue_depth: int = Field(..., description="Задач в очереди пулов")
+    pending_thread: int = Field(..., description="Задач в очереди пула потоков")
+    pending_process: int = Field(..., description="Задач в очереди пула процессов")
+    completed_inline: int = Field(..., description="Файлов, распаршенных в обработчике")
+    completed_thread: int = Field(..., description="Файлов, распаршенных в пуле потоков")
+    completed_process: int = Field(..., description="Файлов, распаршенных в пуле процессов")
+
+class ParseCacheStats(BaseModel):
+    """Статистика кеша результатов парсинга."""
+
+    enabled: bool = Field(..., description="Кеш включён")
+    memory_hits: int = Field(..., description="Попаданий в память")
+    disk_hits: int = Field(..., description="Попаданий в дисковый уровень")
+    misses: int = Field(..., description="Промахов")
+    memory_evictions: int = Field(..., description="Вытеснений из памяти")
+    disk_evictions: int = Field(..., description="Вытеснений с диска")
+    memory_entries: int = Field(..., description="Записей в памяти")
+    memory_bytes: int = Field(..., description="Занято байт в памяти")
+    memory_max_bytes: int = Field(..., description="Лимит байт в памяти")
+    disk_enabled: bool = Field(..., description="Дисковый уровень подключён")
+
+class CommentCacheStats(BaseModel):
+    """Статистика кеша ответов LLM."""
+
+    enabled: bool = Field(..., description="Кеш включён")
+    memory_hits: int = Field(..., description="Попаданий в память")
+    disk_hits: int = Field(..., description="Попаданий в дисковый уровень")
+    misses: int = Field(..., description="Промахов")
+    expired: int = Field(..., description="Найдено просроченных записей")
+    shared: int = Field(..., description="Запросов, дождавшихся уже начатого вызова бэкенда")
+    in_flight: int = Field(..., description="Вызовов бэкенда, которые ждут несколько запросов")
+    memory_evictions: int = Field(..., description="Вытеснений из памяти")
+    disk_evictions: int = Field(..., description="Вытеснений с диска")
+    memory_entries: int = Field(..., description="Записей в памяти")
+    memory_bytes: int = Field(..., description="Занято байт в памяти")
+    memory_max_bytes: int = Field(..., description="Лимит байт в памяти")
+    disk_enabled: bool = Field(..., description="Дисковый уровень подключён")
+
+class GenerationBatcherStats(BaseModel):
+    """Статистика сборки запросов на генерацию в пакеты."""
+
+    enabled: bool = Field(..., description="Сборка пакетов включена")
+    started: bool = Field(..., description="Планировщик запущен")
+    mode: str = Field(..., description="Текущий режим: batch или per_item")
+    queue_depth: int = Field(..., description="Запросов в очереди сейчас")
+    max_queue: int = Field(..., description="Лимит очереди")
+    max_batch_size: int = Field(..., description="Лимит запросов в пакете")
+    max_wait_ms: float = Field(..., description="Ожидание наполнения пакета, мс")
+    in_flight_batches: int = Field(..., description="Пакетов, ждущих ответа бэкенда")
+    batches_total: int = Field(..., description="Всего отправлено пакетов")
+    items_total: int = Field(..., description="Всего запросов в пакетах")
+    avg_batch_size: float = Field(..., description="Средний размер пакета")
+    peak_batch_size: int = Field(..., description="Наибольший размер пакета")
+    avg_wait_ms: float = Field(..., description="Среднее ожидание в очереди, мс")
+    rejected_total: int = Field(..., description="Отказов из-за переполненной очереди")
+    fallbacks_total: int = Field(..., description="Переходов на per_item из-за бэкенда без пакетов")
+
+class AdmissionStats(BaseModel):
+    """Статистика допуска запросов /prompt к генерации."""
+
+    enabled: bool = Field(..., description="Ограничение включено")
+    algorithm: str = Field(..., description="Подстройка лимита: gradient, aimd или fixed")
+    limit: int = Field(..., description="Текущий лимит одновременных генераций")
+    min_limit: int = Field(..., description="Нижняя граница лимита")
+    max_limit: int = Field(..., description="Верхняя граница лимита")
+    in_flight: int = Field(..., description="Генераций сейчас")
+    queue_depth: int = Field(..., description="Запросов в очереди сейчас")
+    max_queue: int = Field(..., description="Лимит очереди")
+    peak_queue_depth: int = Field(..., description="Наибольшая длина очереди")
+    admitted_total: int = Field(..., description="Всего допущено запросов")
+    queued_total: int = Field(..., description="Всего запросов ждали в очереди")
+    rejected_total: int = Field(..., description="Отказов из-за полной очереди")
+    evicted_total: int = Field(..., description="Вытеснено более приоритетными запросами")
+    timed_out_total: int = Field(..., description="Отказов по времени ожидания в очереди")
+    avg_queue_wait_ms: float = Field(..., description="Среднее ожидание в очереди, мс")
+    latency_ms: Optional[float] = Field(None, description="Недавнее время генерации, мс")
+    baseline_latency_ms: Optional[float] = Field(None, description="Базовое время генерации, мс")
+    retry_after_s: int = Field(..., description="Текущая оценка Retry-After, сек.")
+
 class StatusResponse(BaseModel):
     """Модель ответа для проверки здоровья сервиса."""
 
     status: str = Field(..., description="Статус сервиса")
     timestamp: datetime = Field(..., description="Время проверки")
     supported_languages: List[str] = Field(..., description="Список поддерживаемых языков")
-
+    llm_client: Optional[LLMClientStats] = Field(None, description="Состояние пула соединений к LLM")
+    parse_executor: Optional[ParseExecutorStats] = Field(None, description="Состояние исполнителя парсинга")
+    parse_cache: Optional[ParseCacheStats] = Field(None, description="Состояние кеша результатов парсинга")
+    comment_cache: Optional[CommentCacheStats] = Field(None, description="Состояние кеша ответов LLM")
+    generation_batcher: Optional[GenerationBatcherStats] = Field(None, description="Состояние сборки пакетов генерации")
+    admission: Optional[AdmissionStats] = Field(None, description="Состояние допуска запросов к генерации")
@@ -1,10 +1,18 @@
 # src/main.py
-from typing import List
-from fastapi.responses import HTMLResponse
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI, Request
 import uvicorn
 
-from src.utils.logger import error_logger
+from src.config import AppConfig
+from src.core.admission import AdmissionController
+from src.core.comment_cache import CommentCache
+from src.core.generation_batcher import GenerationBatcher
+from src.core.llm_client import LLMClient
+from src.core.parse_cache import ParseCache
+from src.core.parse_executor import ParseExecutor
+from src.core.parser_factory import ParserFactory
+from src.utils.logger import configure_logging, error_logger, process_logger
 from src.api.health import HealthRoutes
 from src.api.commenters import CommentersRoutes
 from fastapi.responses import JSONResponse
@@ -14,19 +22,63 @@ def register_routes(app: FastAPI) -> None:
     """Создаёт инстансы роутов и регистрирует их в приложении."""
     app.state.logging_service = error_logger
     routes = [
-        HealthRoutes(app.state.logging_service),
-        CommentersRoutes(app.state.logging_service),
+        HealthRoutes(
+            app.state.logging_service,
+            llm_client=app.state.llm_client,
+            parse_executor=app.state.parse_executor,
+            parse_cache=app.state.parse_cache,
+            comment_cache=app.state.comment_cache,
+            generation_batcher=app.state.generation_batcher,
+            admission=app.state.admission,
+        ),
+        CommentersRoutes(
+            app.state.logging_service,
+            llm_client=app.state.llm_client,
+            parse_executor=app.state.parse_executor,
+            parse_cache=app.state.parse_cache,
+            parser_factory=app.state.parser_factory,
+            comment_cache=app.state.comment_cache,
+            generation_batcher=app.state.generation_batcher,
+            admission=app.state.admission,
+            archive_config=app.state.config.archive,
+            response_config=app.state.config.response,
+        ),
     ]
     for route in routes:
         app.include_router(route.get_router())
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="Function Extractor Service", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Поднимает общие ресурсы при старте и освобождает их при остановке."""
+    app.state.parser_factory.warm_up()
+    await app.state.parse_executor.start()
+    await app.state.llm_client.start()
+    await app.state.generation_batcher.start()
+    try:
+        yield
+    finally:
+        await app.state.generation_batcher.close()
+        await app.state.llm_client.close()
+        await app.state.parse_executor.close()
+        app.state.parse_cache.close()
+        app.state.comment_cache.close()
+
+def create_app(config: Optional[AppConfig] = None) -> FastAPI:
+    config = config or AppConfig()
+    configure_logging(config.logging)
+    app = FastAPI(title="Function Extractor Service", version="0.1.0", lifespan=lifespan)
+    app.state.config = config
+    app.state.llm_client = LLMClient(config.llm_client)
+    app.state.generation_batcher = GenerationBatcher(app.state.llm_client, config.generation_batch)
+    app.state.admission = AdmissionController(config.admission)
+    app.state.parser_factory = ParserFactory(config.parsers)
+    app.state.parse_executor = ParseExecutor(config.parse_executor, app.state.parser_factory)
+    app.state.parse_cache = ParseCache(config.parse_cache)
+    app.state.comment_cache = CommentCache(config.comment_cache)
 
     @app.exception_handler(400)
     async def bad_request_handler(request: Request, exc: Exception):
-        print(f"🔴 400 ERROR DETAILS: {exc}")
-        print(f"🔴 Full traceback:\n{traceback.format_exc()}")
+        process_logger.debug("400 error details: %s", exc)
         return JSONResponse(
             status_code=400,
             content={"detail": str(exc), "traceback": traceback.format_exc()}
@@ -1,8 +1,9 @@
 from .language import Language, LANGUAGE_PATTERNS
-from .function_description import FunctionDescription
+from .function_description import ClassDescription, FunctionDescription
 
 __all__ = [
     "Language",
     "LANGUAGE_PATTERNS",
+    "ClassDescription",
     "FunctionDescription",
 ]
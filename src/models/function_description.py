@@ -1,20 +1,141 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Iterable, Optional, Union
 
-@dataclass
+
+class SourceSpan:
+    """
+    Фрагмент общего исходного текста файла: ссылка на строку и смещения (в символах).
+    Все описания функций файла ссылаются на один и тот же исходник,
+    а текст вырезается только при обращении.
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source: str, start: int, end: int):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def __str__(self) -> str:
+        return self.source[self.start:self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"SourceSpan({self.start}, {self.end})"
+
+    def count(self, sub: str) -> int:
+        return self.source.count(sub, self.start, self.end)
+
+    def endswith(self, suffix: str) -> bool:
+        return self.source.endswith(suffix, self.start, self.end)
+
+
+class Deferred:
+    """
+    Значение поля, которое вычисляется при первом чтении: func(*args).
+    Парсер откладывает так дорогие поля (тексты, docstring, сигнатуру, параметры), которые
+    клиенту могут и не понадобиться. func не зависит от других полей описания, поэтому
+    проекция (FunctionDescription.project) может отбросить любое поле, не вычисляя его.
+    Результат запоминается: одно Deferred может быть общим для нескольких описаний
+    (например, комментарий класса у всех его методов).
+    """
+
+    __slots__ = ("func", "args", "_value")
+
+    _UNSET = object()
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+        self._value = Deferred._UNSET
+
+    def resolve(self) -> Any:
+        if self._value is Deferred._UNSET:
+            self._value = self.func(*self.args)
+            self.func, self.args = None, ()
+        return self._value
+
+    def then(self, func) -> Deferred:
+        """Значение, производное от этого: func(значение), тоже по требованию."""
+        return Deferred(_chain, self, func)
+
+
+def _chain(source: Deferred, func) -> Any:
+    return func(source.resolve())
+
+
+Text = Union[str, SourceSpan, Deferred, None]
+
+
+class _SpanText:
+    """
+    Дескриптор поля со значением по требованию: хранит str, SourceSpan или Deferred,
+    наружу отдаёт готовое значение (SourceSpan — как str, Deferred вычисляется один раз).
+    """
+
+    def __init__(self, slot):
+        self._slot = slot
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = self._slot.__get__(obj, owner)
+        if isinstance(value, Deferred):
+            value = value.resolve()
+            self._slot.__set__(obj, value)
+        return str(value) if isinstance(value, SourceSpan) else value
+
+    def __set__(self, obj, value: Text) -> None:
+        self._slot.__set__(obj, value)
+
+    def raw(self, obj) -> Text:
+        return self._slot.__get__(obj, type(obj))
+
+
+@dataclass(slots=True)
+class ClassDescription:
+    """
+    Класс (тип), в котором объявлены методы. Парсер создаёт одно описание на класс,
+    и все его методы ссылаются на него (FunctionDescription.class_info): комментарий
+    класса хранится и вычисляется один раз, а в нормализованной форме ответа
+    (to_normalized) попадает в таблицу scopes файла.
+    """
+    name: str                           # как class_name у методов
+    kind: str = "class"                 # class/interface/struct/enum/record/type/...
+    docstring: Text = None              # комментарий к классу
+    start_line: int = -1                # строки объявления; -1 — неизвестны (тип объявлен в другом файле)
+    end_line: int = -1
+
+    def without_docstring(self, memo: dict[int, ClassDescription]) -> ClassDescription:
+        """Копия без комментария (для проекций); memo — по одной копии на класс."""
+        copy = memo.get(id(self))
+        if copy is None:
+            copy = memo[id(self)] = ClassDescription(self.name, self.kind, None, self.start_line, self.end_line)
+        return copy
+
+    def __getstate__(self) -> list[Any]:
+        return [self.name, self.kind, self.docstring, self.start_line, self.end_line]
+
+    def __setstate__(self, state: list[Any]) -> None:
+        self.name, self.kind, self.docstring, self.start_line, self.end_line = state
+
+
+@dataclass(slots=True)
 class FunctionDescription:
     """Унифицированное описание функции/метода для всех парсеров."""
     language: str
 
-    # Тексты и длины текстов
-    full_function_text: str = None         # полный текст самой функции и комментарий к ней
-    function_text: str = None              # сама функция без комментария
-    docstring: Optional[str] = None        # комментарий к функции
+    # Тексты и длины текстов (str или SourceSpan; при чтении поля всегда str)
+    full_function_text: Text = None        # полный текст самой функции и комментарий к ней
+    function_text: Text = None             # сама функция без комментария
+    docstring: Text = None                 # комментарий к функции
     full_function_lines_length: int = 0    # число строк в коде, из которых состоит вся функция
     function_lines_length: int = 0         # число строк в коде, из которых состоит сама функция
-    docstring_lines_length: Optional[int] = 0  # число строк в коде, из которых состоит комментарий
-    
+    docstring_lines_length: Union[int, Deferred, None] = 0  # число строк в коде, из которых состоит комментарий
+
     # Идентификация
     name: str = None                    # имя функции
     qualified_name: str = None          # например: "A.m" или "foo"
@@ -24,15 +145,18 @@ class FunctionDescription:
     signature_text: str = ""               # "def f(a: int) -> int"
     return_type: Optional[str] = None
     parameters: list[str] = field(default_factory=list)        # список строк-параметров
-    
+
     # Позиция
     start_line: int = -1                     # номер строки в исходном файле с которого начинается функция
     end_line: int = -1
-    
+    start_column: int = -1                   # колонка (с 0, в символах) первого символа объявления
+    end_column: int = -1                     # колонка сразу за последним символом функции
+
     # Контекст
     is_method: bool = False
     class_name: Optional[str] = None
-    class_description: Optional[str] = None    # комментарий к классу, если есть
+    class_description: Text = None             # комментарий к классу, если есть
+    class_info: Optional[ClassDescription] = field(default=None, repr=False, compare=False)  # общее описание класса
 
     # Доп. атрибуты (универсальные)
     decorators: list[str] = field(default_factory=list)        # Python decorators / Java annotations
@@ -40,10 +164,196 @@ class FunctionDescription:
     visibility: Optional[str] = None    # public/private/protected/internal/...
     has_body: bool = True                                 # для прототипов/abstract/interface
     is_constructor: bool = False
+    parse_error: Optional[str] = None                     # синтаксическая ошибка, если функция описана только по тексту
+
+    def span(self, name: str) -> Optional[SourceSpan]:
+        """SourceSpan текстового поля, если оно не материализовано."""
+        value = _SPAN_FIELDS[name].raw(self)
+        return value if isinstance(value, SourceSpan) else None
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> dict[str, Any]:
+        """
+        Словарь полей для сериализации в ответ/кеш (как asdict: списки копируются).
+        fields — только эти поля (в порядке объявления); остальные не вычисляются.
+        """
+        names = FIELD_NAMES if fields is None else [n for n in FIELD_NAMES if n in fields]
+        result = {}
+        for name in names:
+            value = getattr(self, name)
+            result[name] = list(value) if isinstance(value, list) else value
+        return result
+
+    def project(
+        self, fields: Iterable[str], classes: Optional[dict[int, ClassDescription]] = None
+    ) -> FunctionDescription:
+        """
+        Копия, в которой заполнены только поля fields, остальные — по умолчанию.
+        Значения берутся как есть: спаны и отложенные поля не вычисляются, а неотобранные
+        отбрасываются, не будучи вычисленными. language без значения по умолчанию — None.
+        class_info остаётся, если запрошен класс; без class_description — копия без комментария,
+        одна на класс в пределах classes (общего для описаний одного файла).
+        """
+        keep = set(fields)
+        projected = object.__new__(FunctionDescription)
+        for name in FIELD_NAMES:
+            if name in keep:
+                value = _SPAN_FIELDS[name].raw(self) if name in _SPAN_FIELDS else getattr(self, name)
+            else:
+                default = _DEFAULTS.get(name)
+                value = default() if callable(default) else default
+            setattr(projected, name, value)
+        info = self.class_info
+        if info is not None and not keep.isdisjoint(_CLASS_FIELDS):
+            if "class_description" not in keep:
+                info = info.without_docstring({} if classes is None else classes)
+            projected.class_info = info
+        else:
+            projected.class_info = None
+        return projected
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> FunctionDescription:
+        """
+        Восстановить описание из словаря, полученного через to_dict.
+        Словарь проекции (to_dict(fields)) дополняется значениями по умолчанию, language — None.
+        """
+        if "language" not in data:
+            data = {"language": None, **data}
+        return cls(**data)
+
+    def __getstate__(self) -> list[Any]:
+        # Спаны уходят как есть: pickle сохраняет общий исходник один раз на весь список описаний;
+        # отложенные поля вычисляются
+        state = []
+        for name in FIELD_NAMES:
+            value = _SPAN_FIELDS[name].raw(self) if name in _SPAN_FIELDS else None
+            state.append(value if isinstance(value, SourceSpan) else getattr(self, name))
+        state.append(self.class_info)
+        return state
+
+    def __setstate__(self, state: list[Any]) -> None:
+        for name, value in zip(FIELD_NAMES, state):
+            setattr(self, name, value)
+        self.class_info = state[len(FIELD_NAMES)] if len(state) > len(FIELD_NAMES) else None
 
     def to_string(self) -> str:
         """Сигнатура как строка"""
         params = ", ".join(self.parameters)
         if self.return_type:
             return f"{self.return_type} {self.name}({params})"
-        return f"{self.name}({params})"
\ No newline at end of file
+        return f"{self.name}({params})"
+
+
+# Поверх слотов текстовых и отложенных полей ставим дескрипторы, материализующие значения
+_SPAN_FIELDS: dict[str, _SpanText] = {}
+for _name in (
+    "full_function_text", "function_text", "docstring", "docstring_lines_length",
+    "signature_text", "return_type", "parameters", "class_description", "decorators",
+):
+    _SPAN_FIELDS[_name] = _SpanText(FunctionDescription.__dict__[_name])
+    setattr(FunctionDescription, _name, _SPAN_FIELDS[_name])
+ClassDescription.docstring = _SpanText(ClassDescription.__dict__["docstring"])
+del _name
+
+# Имена полей в порядке объявления (допустимые значения fields в to_dict/project);
+# class_info — ссылка на общее описание класса, в плоский словарь не входит
+FIELD_NAMES: tuple[str, ...] = tuple(f.name for f in fields(FunctionDescription) if f.name != "class_info")
+
+# Поля функции, которые в нормализованной форме заменяются ссылками на таблицу scopes
+_CLASS_FIELDS = frozenset({"class_name", "class_description"})
+_SCOPE_FIELDS = _CLASS_FIELDS | {"namespace"}
+
+# Значения по умолчанию: фабрика для списков, иначе само значение
+_DEFAULTS: dict[str, Any] = {
+    f.name: f.default_factory if f.default_factory is not MISSING else f.default
+    for f in fields(FunctionDescription)
+    if f.default is not MISSING or f.default_factory is not MISSING
+}
+
+
+def to_normalized(
+    functions: Iterable[FunctionDescription], fields: Optional[Iterable[str]] = None
+) -> dict[str, Any]:
+    """
+    Нормализованная форма описаний функций одного файла: таблица scopes (классы и пространства
+    имён: id, kind, name, docstring, start_line, end_line) и функции, которые ссылаются на неё
+    по class_id и namespace_id вместо class_name/class_description/namespace. Комментарий класса
+    попадает в ответ один раз, а не в каждый метод. fields — как в FunctionDescription.to_dict.
+    """
+    keep = None if fields is None else set(fields)
+    with_class = keep is None or not keep.isdisjoint(_CLASS_FIELDS)
+    with_doc = keep is None or "class_description" in keep
+    with_namespace = keep is None or "namespace" in keep
+    names = [n for n in FIELD_NAMES if n not in _SCOPE_FIELDS and (keep is None or n in keep)]
+
+    scopes: list[dict[str, Any]] = []
+    ids: dict[tuple, int] = {}
+
+    def scope_id(key: tuple, kind: str, name: str, docstring: Optional[str], start: int, end: int) -> int:
+        found = ids.get(key)
+        if found is None:
+            found = ids[key] = len(scopes)
+            row = {"id": found, "kind": kind, "name": name}
+            if with_doc:
+                row["docstring"] = docstring
+            row["start_line"], row["end_line"] = start, end
+            scopes.append(row)
+        return found
+
+    items = []
+    for fd in functions:
+        item = {}
+        for name in names:
+            value = getattr(fd, name)
+            item[name] = list(value) if isinstance(value, list) else value
+        if with_class:
+            class_id = None
+            info = fd.class_info
+            if info is not None:
+                class_id = scope_id(
+                    ("class", info.name, info.kind, info.start_line, info.end_line),
+                    info.kind, info.name, info.docstring if with_doc else None, info.start_line, info.end_line,
+                )
+            elif fd.class_name is not None:
+                # Парсер не знает объявления класса: строка по имени, без позиции
+                class_id = scope_id(
+                    ("class", fd.class_name), "class", fd.class_name,
+                    fd.class_description if with_doc else None, -1, -1,
+                )
+            item["class_id"] = class_id
+        if with_namespace:
+            namespace = fd.namespace
+            item["namespace_id"] = (
+                scope_id(("namespace", namespace), "namespace", namespace, None, -1, -1)
+                if namespace is not None else None
+            )
+        items.append(item)
+    return {"scopes": scopes, "functions": items}
+
+
+def from_normalized(data: dict[str, Any]) -> list[FunctionDescription]:
+    """Описания функций из нормализованной формы (to_normalized); методы одного класса делят class_info."""
+    classes: dict[int, ClassDescription] = {}
+    namespaces: dict[int, str] = {}
+    for row in data.get("scopes", []):
+        if row["kind"] == "namespace":
+            namespaces[row["id"]] = row["name"]
+        else:
+            classes[row["id"]] = ClassDescription(
+                row["name"], row["kind"], row.get("docstring"), row["start_line"], row["end_line"]
+            )
+
+    functions = []
+    for item in data["functions"]:
+        item = dict(item)
+        class_id = item.pop("class_id", None)
+        namespace_id = item.pop("namespace_id", None)
+        fd = FunctionDescription.from_dict(item)
+        if class_id is not None:
+            info = fd.class_info = classes[class_id]
+            fd.class_name = info.name
+            fd.class_description = info.docstring
+        if namespace_id is not None:
+            fd.namespace = namespaces[namespace_id]
+        functions.append(fd)
+    return functions
@@ -1,44 +1,39 @@
 """
 Parsers module - парсеры для разных языков программирования
+
+Модули парсеров импортируются лениво, при первом обращении к классу:
+tree-sitter/libclang и прочие тяжёлые зависимости не грузятся,
+пока парсер соответствующего языка не понадобился.
 """
 
+from importlib import import_module
+
 from src.parsers.base_parser import BaseParser
-from src.parsers.python_parser import PythonParser
-
-try:
-    from src.parsers.csharp_parser import CSharpParser
-except ImportError:
-    CSharpParser = None
-
-try:
-    from src.parsers.c_parser import CParser
-except ImportError:
-    CParser = None
-
-try:
-    from src.parsers.cpp_parser import CppParser
-except ImportError:
-    CppParser = None
-
-try:
-    from src.parsers.go_parser import GoParser
-except ImportError:
-    GoParser = None
-
-try:
-    from src.parsers.java_parser import JavaParser
-except ImportError:
-    JavaParser = None
-
-try:
-    from src.parsers.javascript_parser import JavaScriptParser
-except ImportError:
-    JavaScriptParser = None
-
-try:
-    from src.parsers.prompt_parser import PromptParser
-except ImportError:
-    PromptParser = None
+
+_LAZY_PARSERS = {
+    "PythonParser": "src.parsers.python_parser",
+    "CSharpParser": "src.parsers.csharp_parser",
+    "CParser": "src.parsers.c_parser",
+    "CppParser": "src.parsers.cpp_parser",
+    "GoParser": "src.parsers.go_parser",
+    "JavaParser": "src.parsers.java_parser",
+    "JavaScriptParser": "src.parsers.javascript_parser",
+    "PromptParser": "src.parsers.prompt_parser",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_PARSERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        parser_cls = getattr(import_module(module_name), name)
+    except (ImportError, AttributeError):
+        # Парсер не реализован или не установлена его зависимость
+        parser_cls = None
+    globals()[name] = parser_cls
+    return parser_cls
+
 
 __all__ = [
     "BaseParser",
@@ -50,4 +45,4 @@ __all__ = [
     "JavaParser",
     "JavaScriptParser",
     "PromptParser",
-]
\ No newline at end of file
+]
@@ -1,15 +1,58 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable, Optional
 from src.models.function_description import FunctionDescription
 
+if TYPE_CHECKING:
+    from src.config import ParserFactoryConfig
+
 class BaseParser(ABC):
     """Базовый интерфейс парсера языка."""
 
+    # Версия логики извлечения. Входит в ключ кеша результатов,
+    # поэтому её нужно повышать при любом изменении выходных данных парсера.
+    VERSION: str = "1"
+
+    # Можно ли один экземпляр вызывать из нескольких потоков одновременно.
+    # Парсеры с нативным состоянием (tree-sitter Parser, libclang Index)
+    # выставляют False и получают по экземпляру на поток.
+    THREAD_SAFE: bool = True
+
+    @classmethod
+    def from_config(cls, config: ParserFactoryConfig) -> BaseParser:
+        """Экземпляр для реестра парсеров; парсеры с настройками берут из config свою секцию."""
+        return cls()
+
     @abstractmethod
     def parse_content(self, content: str) -> list[FunctionDescription]:
         """Вернуть список строк (каждая строка — выделенная функция/метод)."""
         raise NotImplementedError
 
+    def reparse(
+        self, old_content: str, old_functions: list[FunctionDescription], new_content: str
+    ) -> list[FunctionDescription]:
+        """
+        Разбор новой версии файла по известному результату старой (old_functions = parse_content(old_content)).
+        По умолчанию — полный разбор; парсеры с инкрементальным режимом разбирают заново
+        только затронутый правкой участок, а остальные описания сдвигают на месте —
+        old_functions после вызова принадлежат результату.
+        """
+        return self.parse_content(new_content)
+
+    def extract(self, content: str, fields: Optional[Iterable[str]] = None) -> list[FunctionDescription]:
+        """
+        Полный parse_content, затем проекция на поля fields (FunctionDescription.project).
+        Разбор файла от fields не зависит; экономия — в отложенных полях (тексты, docstring,
+        сигнатуры), которые для неотобранных полей так и не вычисляются, и в том, что
+        из воркера в процесс приложения передаются только отобранные поля.
+        Парсеры, умеющие пропускать работу по fields (CppParser), переопределяют метод.
+        """
+        functions = self.parse_content(content)
+        if fields is None:
+            return functions
+        classes: dict = {}
+        return [fd.project(fields, classes) for fd in functions]
+
 
 
 # from abc import ABC, abstractmethod
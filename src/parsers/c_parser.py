@@ -1,4 +1,10 @@
-# from parsers.cpp_parser import CppParser
-# class CParser(CppParser):
-#     """Парсер для C (наследует от CppParser)"""
-#     pass
+from src.models import Language
+from src.parsers.cpp_parser import CppParser
+
+
+class CParser(CppParser):
+    """Парсер для C: тот же обход libclang, но исходник разбирается как C."""
+
+    LANGUAGE = str(Language.C)
+    FILENAME = "input.c"
+    ARGS = ("-x", "c", "-std=c11", "-nostdinc", "-fparse-all-comments", "-w")
@@ -1,58 +1,293 @@
-# from abc import abstractmethod
-# from dataclasses import dataclass
-# from clang.cindex import Index, CursorKind
-
-# from src.parsers.base_parser import BaseParser, FunctionSignature
-
-# class CppParser(BaseParser):
-#     """Парсер для C++ с использованием libclang"""
-    
-#     def __init__(self):
-#         if not LIBCLANG_AVAILABLE:
-#             raise RuntimeError("libclang-py не установлен")
-    
-#     def parse(self, file_path: str) -> list[FunctionSignature]:
-#         """Парсить C++ файл"""
-#         index = Index.create()
-#         translation_unit = index.parse(file_path)
-#         return self._extract_functions(translation_unit.cursor)
-    
-#     def parse_content(self, content: str) -> list[FunctionSignature]:
-#         """Парсить C++ код (требует временный файл)"""
-#         import tempfile
-#         with tempfile.NamedTemporaryFile(suffix='.cpp', mode='w', delete=False) as f:
-#             f.write(content)
-#             f.flush()
-#             return self.parse(f.name)
-    
-#     def _extract_functions(self, cursor) -> list[FunctionSignature]:
-#         """Рекурсивно извлечь функции из AST"""
-#         signatures = []
-        
-#         for child in cursor.get_children():
-#             if child.kind == CursorKind.FUNCTION_DECL:
-#                 sig = self._create_signature(child)
-#                 signatures.append(sig)
-#             elif child.kind == CursorKind.CXX_METHOD:
-#                 sig = self._create_signature(child, is_method=True)
-#                 signatures.append(sig)
-#             else:
-#                 signatures.extend(self._extract_functions(child))
-        
-#         return signatures
-    
-#     def _create_signature(self, cursor, is_method=False) -> FunctionSignature:
-#         """Создать сигнатуру функции из курсора Clang"""
-#         params = []
-#         for token in cursor.get_tokens():
-#             if token.kind.name == 'IDENTIFIER':
-#                 # Упрощенная обработка параметров
-#                 pass
-        
-#         return FunctionSignature(
-#             name=cursor.spelling,
-#             return_type=cursor.result_type.spelling,
-#             parameters=params,
-#             line_number=cursor.location.line,
-#             is_method=is_method
-#         )
\ No newline at end of file
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, Optional
+
+from src.models import Language
+from src.models.function_description import ClassDescription, Deferred, FunctionDescription, SourceSpan
+from src.parsers.base_parser import BaseParser
+from src.parsers.tree_sitter_engine import SourceText, clean_comment, collapse_whitespace, line_count, signature_text
+
+try:
+    from clang.cindex import (
+        AccessSpecifier, CursorKind, Index, StorageClass, TranslationUnit, TranslationUnitLoadError, TypeKind,
+    )
+    LIBCLANG_AVAILABLE = True
+except ImportError:
+    LIBCLANG_AVAILABLE = False
+
+if LIBCLANG_AVAILABLE:
+    _FUNCTION_KINDS = frozenset({
+        CursorKind.FUNCTION_DECL, CursorKind.CXX_METHOD, CursorKind.CONSTRUCTOR,
+        CursorKind.DESTRUCTOR, CursorKind.CONVERSION_FUNCTION, CursorKind.FUNCTION_TEMPLATE,
+    })
+    _CLASS_KINDS = frozenset({
+        CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL, CursorKind.UNION_DECL,
+        CursorKind.CLASS_TEMPLATE, CursorKind.CLASS_TEMPLATE_PARTIAL_SPECIALIZATION,
+    })
+    _CLASS_KIND_NAMES = {CursorKind.STRUCT_DECL: "struct", CursorKind.UNION_DECL: "union"}
+    # Области, в которые спускается обход: пространства имён, extern "C" и тела классов
+    _SCOPE_KINDS = _CLASS_KINDS | {CursorKind.NAMESPACE, CursorKind.LINKAGE_SPEC}
+    _VISIBILITY = {
+        AccessSpecifier.PUBLIC: "public",
+        AccessSpecifier.PROTECTED: "protected",
+        AccessSpecifier.PRIVATE: "private",
+    }
+    _ATTRIBUTE_MODIFIERS = {
+        CursorKind.CXX_OVERRIDE_ATTR: "override",
+        CursorKind.CXX_FINAL_ATTR: "final",
+    }
+
+# Спецификаторы перед типом результата; в modifiers попадают как есть
+_SPECIFIERS = frozenset({
+    "static", "inline", "virtual", "explicit", "extern", "constexpr", "consteval", "friend",
+})
+_ATTRIBUTE_RE = re.compile(r"\[\[.*?\]\]|__attribute__\s*\(\(.*?\)\)|__declspec\s*\(.*?\)", re.DOTALL)
+# Квалификатор имени у внеклассового определения: `Widget::` в `int Widget::count()`
+_QUALIFIER_RE = re.compile(r"(?:[\w~]+\s*(?:<[^;{}]*?>)?\s*::\s*)+$")
+# Поля, которые зависят от тел функций; если ни одно не запрошено, тела не разбираются
+BODY_FIELDS = frozenset({
+    "full_function_text", "function_text", "full_function_lines_length", "function_lines_length",
+    "end_line", "end_column", "signature_text", "has_body",
+})
+
+
+class CppParser(BaseParser):
+    """
+    C++-парсер на libclang:
+    - Код передаётся в libclang через unsaved_files, без временных файлов
+    - Один Index на экземпляр; экземпляры не потокобезопасны (THREAD_SAFE = False),
+      поэтому ParserFactory держит по Index на поток/воркер
+    - Системные заголовки не подключаются (-nostdinc): неизвестные типы не мешают найти объявления,
+      а тип результата и параметры берутся срезом исходника, а не из семантики clang
+    - Обходятся только верхний уровень, пространства имён, extern "C" и тела классов
+    - Тексты функций — срезы исходника по extent курсора
+    - extract() без полей из BODY_FIELDS разбирает файл с PARSE_SKIP_FUNCTION_BODIES
+    """
+
+    VERSION = "2"
+    THREAD_SAFE = False
+    LANGUAGE = str(Language.CPP)
+    FILENAME = "input.cpp"
+    ARGS: tuple[str, ...] = (
+        "-x", "c++", "-std=c++17", "-nostdinc", "-nostdinc++", "-fparse-all-comments", "-w",
+    )
+    SCOPE_SEPARATOR = "::"
+
+    def __init__(self):
+        if not LIBCLANG_AVAILABLE:
+            raise NotImplementedError("libclang is not installed")
+        self._index = Index.create()
+
+    def parse_content(self, content: str) -> list[FunctionDescription]:
+        return self._parse(content, TranslationUnit.PARSE_INCOMPLETE)
+
+    def extract(self, content: str, fields: Optional[Iterable[str]] = None) -> list[FunctionDescription]:
+        """
+        Как BaseParser.extract, но если запрошенные поля не зависят от тел функций,
+        libclang их пропускает (PARSE_SKIP_FUNCTION_BODIES) — тела не разбираются вовсе.
+        """
+        if fields is None:
+            return self.parse_content(content)
+        fields = list(fields)
+        if not BODY_FIELDS.isdisjoint(fields):
+            return super().extract(content, fields)
+        functions = self._parse(
+            content, TranslationUnit.PARSE_INCOMPLETE | TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+        )
+        classes: dict = {}
+        return [fd.project(fields, classes) for fd in functions]
+
+    def _parse(self, content: str, options: int) -> list[FunctionDescription]:
+        source = SourceText(content)
+        try:
+            tu = self._index.parse(
+                self.FILENAME,
+                args=list(self.ARGS),
+                unsaved_files=[(self.FILENAME, source.data)],
+                options=options,
+            )
+        except TranslationUnitLoadError:
+            return []
+
+        functions: list[FunctionDescription] = []
+        self._collect(source, tu.cursor, functions, {})
+        return functions
+
+    def _collect(
+        self, source: SourceText, scope: Any, out: list[FunctionDescription], classes: dict[int, ClassDescription]
+    ) -> None:
+        """Функции области scope; classes — общие описания классов файла по cursor.hash."""
+        for cursor in scope.get_children():
+            location = cursor.location
+            if location.file is None or location.file.name != self.FILENAME:
+                continue
+            if cursor.kind in _FUNCTION_KINDS:
+                out.append(self._describe(source, cursor, classes))
+            elif cursor.kind in _SCOPE_KINDS:
+                self._collect(source, cursor, out, classes)
+
+    def _describe(
+        self, source: SourceText, cursor: Any, classes: dict[int, ClassDescription]
+    ) -> FunctionDescription:
+        content = source.text
+        index = source.index
+        extent = cursor.extent
+        decl_start = self._offset(source, extent.start)
+        end = self._offset(source, extent.end)
+        name_offset = self._offset(source, cursor.location)
+
+        docstring, comment_start = self._leading_doc(content, cursor.raw_comment, decl_start)
+        first = comment_start if comment_start is not None else decl_start
+        start = index.line_start(first)
+        if content[start:first].strip():
+            start = first
+
+        body = next((c for c in cursor.get_children() if c.kind == CursorKind.COMPOUND_STMT), None)
+        body_start = self._offset(source, body.extent.start) if body is not None else end
+
+        full_text = SourceSpan(content, start, end)
+        function_text = SourceSpan(content, decl_start, end)
+        prefix, decorators = self._prefix(content[decl_start:name_offset])
+        modifiers = [word for word in prefix.split() if word in _SPECIFIERS]
+        is_constructor = cursor.kind == CursorKind.CONSTRUCTOR
+        return_type = None
+        if cursor.kind not in (CursorKind.CONSTRUCTOR, CursorKind.DESTRUCTOR, CursorKind.CONVERSION_FUNCTION):
+            return_type = collapse_whitespace(
+                " ".join(word for word in prefix.split() if word not in _SPECIFIERS)
+            ) or None
+
+        if cursor.kind in (CursorKind.CXX_METHOD, CursorKind.FUNCTION_TEMPLATE):
+            if cursor.is_static_method() and "static" not in modifiers:
+                modifiers.append("static")
+            if cursor.is_const_method():
+                modifiers.append("const")
+            if cursor.is_pure_virtual_method():
+                modifiers.append("pure")
+        elif cursor.storage_class == StorageClass.STATIC and "static" not in modifiers:
+            modifiers.append("static")
+        modifiers.extend(_ATTRIBUTE_MODIFIERS[c.kind] for c in cursor.get_children() if c.kind in _ATTRIBUTE_MODIFIERS)
+
+        scopes, namespaces = self._scopes(cursor)
+        class_name = self.SCOPE_SEPARATOR.join(c.spelling for c in scopes) or None
+        class_info = self._class_info(class_name, scopes[-1], classes) if scopes else None
+        name = cursor.spelling
+        start_line, start_column = index.position(first)
+        end_line, end_column = index.position(end)
+
+        return FunctionDescription(
+            language=self.LANGUAGE,
+            full_function_text=full_text,
+            function_text=function_text,
+            docstring=docstring,
+            full_function_lines_length=full_text.count("\n") + 1,
+            function_lines_length=function_text.count("\n") + 1,
+            docstring_lines_length=docstring.then(line_count) if docstring else None,
+            name=name,
+            qualified_name=f"{class_name}{self.SCOPE_SEPARATOR}{name}" if class_name else name,
+            namespace=self.SCOPE_SEPARATOR.join(namespaces) or None,
+            signature_text=Deferred(signature_text, content, decl_start, body_start),
+            return_type=return_type,
+            parameters=self._parameters(source, cursor),
+            start_line=start_line,
+            end_line=end_line,
+            start_column=start_column,
+            end_column=end_column,
+            is_method=class_name is not None,
+            class_name=class_name,
+            class_description=ClassDescription.docstring.raw(class_info) if class_info is not None else None,
+            class_info=class_info,
+            decorators=decorators,
+            modifiers=modifiers,
+            visibility=_VISIBILITY.get(cursor.access_specifier) if class_name else None,
+            has_body=cursor.is_definition(),
+            is_constructor=is_constructor,
+        )
+
+    def _class_info(self, name: str, cls: Any, classes: dict[int, ClassDescription]) -> ClassDescription:
+        """Общее описание класса cls, одно на класс файла; позиция — если класс объявлен в этом файле."""
+        info = classes.get(cls.hash)
+        if info is None:
+            raw = cls.raw_comment
+            in_file = cls.location.file is not None and cls.location.file.name == self.FILENAME
+            info = classes[cls.hash] = ClassDescription(
+                name=name,
+                kind=_CLASS_KIND_NAMES.get(cls.kind, "class"),
+                docstring=Deferred(clean_comment, raw) if raw else None,
+                start_line=cls.extent.start.line if in_file else -1,
+                end_line=cls.extent.end.line if in_file else -1,
+            )
+        return info
+
+    @staticmethod
+    def _offset(source: SourceText, location: Any) -> int:
+        return source.offset(location.offset, (location.line - 1, location.column - 1))
+
+    @staticmethod
+    def _leading_doc(content: str, raw: Optional[str], decl_start: int) -> tuple[Optional[Deferred], Optional[int]]:
+        """
+        Комментарий clang к объявлению, если он стоит непосредственно над ним (без пустой строки).
+        clang переносит документацию между повторными объявлениями — такую не берём.
+        """
+        if not raw:
+            return None, None
+        comment_start = content.rfind(raw, 0, decl_start)
+        if comment_start == -1:
+            return None, None
+        gap = content[comment_start + len(raw):decl_start]
+        if gap.strip() or gap.count("\n") > 1:
+            return None, None
+        return Deferred(clean_comment, raw), comment_start
+
+    @staticmethod
+    def _prefix(text: str) -> tuple[str, list[str]]:
+        """
+        Текст от начала объявления до имени без template<...>, атрибутов и квалификатора `A::`.
+        Возвращает остаток (спецификаторы и тип результата) и атрибуты.
+        """
+        text = text.strip()
+        while text.startswith("template"):
+            depth, i = 0, len("template")
+            while i < len(text):
+                if text[i] == "<":
+                    depth += 1
+                elif text[i] == ">":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            text = text[i + 1:].lstrip()
+        decorators = [collapse_whitespace(m.group()) for m in _ATTRIBUTE_RE.finditer(text)]
+        text = _ATTRIBUTE_RE.sub(" ", text)
+        text = _QUALIFIER_RE.sub("", text.rstrip())
+        return text, decorators
+
+    @staticmethod
+    def _parameters(source: SourceText, cursor: Any) -> list[str]:
+        content = source.text
+        params = []
+        # У шаблонов функций get_arguments пуст: параметры — дочерние PARM_DECL
+        args = list(cursor.get_arguments()) or [c for c in cursor.get_children() if c.kind == CursorKind.PARM_DECL]
+        for arg in args:
+            start = CppParser._offset(source, arg.extent.start)
+            end = CppParser._offset(source, arg.extent.end)
+            params.append(collapse_whitespace(content[start:end]))
+        if cursor.type.kind == TypeKind.FUNCTIONPROTO and cursor.type.is_function_variadic():
+            params.append("...")
+        return params
+
+    @staticmethod
+    def _scopes(cursor: Any) -> tuple[list[Any], list[str]]:
+        """Классы и пространства имён, к которым относится функция, от внешних к внутренним."""
+        classes: list[Any] = []
+        namespaces: list[str] = []
+        parent = cursor.semantic_parent
+        while parent is not None and parent.kind != CursorKind.TRANSLATION_UNIT:
+            if parent.kind in _CLASS_KINDS:
+                classes.append(parent)
+            elif parent.kind == CursorKind.NAMESPACE and parent.spelling:
+                namespaces.append(parent.spelling)
+            parent = parent.semantic_parent
+        classes.reverse()
+        namespaces.reverse()
+        return classes, namespaces
@@ -1,49 +1,134 @@
-# try:
-#     import tree_sitter
-#     from tree_sitter import Language, Parser
-#     TREE_SITTER_AVAILABLE = True
-# except ImportError:
-#     TREE_SITTER_AVAILABLE = False
-
-# class TreeSitterParser(BaseParser):
-#     """Базовый класс для парсеров на Tree-Sitter"""
-    
-#     LANGUAGE_LIB = None  # Переопределить в подклассе
-    
-#     def __init__(self):
-#         if not TREE_SITTER_AVAILABLE:
-#             raise RuntimeError("tree-sitter не установлен")
-#         self.parser = Parser()
-#         self.language = Language(self.LANGUAGE_LIB)
-#         self.parser.set_language(self.language)
-    
-#     def parse(self, file_path: str) -> list[FunctionSignature]:
-#         """Парсить файл"""
-#         with open(file_path, 'rb') as f:
-#             content = f.read()
-#         return self.parse_content(content.decode('utf-8'))
-    
-#     def parse_content(self, content: str) -> list[FunctionSignature]:
-#         """Парсить содержимое"""
-#         tree = self.parser.parse(content.encode('utf-8'))
-#         return self._extract_functions(tree.root_node)
-    
-#     def _extract_functions(self, node) -> list[FunctionSignature]:
-#         """Переопределить в подклассах"""
-#         return []
-
-# class GoParser(TreeSitterParser):
-#     """Парсер для Go"""
-#     LANGUAGE_LIB = "build/my-languages.so"  # Путь к скомпилированной библиотеке
-
-# class JavaParser(TreeSitterParser):
-#     """Парсер для Java"""
-#     LANGUAGE_LIB = "build/my-languages.so"
-
-# class JavaScriptParser(TreeSitterParser):
-#     """Парсер для JavaScript"""
-#     LANGUAGE_LIB = "build/my-languages.so"
-
-# class CSharpParser(TreeSitterParser):
-#     """Парсер для C#"""
-#     LANGUAGE_LIB = "build/my-languages.so"
\ No newline at end of file
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from src.models import Language
+from src.models.function_description import ClassDescription, FunctionDescription
+from src.parsers.tree_sitter_engine import SourceText, TreeSitterParser, collapse_whitespace
+
+_TYPE_NODES = frozenset({
+    "class_declaration", "struct_declaration", "interface_declaration",
+    "record_declaration", "record_struct_declaration",
+})
+_ACCESS_MODIFIERS = ("public", "protected", "internal", "private")
+
+
+class CSharpParser(TreeSitterParser):
+    """
+    C#-парсер на tree-sitter:
+    - Методы, конструкторы, деструкторы и локальные функции
+    - Вложенные типы дают квалифицированное имя класса (Outer.Inner), пространства имён — namespace
+      (включая file-scoped `namespace X;`)
+    - XML-документация /// над объявлением — в docstring, атрибуты — в decorators
+    """
+
+    GRAMMAR = "csharp"
+    LANGUAGE = str(Language.CSHARP)
+    DOC_PREFIXES = ("///", "//", "/**")
+    SHARED_NODES = frozenset({"file_scoped_namespace_declaration"})
+    CONTAINER_NODES = {"namespace_declaration": "body"}
+    QUERY = """
+        (file_scoped_namespace_declaration name: (_) @namespace)
+        (method_declaration name: (identifier) @name) @function
+        (constructor_declaration name: (identifier) @name) @function
+        (destructor_declaration name: (identifier) @name) @function
+        (local_function_statement name: (identifier) @name) @function
+    """
+
+    def _describe_matches(self, source: SourceText, matches: list) -> list[FunctionDescription]:
+        file_namespace: Optional[str] = None
+        for _, captures in matches:
+            if "namespace" in captures:
+                file_namespace = source.node_text(captures["namespace"][0])
+                break
+
+        functions: list[FunctionDescription] = []
+        classes: dict[int, ClassDescription] = {}
+        for captures in self._functions(matches):
+            node = captures["function"]
+            name = source.node_text(captures["name"])
+            if node.type == "destructor_declaration":
+                name = f"~{name}"
+            is_local = node.type == "local_function_statement"
+
+            types, namespaces = self._scopes(source, node)
+            class_name = None
+            if types and not is_local:
+                class_name = ".".join(source.node_text(t.child_by_field_name("name")) for t in types)
+            class_info = None
+            if class_name is not None:
+                owner = types[-1]
+                kind = owner.type.removesuffix("_declaration")
+                class_info = self._class_info(source, owner, class_name, kind, classes)
+
+            modifiers = [source.node_text(c) for c in node.children if c.type == "modifier"]
+            visibility = None
+            if not is_local:
+                access = [m for m in _ACCESS_MODIFIERS if m in modifiers]
+                if access:
+                    visibility = " ".join(access)
+                else:
+                    visibility = "public" if types and types[-1].type == "interface_declaration" else "private"
+
+            return_type = node.child_by_field_name("returns") or node.child_by_field_name("type")
+
+            functions.append(self._describe(
+                source,
+                node=node,
+                outer=node,
+                body=node.child_by_field_name("body"),
+                signature_start=self._signature_start(source, node),
+                name=name,
+                class_name=class_name,
+                class_info=class_info,
+                namespace=".".join(namespaces) or file_namespace,
+                return_type=source.node_text(return_type),
+                parameters=self._cs_parameters(source, node.child_by_field_name("parameters")),
+                decorators=[source.node_text(c) for c in node.children if c.type == "attribute_list"],
+                modifiers=modifiers,
+                visibility=visibility,
+                is_method=class_name is not None,
+                is_constructor=node.type == "constructor_declaration",
+            ))
+        return functions
+
+    @staticmethod
+    def _scopes(source: SourceText, node: Any) -> tuple[list[Any], list[str]]:
+        """Объемлющие типы и пространства имён, от внешних к внутренним."""
+        types: list[Any] = []
+        namespaces: list[str] = []
+        parent = node.parent
+        while parent is not None:
+            if parent.type in _TYPE_NODES:
+                types.append(parent)
+            elif parent.type == "namespace_declaration":
+                namespaces.append(source.node_text(parent.child_by_field_name("name")))
+            parent = parent.parent
+        types.reverse()
+        namespaces.reverse()
+        return types, namespaces
+
+    @staticmethod
+    def _cs_parameters(source: SourceText, params: Optional[Any]) -> list[str]:
+        """
+        Параметры — текст между запятыми списка: у `params T[] x` грамматика
+        не собирает тип и имя в один узел parameter.
+        """
+        if params is None:
+            return []
+        result: list[str] = []
+        start = None
+        for child in params.children:
+            if child.type in ("(", ",", ")"):
+                if start is not None:
+                    result.append(collapse_whitespace(source.text[start:source.start(child)]))
+                start = source.end(child)
+        return [param for param in result if param]
+
+    @staticmethod
+    def _signature_start(source: SourceText, node: Any) -> int:
+        """Начало сигнатуры — первый потомок узла после атрибутов."""
+        for child in node.children:
+            if child.type not in ("attribute_list", "comment"):
+                return source.start(child)
+        return source.start(node)
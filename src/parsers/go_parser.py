@@ -1,49 +1,110 @@
-# try:
-#     import tree_sitter
-#     from tree_sitter import Language, Parser
-#     TREE_SITTER_AVAILABLE = True
-# except ImportError:
-#     TREE_SITTER_AVAILABLE = False
-
-# class TreeSitterParser(BaseParser):
-#     """Базовый класс для парсеров на Tree-Sitter"""
-    
-#     LANGUAGE_LIB = None  # Переопределить в подклассе
-    
-#     def __init__(self):
-#         if not TREE_SITTER_AVAILABLE:
-#             raise RuntimeError("tree-sitter не установлен")
-#         self.parser = Parser()
-#         self.language = Language(self.LANGUAGE_LIB)
-#         self.parser.set_language(self.language)
-    
-#     def parse(self, file_path: str) -> list[FunctionSignature]:
-#         """Парсить файл"""
-#         with open(file_path, 'rb') as f:
-#             content = f.read()
-#         return self.parse_content(content.decode('utf-8'))
-    
-#     def parse_content(self, content: str) -> list[FunctionSignature]:
-#         """Парсить содержимое"""
-#         tree = self.parser.parse(content.encode('utf-8'))
-#         return self._extract_functions(tree.root_node)
-    
-#     def _extract_functions(self, node) -> list[FunctionSignature]:
-#         """Переопределить в подклассах"""
-#         return []
-
-# class GoParser(TreeSitterParser):
-#     """Парсер для Go"""
-#     LANGUAGE_LIB = "build/my-languages.so"  # Путь к скомпилированной библиотеке
-
-# class JavaParser(TreeSitterParser):
-#     """Парсер для Java"""
-#     LANGUAGE_LIB = "build/my-languages.so"
-
-# class JavaScriptParser(TreeSitterParser):
-#     """Парсер для JavaScript"""
-#     LANGUAGE_LIB = "build/my-languages.so"
-
-# class CSharpParser(TreeSitterParser):
-#     """Парсер для C#"""
-#     LANGUAGE_LIB = "build/my-languages.so"
\ No newline at end of file
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from src.models import Language
+from src.models.function_description import ClassDescription, Deferred, FunctionDescription
+from src.parsers.tree_sitter_engine import SourceText, TreeSitterParser, collapse_whitespace
+
+
+# Вид типа по узлу его определения; прочие (type X int, алиасы) — "type"
+_TYPE_KINDS = {"struct_type": "struct", "interface_type": "interface"}
+
+
+class GoParser(TreeSitterParser):
+    """
+    Go-парсер на tree-sitter:
+    - Функции и методы (класс метода — тип получателя, без указателя и параметров типа)
+    - Документация — комментарии вплотную над объявлением, как у go doc
+    - Пакет файла — в namespace, экспортируемость по регистру имени — в visibility
+    """
+
+    GRAMMAR = "go"
+    LANGUAGE = str(Language.GO)
+    DOC_PREFIXES = ("//", "/*")
+    # Пакет и документация типов попадают в описания методов по всему файлу
+    SHARED_NODES = frozenset({"package_clause", "type_declaration"})
+    QUERY = """
+        (package_clause (package_identifier) @package)
+        (type_spec name: (type_identifier) @type.name) @type
+        (function_declaration name: (identifier) @name) @function
+        (method_declaration name: (field_identifier) @name) @function
+    """
+
+    def _describe_matches(self, source: SourceText, matches: list) -> list[FunctionDescription]:
+        package: Optional[str] = None
+        types: dict[str, ClassDescription] = {}
+        for _, captures in matches:
+            if "package" in captures:
+                package = package or source.node_text(captures["package"][0])
+            elif "type" in captures:
+                spec = captures["type"][0]
+                name = source.node_text(captures["type.name"][0])
+                types[name] = ClassDescription(
+                    name=name,
+                    kind=_TYPE_KINDS.get(getattr(spec.child_by_field_name("type"), "type", None), "type"),
+                    docstring=self._type_doc(source, spec),
+                    start_line=spec.start_point[0] + 1,
+                    end_line=spec.end_point[0] + 1,
+                )
+
+        functions: list[FunctionDescription] = []
+        for captures in self._functions(matches):
+            node = captures["function"]
+            name = source.node_text(captures["name"])
+            receiver = self._receiver_type(source, node.child_by_field_name("receiver"))
+            result = node.child_by_field_name("result")
+
+            functions.append(self._describe(
+                source,
+                node=node,
+                outer=node,
+                body=node.child_by_field_name("body"),
+                signature_start=source.start(node),
+                name=name,
+                class_name=receiver,
+                class_info=types.get(receiver) if receiver else None,
+                namespace=package,
+                return_type=source.node_text(result),
+                parameters=self._go_parameters(source, node.child_by_field_name("parameters")),
+                visibility="public" if name[:1].isupper() else "package-private",
+                is_method=receiver is not None,
+            ))
+        return functions
+
+    def _type_doc(self, source: SourceText, spec: Any) -> Optional[Deferred]:
+        """Документация типа: над type_spec в группе type (...) или над одиночным type X."""
+        doc, _ = self._leading_doc(source, spec)
+        parent = spec.parent
+        if doc is None and parent is not None and parent.type == "type_declaration":
+            doc, _ = self._leading_doc(source, parent)
+        return doc
+
+    @staticmethod
+    def _receiver_type(source: SourceText, receiver: Optional[Any]) -> Optional[str]:
+        if receiver is None:
+            return None
+        for param in receiver.named_children:
+            node = param.child_by_field_name("type")
+            while node is not None and node.type in ("pointer_type", "generic_type", "parenthesized_type"):
+                node = node.child_by_field_name("type") or (node.named_children[0] if node.named_children else None)
+            return source.node_text(node)
+        return None
+
+    @staticmethod
+    def _go_parameters(source: SourceText, params: Optional[Any]) -> list[str]:
+        """Параметры по одному на имя: `a, b int` -> ["a int", "b int"]."""
+        if params is None:
+            return []
+        result: list[str] = []
+        for param in params.named_children:
+            if param.type == "comment":
+                continue
+            type_node = param.child_by_field_name("type")
+            names = param.children_by_field_name("name")
+            if param.type != "parameter_declaration" or not names or type_node is None:
+                result.append(collapse_whitespace(source.node_text(param)))
+                continue
+            type_text = collapse_whitespace(source.node_text(type_node))
+            result.extend(f"{source.node_text(n)} {type_text}" for n in names)
+        return result
@@ -0,0 +1,175 @@
+"""
+Повторное извлечение функций после правки файла.
+
+Парсер запоминает состояние последних разобранных версий (границы верхнеуровневых
+единиц или дерево tree-sitter). При правке заново описывается только участок,
+накрывающий изменённые строки: описания до участка переиспользуются как есть,
+после — со сдвигом строк и смещений. Если участок нельзя отделить от остального
+файла, парсер делает полный разбор.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Iterator, Optional
+
+from src.models.function_description import ClassDescription, FunctionDescription, SourceSpan
+from src.utils.text_edit import TextEdit
+
+# Сколько раз участок расширяется на соседнюю границу, прежде чем сдаться
+MAX_WIDEN = 4
+
+_TEXT_FIELDS = ("full_function_text", "function_text")
+
+Position = tuple[int, int]
+
+
+class RecentParses:
+    """
+    Состояние последних разобранных версий файлов: содержимое -> значение парсера.
+    Небольшой LRU на экземпляр парсера; потокобезопасен, так как общие парсеры
+    (THREAD_SAFE = True) вызываются из нескольких потоков.
+    """
+
+    def __init__(self, size: int = 4):
+        self._size = size
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content: str) -> Optional[Any]:
+        with self._lock:
+            value = self._items.get(content)
+            if value is not None:
+                self._items.move_to_end(content)
+            return value
+
+    def pop(self, content: str) -> Optional[Any]:
+        with self._lock:
+            return self._items.pop(content, None)
+
+    def put(self, content: str, value: Any) -> None:
+        with self._lock:
+            self._items[content] = value
+            self._items.move_to_end(content)
+            while len(self._items) > self._size:
+                self._items.popitem(last=False)
+
+
+def boundary_regions(boundaries: list[int], edit: TextEdit) -> Iterator[tuple[int, int]]:
+    """
+    Участки старой версии между соседними границами, накрывающие правку:
+    сначала минимальный, затем расширяемый на границу в каждую сторону.
+    boundaries — отсортированные смещения, первое 0, последнее len(old).
+    """
+    lo = bisect_right(boundaries, edit.start) - 1
+    hi = bisect_left(boundaries, edit.old_end)
+    last = len(boundaries) - 1
+    for _ in range(MAX_WIDEN):
+        yield boundaries[lo], boundaries[hi]
+        if lo == 0 and hi == last:
+            return
+        lo, hi = max(lo - 1, 0), min(hi + 1, last)
+
+
+def merge_boundaries(boundaries: list[int], lo: int, hi: int, delta: int, inner: list[int]) -> list[int]:
+    """Границы новой версии: старые до участка, найденные в участке, старые после участка со сдвигом."""
+    merged = [b for b in boundaries if b < lo]
+    merged.append(lo)
+    merged.extend(inner)
+    merged.extend(b + delta for b in boundaries if b >= hi)
+    return sorted(set(merged))
+
+
+def splice(
+    old_functions: list[FunctionDescription],
+    new_content: str,
+    edit: TextEdit,
+    region_start: Position,
+    region_end: Position,
+    region_functions: list[FunctionDescription],
+) -> Optional[list[FunctionDescription]]:
+    """
+    Описания новой версии: старые функции до участка, заново описанные функции участка,
+    старые функции после участка со сдвигом. region_start/region_end — позиции (строка, колонка)
+    границ участка в новой версии, конец не включается; участок накрывает правку.
+    Старые описания переиспользуются: они перепривязываются к новой версии на месте.
+    None — если старая функция пересекает границу участка и описания склеить нельзя.
+    """
+    # За правкой колонки не меняются: она выровнена по строкам
+    old_region_end = (region_end[0] - edit.line_delta, region_end[1])
+    before: list[FunctionDescription] = []
+    after: list[FunctionDescription] = []
+    for fd in old_functions:
+        start = (fd.start_line, fd.start_column)
+        end = (fd.end_line, fd.end_column)
+        if end <= region_start:
+            before.append(fd)
+        elif start >= old_region_end:
+            after.append(fd)
+        elif start < region_start or end > old_region_end:
+            return None
+
+    for fd in before:
+        shift_function(fd, new_content, 0, 0)
+    for fd in after:
+        shift_function(fd, new_content, edit.char_delta, edit.line_delta)
+    shift_classes(before + after, region_functions, region_start, old_region_end, edit.line_delta)
+    return before + region_functions + after
+
+
+def shift_function(fd: FunctionDescription, new_content: str, char_delta: int, line_delta: int) -> None:
+    """Привязать описание к новой версии файла, сдвинув его на char_delta символов и line_delta строк."""
+    for name in _TEXT_FIELDS:
+        span = fd.span(name)
+        if span is not None:
+            setattr(fd, name, SourceSpan(new_content, span.start + char_delta, span.end + char_delta))
+    fd.start_line += line_delta
+    fd.end_line += line_delta
+
+
+def shift_classes(
+    kept: list[FunctionDescription],
+    region_functions: list[FunctionDescription],
+    region_start: Position,
+    old_region_end: Position,
+    line_delta: int,
+) -> None:
+    """
+    Перенести общие описания классов (class_info) переиспользованных функций на новую версию:
+    класс после участка сдвигается целиком, класс вокруг участка — только концом.
+    Заново описанные методы таких классов получают прежнее описание — одно на класс, как при полном разборе.
+    """
+    classes: dict[int, ClassDescription] = {}
+    for fd in kept:
+        if fd.class_info is not None:
+            classes[id(fd.class_info)] = fd.class_info
+    if not classes:
+        return
+
+    by_key: dict[tuple, ClassDescription] = {}
+    for info in classes.values():
+        # Позиции классов известны с точностью до строки; -1 — класс объявлен в другом файле
+        if info.start_line >= 0:
+            after = info.start_line > old_region_end[0] or (
+                info.start_line == old_region_end[0] and old_region_end[1] == 0
+            )
+            # Класс, закрывшийся в строке начала участка (участок — с середины строки), лежит до него
+            before = info.end_line < region_start[0] or (
+                info.end_line == region_start[0] and region_start[1] > 0
+            )
+            if after:
+                info.start_line += line_delta
+                info.end_line += line_delta
+            elif not before:
+                info.end_line += line_delta
+        by_key[(info.name, info.kind, info.start_line, info.end_line)] = info
+
+    for fd in region_functions:
+        info = fd.class_info
+        if info is not None:
+            shared = by_key.get((info.name, info.kind, info.start_line, info.end_line))
+            if shared is not None and shared is not info:
+                fd.class_info = shared
+                fd.class_description = ClassDescription.docstring.raw(shared)
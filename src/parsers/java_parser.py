@@ -1,210 +1,467 @@
 import re
-from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Optional, List, Tuple
-from src.models.function_description import FunctionDescription
+from typing import Optional, List, Tuple, Union
+from src.models.function_description import ClassDescription, Deferred, FunctionDescription, SourceSpan
 from src.parsers.base_parser import BaseParser
+from src.parsers.incremental import RecentParses, boundary_regions, merge_boundaries, splice
 from src.models import Language
+from src.utils.line_index import LineIndex
+from src.utils.text_edit import compute_edit
+
+
+# Лексер: один проход по тексту. Строки, символы, текстовые блоки и комментарии
+# распознаются целиком, поэтому скобки внутри них не влияют на структуру.
+_TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<ws>\s+)
+    | (?P<javadoc>/\*\*(?!/).*?(?:\*/|\Z))
+    | (?P<block>/\*.*?(?:\*/|\Z))
+    | (?P<line>//[^\n]*)
+    | (?P<textblock>\"\"\"(?:\\.|[^\\])*?(?:\"\"\"|\Z))
+    | (?P<string>"(?:\\.|[^"\\\n])*"?)
+    | (?P<char>'(?:\\.|[^'\\\n])*'?)
+    | (?P<ident>[^\W\d][\w$]*|\$[\w$]*)
+    | (?P<number>\d[\w.]*)
+    | (?P<punct>.)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+# Виды токенов, которые не несут кода
+_COMMENTS = frozenset({"javadoc", "block", "line"})
+# Комментарии, которые считаются документацией объявления (как и раньше: /** */ и //)
+_DOC_COMMENTS = frozenset({"javadoc", "line"})
+
+_MODIFIERS = frozenset({
+    "public", "private", "protected", "static", "final", "abstract", "synchronized",
+    "strictfp", "default", "native", "transient", "volatile", "sealed",
+})
+_CLASS_KEYWORDS = frozenset({"class", "interface", "enum", "record"})
+# Слова, которые не могут быть именем метода
+_NOT_METHOD_NAMES = frozenset({
+    "for", "while", "if", "else", "switch", "catch", "synchronized", "return", "throw",
+    "try", "new", "break", "continue", "assert", "do", "case", "default",
+})
+# Пунктуация, допустимая в возвращаемом типе и в списке throws
+_TYPE_PUNCT = frozenset({".", "<", ">", ",", "?", "[", "]", "&"})
+
+
+@dataclass(slots=True)
+class _Token:
+    kind: str
+    start: int
+    end: int
+    text: Optional[str] = None      # только для ident/punct
+
+
+@dataclass
+class _JavaClass:
+    qualified_name: Optional[str]
+    name: Optional[str]
+    type: Optional[str]
+    doc: Optional[Deferred]
+    info: Optional[ClassDescription] = None         # общее описание класса для его методов
+    methods: List[FunctionDescription] = field(default_factory=list)
+    classes: List["_JavaClass"] = field(default_factory=list)
+
+
+@dataclass
+class _MethodHeader:
+    start: int                              # начало full_function_text (с отступом строки)
+    decl_start: int                         # первый символ объявления (комментарий или код)
+    name: str
+    params_text: str
+    return_type: Optional[str]
+    modifiers: List[str]
+    annotations: List[str]
+    doc: Optional[Deferred]
+
+
+@dataclass
+class _Frame:
+    kind: str                               # class | method | block
+    decl_start: int                         # индекс первого токена текущего объявления
+    cls: Optional[_JavaClass] = None        # ближайший объемлющий класс
+    header: Optional[_MethodHeader] = None  # для kind == "method"
+    body_start: int = 0
+
+
+def _tokenize(content: str, start: int = 0, end: Optional[int] = None) -> List[_Token]:
+    """Токены content[start:end] (смещения — в content)."""
+    tokens: List[_Token] = []
+    append = tokens.append
+    for match in _TOKEN_PATTERN.finditer(content, start, len(content) if end is None else end):
+        kind = match.lastgroup
+        if kind == "ws":
+            continue
+        text = match.group() if kind in ("ident", "punct") else None
+        append(_Token(kind, match.start(), match.end(), text))
+    return tokens
+
 
 class JavaParser(BaseParser):
     """
-    Продвинутый Java-парсер:
-    - Исправлен захват тела метода (счетчик скобок вместо regex)
-    - Игнорирование конструкций throw/return/new в начале строки
+    Java-парсер на одном линейном проходе лексера:
+    - Строки, символьные литералы, текстовые блоки и комментарии не ломают подсчёт скобок
+    - Классы (включая вложенные и локальные), интерфейсы, enum и record разбираются стеком областей
     - Поддержка <T> generics в сигнатуре метода
     - Корректная обработка отступов и форматирования в Javadoc
     """
 
-    # Паттерн для поиска классов
-    _class_pattern = re.compile(
-        r"(?P<comments>(?:/\*\*.*?\*/\s*|//.*\n)*)"
-        r"(?P<modifiers>(?:public|private|protected|abstract|final|static|\s)+)?\s*"
-        r"(?P<type>class|interface|enum)\s+"
-        r"(?P<name>\w+)"
-        r"(\s*<[^>]+>)?", 
-        re.DOTALL
-    )
-
-    # Паттерн заголовка метода
-    # Обрабатывает Javadoc и аннотации с произвольными отступами
-    _method_header_pattern = re.compile(
-        r"(?m)"  # Multiline mode
-        # 1. Javadoc и комментарии (жадный захват, допускает отступы)
-        r"(?P<comments>(?:(?:^[ \t]*)(?:/\*\*.*?\*/|//[^\n]*)\s*)+)?"
-        
-        # 2. Аннотации
-        r"(?P<annotations>(?:(?:^[ \t]*)(?:@\w+(?:\([^\)]*\))?)\s*)+)?"
-        
-        # 3. Начало сигнатуры (строго с начала строки с учетом отступа)
-        r"(?:^[ \t]*)" 
-        # Negative lookahead: исключаем throw, return, new, if, else и т.д.
-        r"(?!(?:throw|return|new|catch|if|else|try|break|case)\b)"
-        
-        r"(?P<modifiers>(?:public|private|protected|static|final|abstract|synchronized|strictfp|default|native|transient|volatile|\s)+)?"
-        r"(?P<type_params><[\w\s,extends\?\[\]]+>\s+)??" 
-        r"(?P<return_type>[\w\<\>\[\], ?]+)\s+"
-        r"(?P<name>(?!for\b|while\b|if\b|else\b|switch\b|catch\b|synchronized\b|return\b|throw\b|try\b|new\b|break\b|continue\b|assert\b)\w+)\s*"
-        r"\((?P<params>(?:[^)(]+|\((?:[^)(]+|\([^)(]*\))*\))*)\)\s*"
-        r"(?:throws\s+[^{;]+)?\s*"
-        r"(?P<terminator>[{;])", 
-        re.DOTALL
-    )
-
-    def parse_content(self, content: str) -> List[FunctionDescription]:
-        functions: List[FunctionDescription] = []
+    VERSION = "4"
 
-        def find_classes(text: str, parent: Optional[str] = None, offset: int = 0):
-            matches = list(self._class_pattern.finditer(text))
-            processed_ranges = []
-            
-            for class_match in matches:
-                # Пропускаем вложенные классы (они будут обработаны рекурсивно)
-                if any(start <= class_match.start() < end for start, end in processed_ranges):
-                    continue
+    def __init__(self):
+        # Границы верхнеуровневых объявлений последних разобранных версий — для reparse
+        self._recent = RecentParses()
 
-                start_idx = class_match.end()
-                body, end_idx = self._extract_braces_content(text, start_idx - 1)
-                
-                processed_ranges.append((class_match.start(), end_idx))
-                
-                name = class_match.group("name")
-                type_ = class_match.group("type")
-                doc = self._clean_docstring(class_match.group("comments"))
-                
-                qualified_class_name = f"{parent}.{name}" if parent else name
-                current_body_offset = offset + start_idx
-                
-                # Парсим методы текущего класса
-                class_methods = self._parse_methods(
-                    body,
-                    qualified_class_name,
-                    name,
-                    type_,
-                    doc,
-                    current_body_offset
-                )
-                functions.extend(class_methods)
-                
-                # Рекурсивно ищем классы внутри текущего
-                find_classes(body, qualified_class_name, current_body_offset)
+    def parse_content(self, content: str) -> List[FunctionDescription]:
+        index = LineIndex(content)
+        root, boundaries, _ = self._parse_range(index, 0, len(content))
+        self._recent.put(content, sorted({0, *boundaries, len(content)}))
 
-        find_classes(content)
+        functions = self._class_methods(root)
         if len(functions) == 0:
-            functions = self._parse_methods(content, None, None, None, None, 0)
+            functions = root.methods
 
-        print(functions)
         return functions
 
-    def _parse_methods(
-        self, 
-        class_body: str, 
-        qualified_class_name: str, 
-        class_name: str, 
-        class_type: str, 
-        class_doc: Optional[str],
-        body_offset: int
+    def reparse(
+        self, old_content: str, old_functions: List[FunctionDescription], new_content: str
     ) -> List[FunctionDescription]:
-        methods = []
-        pos = 0
-        nested_ranges = self._get_nested_class_ranges(class_body)
+        """
+        Заново разбираются только верхнеуровневые объявления (типы целиком), задетые правкой:
+        участок между их границами в старой версии — `}`, закрывающей тип, или `;` на верхнем уровне.
+        Участок годится, если к его концу все скобки закрыты и последний токен не обрезан границей
+        (незакрытый комментарий или текстовый блок); иначе он расширяется на соседние объявления.
+        """
+        edit = compute_edit(old_content, new_content)
+        if edit is None:
+            return list(old_functions)
+        boundaries = self._recent.get(old_content)
+        # Методы вне классов отдаются, только если в файле нет методов классов — это зависит от всего файла
+        if boundaries is None or any(fd.class_name is None for fd in old_functions):
+            return self.parse_content(new_content)
 
-        while True:
-            match = self._method_header_pattern.search(class_body, pos)
-            if not match:
+        index = LineIndex(new_content)
+        for lo, hi in boundary_regions(boundaries, edit):
+            new_hi = hi + edit.char_delta
+            root, inner, clean = self._parse_range(index, lo, new_hi)
+            if not clean:
+                continue
+            functions = splice(
+                old_functions, new_content, edit, index.position(lo), index.position(new_hi),
+                self._class_methods(root),
+            )
+            if not functions:
                 break
-            
-            # Пропускаем методы внутри вложенных классов
-            if self._is_in_nested_class(match.start(), nested_ranges):
-                pos = match.end()
+            self._recent.put(new_content, merge_boundaries(boundaries, lo, hi, edit.char_delta, inner))
+            return functions
+        return self.parse_content(new_content)
+
+    def _parse_range(self, index: LineIndex, start: int, end: int) -> Tuple[_JavaClass, List[int], bool]:
+        """
+        Разбор content[start:end], начинающегося на верхнем уровне файла.
+        Возвращает корень с найденными классами и методами, границы верхнеуровневых объявлений
+        и признак того, что к концу участка все скобки закрыты, а последний токен не обрезан.
+        """
+        content = index.text
+        tokens = _tokenize(content, start, end)
+        boundaries: List[int] = []
+
+        root = _JavaClass(qualified_name=None, name=None, type=None, doc=None)
+        stack: List[_Frame] = [_Frame("class", 0, root)]
+
+        for i, token in enumerate(tokens):
+            if token.kind != "punct":
+                continue
+            frame = stack[-1]
+
+            if token.text == "{":
+                cls = self._class_declaration(index, tokens, frame.decl_start, i, frame.cls)
+                if cls is not None:
+                    frame.cls.classes.append(cls)
+                    stack.append(_Frame("class", i + 1, cls))
+                    continue
+                header = None
+                if frame.kind == "class":
+                    header = self._method_header(index, tokens, frame.decl_start, i, frame.cls)
+                if header is not None:
+                    stack.append(_Frame("method", i + 1, frame.cls, header, token.start))
+                else:
+                    stack.append(_Frame("block", i + 1, frame.cls))
+
+            elif token.text == "}":
+                if len(stack) == 1:
+                    frame.decl_start = i + 1
+                    boundaries.append(token.end)
+                    continue
+                stack.pop()
+                if frame.kind == "method":
+                    self._add_method(index, frame, token.end)
+                elif frame.kind == "class":
+                    frame.cls.info.end_line = index.position(token.end)[0]
+                stack[-1].decl_start = i + 1
+                if len(stack) == 1:
+                    boundaries.append(token.end)
+
+            elif token.text == ";":
+                if frame.kind == "class":
+                    header = self._method_header(index, tokens, frame.decl_start, i, frame.cls)
+                    if header is not None:
+                        self._add_method(index, _Frame("method", i + 1, frame.cls, header, token.start), token.end)
+                frame.decl_start = i + 1
+                if len(stack) == 1:
+                    boundaries.append(token.end)
+
+        clean = len(stack) == 1
+        if clean and tokens and tokens[-1].end == end:
+            # Лексер с endpos обрезает токен на границе: сверяем с разбором без ограничения
+            clean = _TOKEN_PATTERN.match(content, tokens[-1].start).end() == end
+
+        # Незакрытые тела методов тянутся до конца участка
+        while len(stack) > 1:
+            frame = stack.pop()
+            if frame.kind == "method":
+                self._add_method(index, frame, end)
+            elif frame.kind == "class":
+                frame.cls.info.end_line = index.position(end)[0]
+
+        return root, boundaries, clean
+
+    @staticmethod
+    def _class_methods(root: _JavaClass) -> List[FunctionDescription]:
+        """Методы всех классов: класс, затем его вложенные классы."""
+        functions: List[FunctionDescription] = []
+
+        def collect(cls: _JavaClass) -> None:
+            functions.extend(cls.methods)
+            for nested in cls.classes:
+                collect(nested)
+
+        for cls in root.classes:
+            collect(cls)
+        return functions
+
+    def _class_declaration(
+        self,
+        index: LineIndex,
+        tokens: List[_Token],
+        lo: int,
+        hi: int,
+        parent: _JavaClass,
+    ) -> Optional[_JavaClass]:
+        """Объявление класса/интерфейса/enum/record, заканчивающееся на tokens[hi] == '{'."""
+        prev: Optional[_Token] = None
+        for j in range(lo, hi):
+            token = tokens[j]
+            if token.kind in _COMMENTS:
                 continue
-            
-            terminator = match.group("terminator")
-            match_end = match.end()
-            
-            # Извлекаем тело метода
-            if terminator == ';':
-                method_body = ";"
-                full_method_end = match_end
-                has_body = False
+            if (
+                token.kind == "ident"
+                and token.text in _CLASS_KEYWORDS
+                and (prev is None or prev.text != ".")
+                and j + 1 < hi
+                and tokens[j + 1].kind == "ident"
+            ):
+                # record — контекстное слово: за именем обязан идти список компонентов
+                if token.text == "record" and (j + 2 >= hi or tokens[j + 2].text not in ("(", "<")):
+                    prev = token
+                    continue
+                name = tokens[j + 1].text
+                doc, _ = self._leading_doc(index, tokens, lo, hi)
+                qualified = f"{parent.qualified_name}.{name}" if parent.qualified_name else name
+                decl = next(t for t in tokens[lo:hi] if t.kind not in _COMMENTS)
+                info = ClassDescription(
+                    name=qualified, kind=token.text, docstring=doc, start_line=index.position(decl.start)[0]
+                )
+                return _JavaClass(qualified_name=qualified, name=name, type=token.text, doc=doc, info=info)
+            prev = token
+        return None
+
+    def _method_header(
+        self,
+        index: LineIndex,
+        tokens: List[_Token],
+        lo: int,
+        hi: int,
+        cls: _JavaClass,
+    ) -> Optional[_MethodHeader]:
+        """Заголовок метода в tokens[lo:hi]; tokens[hi] — '{' или ';'."""
+        content = index.text
+        doc, first = self._leading_doc(index, tokens, lo, hi)
+        code = [t for t in tokens[lo:hi] if t.kind not in _COMMENTS]
+        if not code:
+            return None
+
+        # Модификаторы и аннотации
+        modifiers: List[str] = []
+        annotations: List[str] = []
+        i, n = 0, len(code)
+        while i < n:
+            token = code[i]
+            if token.kind == "ident" and token.text in _MODIFIERS:
+                modifiers.append(token.text)
+                i += 1
+            elif token.text == "@" and i + 1 < n and code[i + 1].kind == "ident":
+                end = self._skip_annotation(code, i)
+                annotations.append(content[code[i].start:code[end - 1].end])
+                i = end
             else:
-                brace_start_idx = match_end - 1 
-                body_content, body_end_idx = self._extract_braces_content(class_body, brace_start_idx)
-                method_body = "{" + body_content + "}"
-                full_method_end = body_end_idx
-                has_body = True
-
-            # Метаданные
-            comments = self._clean_docstring(match.group("comments"))
-            annotations = [a.strip() for a in (match.group("annotations") or "").splitlines() if a.strip()]
-            
-            modifiers_str = match.group("modifiers")
-            modifiers = modifiers_str.split() if modifiers_str else []
-            
-            if class_type == "interface":
-                if not modifiers:
-                    modifiers = ["public", "abstract"]
-                if not has_body and "default" not in modifiers and "static" not in modifiers:
-                     if "abstract" not in modifiers:
-                         modifiers.append("abstract")
-
-            visibility = next((v for v in ["public", "private", "protected"] if v in modifiers), "package-private")
-            
-            raw_ret = match.group("return_type") or ""
-            return_type = raw_ret.strip().split()[-1] if raw_ret else None
-
-            name = match.group("name")
-            params_text = match.group("params")
-            parameters = self._split_params(params_text)
-
-            start_line = class_body[:match.start()].count("\n") + body_offset + 1
-            full_text = class_body[match.start():full_method_end]
-            end_line = start_line + full_text.count("\n")
-
-            func_desc = FunctionDescription(
-                language=str(Language.JAVA),
-                full_function_text=full_text,
-                function_text=method_body,
-                docstring=comments,
-                full_function_lines_length=full_text.count("\n") + 1,
-                function_lines_length=method_body.count("\n") + 1,
-                docstring_lines_length=comments.count("\n") + 1 if comments else None,
-                name=name,
-                qualified_name=f"{qualified_class_name}.{name}",
-                namespace=None,
-                signature_text=f"{return_type or 'void'} {name}({params_text})",
-                return_type=return_type,
-                parameters=parameters,
-                start_line=start_line,
-                end_line=end_line,
-                is_method=True,
-                class_name=qualified_class_name,
-                class_description=class_doc,
-                decorators=annotations,
-                modifiers=modifiers,
-                visibility=visibility,
-                has_body=has_body,
-                is_constructor=name == class_name
-            )
-            methods.append(func_desc)
-            pos = full_method_end
-
-        return methods
-
-    def _get_nested_class_ranges(self, text: str) -> List[Tuple[int, int]]:
-        ranges = []
-        for match in self._class_pattern.finditer(text):
-            start = match.start()
-            idx = text.find("{", match.end())
-            if idx != -1:
-                _, end = self._extract_braces_content(text, idx)
-                ranges.append((start, end))
-        return ranges
-
-    def _is_in_nested_class(self, pos: int, nested_ranges: List[Tuple[int, int]]) -> bool:
-        for start, end in nested_ranges:
-            if start <= pos < end:
-                return True
-        return False
+                break
+
+        # Параметры типа метода: <T, U extends Comparable<U>>
+        if i < n and code[i].text == "<":
+            i = self._skip_balanced(code, i, "<", ">")
+
+        # Возвращаемый тип и имя, до открывающей скобки параметров
+        j = i
+        while j < n and code[j].text != "(":
+            token = code[j]
+            if token.kind != "ident" and token.text not in _TYPE_PUNCT:
+                return None
+            j += 1
+        if j >= n or j == i:
+            return None
+
+        name_token = code[j - 1]
+        name = name_token.text
+        if name_token.kind != "ident" or name in _NOT_METHOD_NAMES or name in _MODIFIERS:
+            return None
+
+        return_type = content[code[i].start:code[j - 2].end] if j - 1 > i else None
+        if return_type is None and name != cls.name:
+            return None
+
+        close = self._skip_balanced(code, j, "(", ")")
+        if close > n:
+            return None
+        params_text = content[code[j].end:code[close - 1].start]
+
+        # После параметров допустимы только устаревшие [] и throws
+        k = close
+        while k < n and code[k].text in ("[", "]"):
+            k += 1
+        if k < n:
+            if code[k].text != "throws":
+                return None
+            for token in code[k + 1:]:
+                if token.kind != "ident" and token.text not in _TYPE_PUNCT:
+                    return None
+
+        decl_start = (tokens[first] if first is not None else code[0]).start
+        start = index.line_start(decl_start)
+        if content[start:decl_start].strip():
+            start = decl_start
+
+        return _MethodHeader(
+            start=start,
+            decl_start=decl_start,
+            name=name,
+            params_text=params_text,
+            return_type=return_type,
+            modifiers=modifiers,
+            annotations=annotations,
+            doc=doc,
+        )
+
+    def _add_method(self, index: LineIndex, frame: _Frame, end: int) -> None:
+        content = index.text
+        header, cls = frame.header, frame.cls
+        has_body = content[frame.body_start] == "{"
+        # Тексты — ссылки на исходник, а не копии
+        method_body = SourceSpan(content, frame.body_start, end) if has_body else ";"
+        full_text = SourceSpan(content, header.start, end)
+
+        modifiers = list(header.modifiers)
+        if cls.type == "interface":
+            if not modifiers:
+                modifiers = ["public", "abstract"]
+            if not has_body and "default" not in modifiers and "static" not in modifiers:
+                if "abstract" not in modifiers:
+                    modifiers.append("abstract")
+
+        visibility = next((v for v in ["public", "private", "protected"] if v in modifiers), "package-private")
+        comments = header.doc
+        name = header.name
+        start_line, start_column = index.position(header.decl_start)
+        end_line, end_column = index.position(end)
+
+        cls.methods.append(FunctionDescription(
+            language=str(Language.JAVA),
+            full_function_text=full_text,
+            function_text=method_body,
+            docstring=comments,
+            full_function_lines_length=full_text.count("\n") + 1,
+            function_lines_length=method_body.count("\n") + 1,
+            docstring_lines_length=comments.then(_line_count) if comments else None,
+            name=name,
+            qualified_name=f"{cls.qualified_name}.{name}",
+            namespace=None,
+            signature_text=f"{header.return_type or 'void'} {name}({header.params_text})",
+            return_type=header.return_type,
+            parameters=Deferred(self._split_params, header.params_text),
+            start_line=start_line,
+            end_line=end_line,
+            start_column=start_column,
+            end_column=end_column,
+            is_method=True,
+            class_name=cls.qualified_name,
+            class_description=cls.doc,
+            class_info=cls.info,
+            decorators=header.annotations,
+            modifiers=modifiers,
+            visibility=visibility,
+            has_body=has_body,
+            is_constructor=name == cls.name
+        ))
+
+    def _leading_doc(
+        self, index: LineIndex, tokens: List[_Token], lo: int, hi: int
+    ) -> Tuple[Optional[Deferred], Optional[int]]:
+        """
+        Документация объявления: идущие подряд /** */ и // перед первым токеном кода.
+        Комментарий в хвосте предыдущей строки кода (`x = 1; // ...`) не учитывается.
+        Возвращает очищенный текст (по требованию) и индекс первого токена комментария.
+        """
+        content = index.text
+        first: Optional[int] = None
+        j = lo
+        while j < hi and tokens[j].kind in _COMMENTS:
+            token = tokens[j]
+            if token.kind not in _DOC_COMMENTS:
+                first = None
+            elif first is None and not content[index.line_start(token.start):token.start].strip():
+                first = j
+            j += 1
+        if first is None:
+            return None, None
+        return Deferred(self._clean_docstring, SourceSpan(content, tokens[first].start, tokens[j - 1].end)), first
+
+    @staticmethod
+    def _skip_balanced(code: List[_Token], i: int, opening: str, closing: str) -> int:
+        """Индекс токена после парной закрывающей скобки для code[i] == opening."""
+        depth = 0
+        n = len(code)
+        while i < n:
+            text = code[i].text
+            if text == opening:
+                depth += 1
+            elif text == closing:
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        return n + 1
+
+    def _skip_annotation(self, code: List[_Token], i: int) -> int:
+        """Индекс токена после аннотации @Name(...) / @pkg.Name, начинающейся с code[i] == '@'."""
+        n = len(code)
+        i += 2
+        while i + 1 < n and code[i].text == "." and code[i + 1].kind == "ident":
+            i += 2
+        if i < n and code[i].text == "(":
+            i = min(self._skip_balanced(code, i, "(", ")"), n)
+        return i
 
     def _split_params(self, params_text: str) -> List[str]:
         if not params_text:
@@ -224,23 +481,23 @@ class JavaParser(BaseParser):
             params.append("".join(current).strip())
         return [p for p in params if p]
 
-    def _clean_docstring(self, text: Optional[str]) -> Optional[str]:
+    def _clean_docstring(self, text: Union[str, SourceSpan, None]) -> Optional[str]:
         """
         Очищает Javadoc от маркеров /**, *, */ и лишних отступов.
         Сохраняет пустые строки-разделители внутри текста.
         """
         if not text:
             return None
-            
+
         # Убираем внешние маркеры комментария
-        text = text.strip()
+        text = str(text).strip()
         if text.startswith("/**"):
             text = text[3:]
         elif text.startswith("/*"):
             text = text[2:]
         if text.endswith("*/"):
             text = text[:-2]
-            
+
         lines = []
         for line in text.splitlines():
             # Если это обычный комментарий //
@@ -252,39 +509,21 @@ class JavaParser(BaseParser):
             # Javadoc: убираем начальные пробелы и звездочку
             # Регулярка убирает: начало строки, любые пробелы, звездочку, опциональный пробел после
             line = re.sub(r"^\s*\*\s?", "", line)
-            
+
             # Убираем пробелы по краям самого текста строки
             cleaned = line.strip()
             lines.append(cleaned)
-        
+
         # Удаляем пустые строки ТОЛЬКО в начале и в конце списка (trimming),
         # но оставляем внутренние пустые строки (например, перед @param)
         while lines and not lines[0]:
             lines.pop(0)
         while lines and not lines[-1]:
             lines.pop()
-            
+
         return "\n".join(lines) if lines else None
 
-    def _extract_braces_content(self, text: str, start_idx: int) -> Tuple[str, int]:
-        if start_idx >= len(text) or text[start_idx] != "{":
-            next_brace = text.find("{", start_idx)
-            if next_brace == -1:
-                return "", start_idx
-            start_idx = next_brace
-
-        stack = 1
-        i = start_idx + 1
-        length = len(text)
-        
-        while i < length:
-            char = text[i]
-            if char == '{':
-                stack += 1
-            elif char == '}':
-                stack -= 1
-                if stack == 0:
-                    return text[start_idx + 1:i], i + 1
-            i += 1
-            
-        return text[start_idx + 1:], length
+
+def _line_count(text: Optional[str]) -> Optional[int]:
+    """Число строк очищенного комментария; None — если комментария нет."""
+    return text.count("\n") + 1 if text else None
@@ -1,49 +1,208 @@
-# try:
-#     import tree_sitter
-#     from tree_sitter import Language, Parser
-#     TREE_SITTER_AVAILABLE = True
-# except ImportError:
-#     TREE_SITTER_AVAILABLE = False
-
-# class TreeSitterParser(BaseParser):
-#     """Базовый класс для парсеров на Tree-Sitter"""
-    
-#     LANGUAGE_LIB = None  # Переопределить в подклассе
-    
-#     def __init__(self):
-#         if not TREE_SITTER_AVAILABLE:
-#             raise RuntimeError("tree-sitter не установлен")
-#         self.parser = Parser()
-#         self.language = Language(self.LANGUAGE_LIB)
-#         self.parser.set_language(self.language)
-    
-#     def parse(self, file_path: str) -> list[FunctionSignature]:
-#         """Парсить файл"""
-#         with open(file_path, 'rb') as f:
-#             content = f.read()
-#         return self.parse_content(content.decode('utf-8'))
-    
-#     def parse_content(self, content: str) -> list[FunctionSignature]:
-#         """Парсить содержимое"""
-#         tree = self.parser.parse(content.encode('utf-8'))
-#         return self._extract_functions(tree.root_node)
-    
-#     def _extract_functions(self, node) -> list[FunctionSignature]:
-#         """Переопределить в подклассах"""
-#         return []
-
-# class GoParser(TreeSitterParser):
-#     """Парсер для Go"""
-#     LANGUAGE_LIB = "build/my-languages.so"  # Путь к скомпилированной библиотеке
-
-# class JavaParser(TreeSitterParser):
-#     """Парсер для Java"""
-#     LANGUAGE_LIB = "build/my-languages.so"
-
-# class JavaScriptParser(TreeSitterParser):
-#     """Парсер для JavaScript"""
-#     LANGUAGE_LIB = "build/my-languages.so"
-
-# class CSharpParser(TreeSitterParser):
-#     """Парсер для C#"""
-#     LANGUAGE_LIB = "build/my-languages.so"
\ No newline at end of file
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from src.models import Language
+from src.models.function_description import ClassDescription, FunctionDescription
+from src.parsers.tree_sitter_engine import (
+    SourceText,
+    TreeSitterParser,
+    compile_query,
+    load_language,
+    tree_sitter,
+)
+
+# Значения, превращающие переменную/поле/ключ объекта в функцию
+_FUNCTION_VALUES = "[(arrow_function) (function_expression) (generator_function)]"
+
+_JS_QUERY = f"""
+    (function_declaration name: (identifier) @name) @function
+    (generator_function_declaration name: (identifier) @name) @function
+    (method_definition name: (_) @name) @function
+    (variable_declarator name: (identifier) @name value: {_FUNCTION_VALUES} @value) @function
+    (field_definition property: (_) @name value: {_FUNCTION_VALUES} @value) @function
+    (pair key: (_) @name value: {_FUNCTION_VALUES} @value) @function
+"""
+
+# TypeScript: сигнатуры без тела (перегрузки, declare, abstract, интерфейсы)
+_TS_QUERY = f"""
+    (function_declaration name: (identifier) @name) @function
+    (generator_function_declaration name: (identifier) @name) @function
+    (function_signature name: (identifier) @name) @function
+    (method_definition name: (_) @name) @function
+    (method_signature name: (_) @name) @function
+    (abstract_method_signature name: (_) @name) @function
+    (variable_declarator name: (identifier) @name value: {_FUNCTION_VALUES} @value) @function
+    (public_field_definition name: (_) @name value: {_FUNCTION_VALUES} @value) @function
+    (pair key: (_) @name value: {_FUNCTION_VALUES} @value) @function
+"""
+
+_CLASS_BODIES = frozenset({"class_body", "interface_body", "object_type"})
+# Обёртки, документация над которыми относится к функции внутри
+_WRAPPERS = frozenset({"export_statement", "ambient_declaration"})
+_DECLARATIONS = frozenset({"lexical_declaration", "variable_declaration"})
+_MODIFIERS = frozenset({"async", "static", "get", "set", "abstract", "override", "readonly", "declare"})
+
+
+class JavaScriptParser(TreeSitterParser):
+    """
+    JavaScript/TypeScript-парсер на tree-sitter:
+    - Файл разбирается грамматикой JavaScript; если в дереве есть ошибки, повторно — грамматикой TSX
+      (TypeScript + JSX), и берётся дерево без ошибок
+    - Функции, генераторы, методы классов и объектов, стрелочные функции в переменных и полях
+    - TypeScript: перегрузки, declare, abstract-методы и методы интерфейсов (has_body = False)
+    - JSDoc над объявлением (или над export) — в docstring
+    """
+
+    GRAMMAR = "javascript"
+    LANGUAGE = str(Language.JAVASCRIPT)
+    QUERY = _JS_QUERY
+    TS_GRAMMAR = "tsx"
+    TS_QUERY = _TS_QUERY
+
+    def __init__(self):
+        super().__init__()
+        self._ts_query = compile_query(self.TS_GRAMMAR, self.TS_QUERY)
+        self._ts_parser = tree_sitter.Parser(load_language(self.TS_GRAMMAR))
+
+    def _parse(self, source: SourceText, old_tree: Optional[Any] = None) -> tuple[Any, Any]:
+        tree, query = super()._parse(source, old_tree)
+        if tree.root_node.has_error:
+            ts_tree = self._ts_parser.parse(source.data)
+            if not ts_tree.root_node.has_error:
+                return ts_tree, self._ts_query
+        return tree, query
+
+    def _describe_matches(self, source: SourceText, matches: list) -> list[FunctionDescription]:
+        functions: list[FunctionDescription] = []
+        classes: dict[int, ClassDescription] = {}
+        for captures in self._functions(matches):
+            node = captures["function"]
+            value = captures.get("value")
+            func = value or node                # узел с параметрами, телом и типом результата
+            name = source.node_text(captures["name"])
+            name_node = captures["name"]
+
+            cls = self._enclosing_class(node)
+            class_name = self._class_name(source, cls) if cls is not None else None
+            class_info = None
+            if cls is not None:
+                kind = "interface" if cls.type == "interface_declaration" else "class"
+                class_info = self._class_info(source, cls, class_name, kind, classes, self._outer(cls))
+
+            decorators, first = self._decorators(source, node)
+            outer = self._outer(node)
+            modifiers = self._modifiers(source, node)
+            if value is not None:
+                modifiers += [m for m in self._modifiers(source, value) if m not in modifiers]
+            wrapper = node
+            while wrapper != outer:
+                wrapper = wrapper.parent
+                if wrapper.type == "ambient_declaration" and "declare" not in modifiers:
+                    modifiers.insert(0, "declare")
+                elif wrapper.type == "export_statement":
+                    modifiers.insert(0, "export")
+                    if any(child.type == "default" for child in wrapper.children):
+                        modifiers.insert(1, "default")
+
+            visibility = None
+            if cls is not None:
+                visibility = next(
+                    (source.node_text(c) for c in node.children if c.type == "accessibility_modifier"),
+                    "private" if name_node.type == "private_property_identifier" else "public",
+                )
+
+            params = func.child_by_field_name("parameters") or func.child_by_field_name("parameter")
+            return_type = source.node_text(func.child_by_field_name("return_type"))
+
+            functions.append(self._describe(
+                source,
+                node=node,
+                # Декораторы-соседи (TypeScript) входят в текст функции, документация ищется над ними
+                outer=first if first is not None and outer == node else outer,
+                body=func.child_by_field_name("body"),
+                signature_start=self._signature_start(source, node),
+                name=name,
+                class_name=class_name,
+                class_info=class_info,
+                return_type=return_type.lstrip(":").strip() if return_type else None,
+                parameters=(
+                    self._parameters(source, params) if params is None or params.type == "formal_parameters"
+                    else [source.node_text(params)]
+                ),
+                decorators=decorators,
+                modifiers=modifiers,
+                visibility=visibility,
+                is_method=cls is not None,
+                is_constructor=cls is not None and name == "constructor",
+            ))
+        return functions
+
+    @staticmethod
+    def _outer(node: Any) -> Any:
+        """Узел объявления целиком: с const/let, если переменная одна, и с export/declare."""
+        parent = node.parent
+        if node.type == "variable_declarator" and parent is not None and parent.type in _DECLARATIONS:
+            if len(parent.children_by_field_name("declarator")) == 1 or parent.named_child_count == 1:
+                node, parent = parent, parent.parent
+        while parent is not None and parent.type in _WRAPPERS:
+            node, parent = parent, parent.parent
+        return node
+
+    @staticmethod
+    def _enclosing_class(node: Any) -> Optional[Any]:
+        parent = node.parent
+        if parent is not None and parent.type in _CLASS_BODIES:
+            return parent.parent
+        return None
+
+    @staticmethod
+    def _class_name(source: SourceText, cls: Any) -> Optional[str]:
+        name = cls.child_by_field_name("name")
+        if name is None and cls.parent is not None and cls.parent.type == "variable_declarator":
+            # const A = class { ... }
+            name = cls.parent.child_by_field_name("name")
+        return source.node_text(name)
+
+    @staticmethod
+    def _decorators(source: SourceText, node: Any) -> tuple[list[str], Optional[Any]]:
+        """
+        Декораторы метода: дочерние узлы (JavaScript) или идущие перед методом соседи (TypeScript).
+        Возвращает тексты и первый декоратор-сосед.
+        """
+        first = None
+        sibling = node.prev_named_sibling
+        while sibling is not None and sibling.type == "decorator":
+            first, sibling = sibling, sibling.prev_named_sibling
+        decorators: list[str] = []
+        sibling = first
+        while sibling is not None and sibling != node and sibling.type == "decorator":
+            decorators.append(source.node_text(sibling))
+            sibling = sibling.next_named_sibling
+        decorators.extend(source.node_text(c) for c in node.children if c.type == "decorator")
+        return decorators, first
+
+    @staticmethod
+    def _modifiers(source: SourceText, node: Any) -> list[str]:
+        """Ключевые слова перед именем/параметрами: async, static, get, set, abstract, *, ..."""
+        modifiers: list[str] = []
+        for child in node.children:
+            if child.type in _MODIFIERS:
+                modifiers.append(child.type)
+            elif child.type == "*":
+                modifiers.append("generator")
+            elif child.type in ("accessibility_modifier", "override_modifier"):
+                modifiers.append(source.node_text(child))
+            elif child.is_named and child.type != "decorator":
+                break
+        if node.type in ("generator_function", "generator_function_declaration") and "generator" not in modifiers:
+            modifiers.append("generator")
+        return modifiers
+
+    @staticmethod
+    def _signature_start(source: SourceText, node: Any) -> int:
+        """Начало сигнатуры — первый потомок узла, не являющийся декоратором."""
+        for child in node.children:
+            if child.type not in ("decorator", "comment"):
+                return source.start(child)
+        return source.start(node)
@@ -4,8 +4,10 @@ import re
 import ast
 from typing import Optional
 
-from src.models.function_description import FunctionDescription
+from src.models import Language
+from src.models.function_description import FunctionDescription, SourceSpan
 from src.parsers.base_parser import BaseParser
+from src.utils.line_index import LineIndex
 from src.utils.logger import process_logger, error_logger
 
 class PromptParser(BaseParser):
@@ -33,19 +35,33 @@ class PromptParser(BaseParser):
                 break
 
         if code_start is None:
-            error_logger.debug("Не найдено начало кода для запроса:\n" + str(lines))
+            error_logger.debug("Не найдено начало кода для запроса:\n%s", lines)
             return None
 
         prompt = "".join(lines[:code_start]).strip()
-        code = "".join(lines[code_start:]).strip()
+
+        # Код — срез исходного промпта без пробелов по краям
+        first_line = lines[code_start]
+        code_begin = sum(map(len, lines[:code_start])) + len(first_line) - len(first_line.lstrip())
+        code_end = max(len(content.rstrip()), code_begin)
+        code = SourceSpan(content, code_begin, code_end)
+
+        index = LineIndex(content)
+        start_line, start_column = index.position(code_begin)
+        end_line, end_column = index.position(code_end)
 
         fd = FunctionDescription(
+                language=str(Language.PROMPT),
                 full_function_text=code,
                 function_text=None,
                 docstring=prompt,
+                start_line=start_line,
+                end_line=end_line,
+                start_column=start_column,
+                end_column=end_column,
             )
         
-        process_logger.debug(f"Prompt:\n{prompt}\nCode:\n{code}")
+        process_logger.debug("Prompt:\n%s\nCode:\n%s", prompt, code)
         
         out.append(fd)
         return out
\ No newline at end of file
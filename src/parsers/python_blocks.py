@@ -0,0 +1,186 @@
+"""
+Разбиение исходника Python на операторы одного уровня без ast — для файлов с синтаксическими ошибками.
+
+Поток tokenize даёт первый токен каждой строки и глубину скобок в её начале. По колонкам
+этих токенов файл (или тело класса) делится на блоки: def/class вместе с декораторами
+и прочие операторы. Каждый блок затем разбирается ast отдельно, так что ошибка портит
+только свой блок. Если tokenize останавливается на ошибке (незакрытая строка,
+несогласованный отступ), остаток файла размечается построчно.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import tokenize
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+_SKIP_TOKENS = frozenset({
+    tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT,
+    tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER,
+})
+_HEAD_RE = re.compile(r"(?:(async)\s+)?(def|class)\s+(\w+)|(@)")
+
+
+@dataclass(frozen=True)
+class Block:
+    """Оператор уровня column: строки с 1, включительно."""
+
+    kind: str               # "def" | "class" | "" — прочие операторы
+    name: Optional[str]
+    start_line: int         # первая строка, вместе с декораторами
+    header_line: int        # строка с def/class
+    end_line: int           # последняя строка с кодом
+    column: int
+    is_async: bool = False
+
+
+class _Head:
+    """Первый токен строки."""
+
+    __slots__ = ("column", "kind", "name", "nested", "is_async")
+
+    def __init__(self, column: int, kind: str, nested: bool):
+        self.column = column
+        self.kind = kind            # "def" | "class" | "async" | "@" | ""
+        self.name: Optional[str] = None
+        self.nested = nested        # строка начинается внутри незакрытых скобок
+        self.is_async = False
+
+
+class PythonBlocks:
+    """Первые токены строк и строки с кодом одного файла."""
+
+    def __init__(self, content: str):
+        self._heads: dict[int, _Head] = {}
+        code: set[int] = set()
+        covered = self._tokenize(content, code)
+        self._scan_lines(content, covered + 1, code)
+        self._head_lines = sorted(self._heads)
+        self._code_lines = sorted(code)
+
+    def blocks(self, first: int, last: int, column: int) -> list[Block]:
+        """Операторы с колонки column в строках [first, last]; строки левее column завершают блок."""
+        blocks: list[Block] = []
+        current: Optional[tuple[int, int, _Head]] = None      # (начало, строка заголовка, заголовок)
+        decorated_from: Optional[int] = None
+
+        def close(before: int) -> None:
+            if current is None:
+                return
+            start, header_line, head = current
+            kind = head.kind if head.kind in ("def", "class") else ""
+            blocks.append(Block(
+                kind=kind,
+                name=head.name if kind else None,
+                start_line=start,
+                header_line=header_line,
+                end_line=self._last_code_line(start, before - 1),
+                column=column,
+                is_async=head.is_async,
+            ))
+
+        lo = bisect_left(self._head_lines, first)
+        hi = bisect_right(self._head_lines, last)
+        for line in self._head_lines[lo:hi]:
+            head = self._heads[line]
+            if head.column > column:
+                continue
+            if head.nested:
+                continue
+            if head.kind == "@" and head.column == column:
+                if decorated_from is None:
+                    close(line)
+                    current = None
+                    decorated_from = line
+                continue
+            close(decorated_from or line)
+            current = None
+            if head.column == column:
+                current = (decorated_from or line, line, head)
+            decorated_from = None
+        if current is not None:
+            close(last + 1)
+        return blocks
+
+    def body_column(self, header_line: int, end_line: int, column: int) -> Optional[int]:
+        """Колонка первого оператора тела блока, заголовок которого на header_line."""
+        lo = bisect_right(self._head_lines, header_line)
+        hi = bisect_right(self._head_lines, end_line)
+        for line in self._head_lines[lo:hi]:
+            head = self._heads[line]
+            if head.column > column and not head.nested:
+                return head.column
+        return None
+
+    def _last_code_line(self, start: int, limit: int) -> int:
+        index = bisect_right(self._code_lines, limit) - 1
+        return max(self._code_lines[index], start) if index >= 0 else start
+
+    def _tokenize(self, content: str, code: set[int]) -> int:
+        """Разметить строки по токенам; возвращает последнюю строку, до которой дошёл tokenize."""
+        depth = 0
+        covered = 0
+        head: Optional[_Head] = None
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(content).readline):
+                if token.type in _SKIP_TOKENS:
+                    continue
+                line, column = token.start
+                code.add(line)
+                code.add(token.end[0])
+                if line > covered:
+                    kind = ""
+                    if token.type == tokenize.NAME and token.string in ("def", "class", "async"):
+                        kind = token.string
+                    elif token.string == "@":
+                        kind = "@"
+                    head = self._heads[line] = _Head(column, kind, depth > 0)
+                    if head.nested and kind in ("def", "class", "async"):
+                        # Внутри скобок def/class не бывает: скобка осталась незакрытой выше
+                        depth = 0
+                        self._unnest(line)
+                elif head is not None and head.kind == "async":
+                    head.kind = "def" if token.string == "def" else ""
+                    head.is_async = head.kind == "def"
+                elif head is not None and head.kind in ("def", "class") and head.name is None:
+                    head.name = token.string if token.type == tokenize.NAME else ""
+                covered = max(covered, token.end[0])
+
+                if token.type == tokenize.OP:
+                    if token.string in ("(", "[", "{"):
+                        depth += 1
+                    elif token.string in (")", "]", "}"):
+                        depth = max(depth - 1, 0)
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return covered
+
+    def _unnest(self, line: int) -> None:
+        """Снять признак вложенности со строки line и декораторов непосредственно над ней."""
+        self._heads[line].nested = False
+        for previous in range(line - 1, 0, -1):
+            head = self._heads.get(previous)
+            if head is None:
+                continue
+            if head.kind != "@":
+                return
+            head.nested = False
+
+    def _scan_lines(self, content: str, first: int, code: set[int]) -> None:
+        """Построчная разметка остатка файла, который tokenize не разобрал."""
+        lines = content.split("\n")
+        for number in range(first, len(lines) + 1):
+            text = lines[number - 1]
+            stripped = text.lstrip(" \t\f")
+            if not stripped.strip() or stripped.startswith("#"):
+                continue
+            code.add(number)
+            match = _HEAD_RE.match(stripped)
+            kind = "" if match is None else (match.group(2) or match.group(4))
+            head = self._heads[number] = _Head(len(text) - len(stripped), kind, False)
+            if match is not None and match.group(3):
+                head.name = match.group(3)
+                head.is_async = match.group(1) is not None
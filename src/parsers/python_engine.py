@@ -0,0 +1,308 @@
+"""
+Описание функций Python по дереву ast.
+
+FunctionVisitor обходит операторы модуля (ast.NodeVisitor) и описывает функции, методы
+и, по настройке, вложенные функции и лямбды.
+Тексты функций, аннотаций и декораторов — срезы исходника по позициям узлов, а не
+ast.unparse; сигнатура, параметры, тип результата, декораторы и текст без docstring
+вычисляются при первом чтении поля (Deferred).
+"""
+
+from __future__ import annotations
+
+import ast
+from typing import Optional
+
+from src.models import Language
+from src.models.function_description import ClassDescription, Deferred, FunctionDescription, SourceSpan
+from src.utils.line_index import LineIndex
+
+# Узлы, содержащие операторы: обходятся в scope="all"
+_BLOCK_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+class PythonSource:
+    """Исходник модуля с индексом строк: тексты узлов ast — срезы по их позициям."""
+
+    __slots__ = ("content", "index", "_ascii")
+
+    def __init__(self, content: str, index: LineIndex):
+        self.content = content
+        self.index = index
+        self._ascii = content.isascii()
+
+    def column(self, lineno: int, byte_col: int) -> int:
+        """Колонка в символах: ast отдаёт колонки в байтах UTF-8."""
+        if self._ascii:
+            return byte_col
+        line = self.index.line_text(lineno)
+        if line.isascii():
+            return byte_col
+        return len(line.encode("utf-8")[:byte_col].decode("utf-8", errors="ignore"))
+
+    def text(self, node: ast.expr) -> str:
+        """Текст выражения как в исходнике; многострочное выражение собирается в одну строку."""
+        if node.end_lineno != node.lineno:
+            return ast.unparse(node)
+        start = self.index.offset(node.lineno)
+        return self.content[
+            start + self.column(node.lineno, node.col_offset):start + self.column(node.lineno, node.end_col_offset)
+        ]
+
+    def line_end(self, line: int) -> int:
+        """Смещение сразу за строкой line (вместе с переводом строки)."""
+        return self.index.offset(line + 1) if line < self.index.line_count else len(self.content)
+
+    def lines(self, first: int, last: int) -> SourceSpan:
+        """Строки [first, last] целиком; пустой фрагмент, если last < first."""
+        if last < first:
+            return SourceSpan(self.content, 0, 0)
+        return SourceSpan(self.content, self.index.offset(first), self.line_end(last))
+
+
+class FunctionVisitor(ast.NodeVisitor):
+    """
+    Функции и методы из списка операторов модуля за один обход.
+
+    scope="declarations" — функции модуля и методы классов (в том числе вложенных классов);
+    scope="all" — ещё и тела функций (до max_depth объемлющих функций) и составные операторы
+    (if/try/with/for/match...). Выражения не обходятся. Квалифицированное имя собирается
+    из стека областей, как __qualname__: Outer.Inner.method, outer.<locals>.inner.
+    lambdas — описывать и лямбды, присвоенные имени.
+    """
+
+    SCOPES = ("declarations", "all")
+
+    def __init__(
+        self,
+        source: PythonSource,
+        *,
+        scope: str = "declarations",
+        max_depth: Optional[int] = None,
+        lambdas: bool = False,
+    ):
+        if scope not in self.SCOPES:
+            raise ValueError(f"Unknown Python extraction scope '{scope}'")
+        self.source = source
+        self.scope = scope
+        self.max_depth = max_depth
+        self.lambdas = lambdas
+        self._out: list[FunctionDescription] = []
+        self._names: list[str] = []                                 # стек квалифицированного имени
+        self._scopes: list[Optional[ClassDescription]] = []        # класс или None для функции
+        self._depth = 0                                             # число объемлющих функций
+
+    def describe(self, statements: list[ast.stmt]) -> list[FunctionDescription]:
+        self._out = []
+        for stmt in statements:
+            self.visit(stmt)
+        return self._out
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Составные операторы обходятся только в scope="all", и только их вложенные операторы
+        if self.scope == "all":
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, _BLOCK_NODES):
+                    self.visit(child)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._out.append(self._describe(node))
+        if self.scope == "all" and (self.max_depth is None or self._depth < self.max_depth):
+            self._enter(node.name, None)
+            self._names.append("<locals>")
+            self._depth += 1
+            for stmt in node.body:
+                self.visit(stmt)
+            self._depth -= 1
+            self._names.pop()
+            self._leave()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._enter(node.name, class_description(node))
+        for stmt in node.body:
+            self.visit(stmt)
+        self._leave()
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if self.lambdas and len(node.targets) == 1:
+            self._visit_binding(node, node.targets[0], node.value)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        if self.lambdas and node.value is not None:
+            self._visit_binding(node, node.target, node.value)
+
+    def _visit_binding(self, node: ast.stmt, target: ast.expr, value: ast.expr) -> None:
+        if isinstance(target, ast.Name) and isinstance(value, ast.Lambda):
+            self._out.append(self._describe_lambda(node, target.id, value))
+
+    def _enter(self, name: str, cls: Optional[ClassDescription]) -> None:
+        self._names.append(name)
+        self._scopes.append(cls)
+
+    def _leave(self) -> None:
+        self._names.pop()
+        self._scopes.pop()
+
+    def _qualified_name(self, name: str) -> str:
+        return ".".join((*self._names, name)) if self._names else name
+
+    def _enclosing_class(self) -> Optional[ClassDescription]:
+        """Класс, в теле которого непосредственно находится объявление."""
+        return self._scopes[-1] if self._scopes else None
+
+    def _describe(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> FunctionDescription:
+        source = self.source
+        start = node.lineno
+        end = node.end_lineno or start
+        full_text = source.lines(start, end)
+        cls = self._enclosing_class()
+        is_method = cls is not None
+        is_async = isinstance(node, ast.AsyncFunctionDef)
+
+        # docstring в AST — первый stmt в body вида Expr(Constant(str))
+        function_text = full_text
+        function_len = end - start + 1
+        doc, doc_lines = None, 0
+        if node.body and _is_docstring(node.body[0]):
+            doc = Deferred(ast.get_docstring, node)
+            ds_start, ds_end = node.body[0].lineno, node.body[0].end_lineno
+            doc_lines = ds_end - ds_start + 1
+            # Текст без docstring: заголовок до docstring + тело после него
+            function_text = Deferred(_without_docstring, source, start, ds_start, ds_end, end)
+            function_len = (ds_start - start) + max(end - ds_end, 0)
+
+        modifiers = ["async"] if is_async else []
+        names = {_decorator_name(d) for d in node.decorator_list}
+        # "staticmethod"/"classmethod" как модификаторы для Python (по декораторам)
+        modifiers.extend(m for m in ("staticmethod", "classmethod") if m in names)
+
+        return FunctionDescription(
+            language=str(Language.PYTHON),
+            full_function_text=full_text,
+            function_text=function_text,
+            docstring=doc,
+            full_function_lines_length=end - start + 1,
+            function_lines_length=function_len,
+            docstring_lines_length=doc_lines,
+            name=node.name,
+            qualified_name=self._qualified_name(node.name),
+            namespace=None,  # Python: можно будет позже вычислять по модулю/пакету
+            signature_text=Deferred(_signature, source, node, is_async),
+            return_type=Deferred(_expression, source, node.returns) if node.returns is not None else None,
+            parameters=Deferred(_parameters, source, node.args),
+            start_line=start,
+            end_line=end,
+            start_column=source.column(start, node.col_offset),
+            end_column=source.column(end, node.end_col_offset),
+            is_method=is_method,
+            class_name=cls.name if cls is not None else None,
+            class_description=ClassDescription.docstring.raw(cls) if cls is not None else None,
+            class_info=cls,
+            decorators=Deferred(_decorators, source, node.decorator_list) if node.decorator_list else [],
+            modifiers=modifiers,
+            visibility=None,
+            has_body=True,  # в Python у FunctionDef всегда есть body (даже если 'pass')
+            is_constructor=(is_method and node.name == "__init__"),
+        )
+
+
+    def _describe_lambda(self, stmt: ast.stmt, name: str, node: ast.Lambda) -> FunctionDescription:
+        """Лямбда, присвоенная имени: текст — оператор присваивания целиком."""
+        source = self.source
+        start = stmt.lineno
+        end = stmt.end_lineno or start
+        text = source.lines(start, end)
+        cls = self._enclosing_class()
+        return FunctionDescription(
+            language=str(Language.PYTHON),
+            full_function_text=text,
+            function_text=text,
+            full_function_lines_length=end - start + 1,
+            function_lines_length=end - start + 1,
+            name=name,
+            qualified_name=self._qualified_name(name),
+            signature_text=Deferred(_lambda_signature, source, name, node.args),
+            parameters=Deferred(_parameters, source, node.args),
+            start_line=start,
+            end_line=end,
+            start_column=source.column(start, stmt.col_offset),
+            end_column=source.column(end, stmt.end_col_offset),
+            is_method=cls is not None,
+            class_name=cls.name if cls is not None else None,
+            class_description=ClassDescription.docstring.raw(cls) if cls is not None else None,
+            class_info=cls,
+            modifiers=["lambda"],
+        )
+
+
+def class_description(node: ast.ClassDef) -> ClassDescription:
+    """Общее описание класса для его методов; docstring — по требованию."""
+    return ClassDescription(
+        name=node.name,
+        docstring=Deferred(ast.get_docstring, node),
+        start_line=node.lineno,
+        end_line=node.end_lineno or node.lineno,
+    )
+
+
+# ---------------- отложенные поля: func(*args) ----------------
+
+def _expression(source: PythonSource, node: ast.expr) -> str:
+    return source.text(node)
+
+
+def _decorators(source: PythonSource, nodes: list[ast.expr]) -> list[str]:
+    return [source.text(node) for node in nodes]
+
+
+def _parameters(source: PythonSource, args: ast.arguments) -> list[str]:
+    def fmt(arg: ast.arg, prefix: str = "") -> str:
+        if arg.annotation is None:
+            return prefix + arg.arg
+        return f"{prefix}{arg.arg}: {source.text(arg.annotation)}"
+
+    params = [fmt(arg) for arg in args.posonlyargs]
+    if args.posonlyargs:
+        params.append("/")
+    params.extend(fmt(arg) for arg in args.args)
+    if args.vararg:
+        params.append(fmt(args.vararg, "*"))
+    elif args.kwonlyargs:
+        params.append("*")
+    params.extend(fmt(arg) for arg in args.kwonlyargs)
+    if args.kwarg:
+        params.append(fmt(args.kwarg, "**"))
+    return params
+
+
+def _signature(source: PythonSource, node: ast.FunctionDef | ast.AsyncFunctionDef, is_async: bool) -> str:
+    deco_lines = "".join(f"@{d}\n" for d in _decorators(source, node.decorator_list))
+    async_kw = "async " if is_async else ""
+    ret = f" -> {source.text(node.returns)}" if node.returns is not None else ""
+    return f"{deco_lines}{async_kw}def {node.name}({', '.join(_parameters(source, node.args))}){ret}:"
+
+
+def _lambda_signature(source: PythonSource, name: str, args: ast.arguments) -> str:
+    return f"{name} = lambda {', '.join(_parameters(source, args))}:"
+
+
+def _without_docstring(source: PythonSource, start: int, ds_start: int, ds_end: int, end: int) -> str:
+    return str(source.lines(start, ds_start - 1)) + str(source.lines(ds_end + 1, end))
+
+
+def _is_docstring(stmt: ast.stmt) -> bool:
+    return (
+        isinstance(stmt, ast.Expr)
+        and isinstance(stmt.value, ast.Constant)
+        and isinstance(stmt.value.value, str)
+    )
+
+
+def _decorator_name(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
@@ -3,226 +3,218 @@ from __future__ import annotations
 import ast
 from typing import Optional
 
-from src.models.function_description import FunctionDescription
+from src.config import ParserFactoryConfig, PythonParserConfig
+from src.models.function_description import ClassDescription, FunctionDescription, SourceSpan
 from src.parsers.base_parser import BaseParser
+from src.parsers.incremental import RecentParses, boundary_regions, merge_boundaries, splice
+from src.parsers.python_blocks import Block, PythonBlocks
+from src.parsers.python_engine import FunctionVisitor, PythonSource, class_description
 from src.models import Language
+from src.utils.line_index import LineIndex
+from src.utils.text_edit import compute_edit
 
 
 class PythonParser(BaseParser):
+    VERSION = "7"
+
+    def __init__(self, config: Optional[PythonParserConfig] = None):
+        self.config = config or PythonParserConfig()
+        if self.config.scope not in FunctionVisitor.SCOPES:
+            raise ValueError(f"Unknown Python extraction scope '{self.config.scope}'")
+        if self.config != PythonParserConfig():
+            # Настройки меняют результат, поэтому входят в версию (ключ кеша)
+            c = self.config
+            self.VERSION = f"{PythonParser.VERSION}-{c.scope}-{c.max_depth}-{int(c.lambdas)}"
+        # Начала верхнеуровневых операторов последних разобранных версий — для reparse
+        self._recent = RecentParses()
+
+    @classmethod
+    def from_config(cls, config: ParserFactoryConfig) -> PythonParser:
+        return cls(config.python)
+
     def parse_content(self, content: str) -> list[FunctionDescription]:
+        # ast считает переводом строки и одиночный \r, а индекс строк — только \n
+        normalized = _has_lone_cr(content)
+        if normalized:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+        index = LineIndex(content)                      # Начала строк: тексты функций — срезы исходника.
         try:
             tree = ast.parse(content)
         except SyntaxError:
-            return []
-
-        lines = content.splitlines(keepends=True)       # Весь код в файле.
-        out: list[FunctionDescription] = []             # Результат работы функции.
-
-        #==============================ФУНКЦИИ==============================
-        def node_span(node: ast.AST) -> tuple[int, int]:
-            start = getattr(node, "lineno", None)
-            end = getattr(node, "end_lineno", None)
-            if start is None:
-                return (1, 0)
-            if end is None:
-                end = start
-            return (start, end)
-
-        def slice_lines(start_1based: int, end_1based_inclusive: int) -> str:
-            if end_1based_inclusive < start_1based:
-                return ""
-            return "".join(lines[start_1based - 1 : end_1based_inclusive])
-
-        def build_params(fn: ast.AST) -> list[str]:
-            assert isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))
-            a = fn.args
-            params: list[str] = []
-
-            def fmt_arg(arg: ast.arg) -> str:
-                if arg.annotation is None:
-                    return arg.arg
-                return f"{arg.arg}: {ast.unparse(arg.annotation)}"
-
-            for arg in a.posonlyargs:
-                params.append(fmt_arg(arg))
-            if a.posonlyargs:
-                params.append("/")
-
-            for arg in a.args:
-                params.append(fmt_arg(arg))
-
-            if a.vararg:
-                var = f"*{a.vararg.arg}"
-                if a.vararg.annotation:
-                    var += f": {ast.unparse(a.vararg.annotation)}"
-                params.append(var)
-            elif a.kwonlyargs:
-                params.append("*")
-
-            for arg in a.kwonlyargs:
-                params.append(fmt_arg(arg))
-
-            if a.kwarg:
-                kw = f"**{a.kwarg.arg}"
-                if a.kwarg.annotation:
-                    kw += f": {ast.unparse(a.kwarg.annotation)}"
-                params.append(kw)
-
-            return params
-
-        def build_return_type(fn: ast.AST) -> Optional[str]:
-            assert isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))
-            if fn.returns is None:
-                return None
-            return ast.unparse(fn.returns)
-
-        def build_decorators(fn: ast.AST) -> list[str]:
-            assert isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))
-            return [ast.unparse(d) for d in fn.decorator_list]  # строковое представление [web:148]
-
-        def is_docstring_expr(stmt: ast.stmt) -> bool:
-            # docstring в AST — первый stmt в body вида Expr(Constant(str)) [web:188]
-            return (
-                isinstance(stmt, ast.Expr)
-                and isinstance(getattr(stmt, "value", None), ast.Constant)
-                and isinstance(stmt.value.value, str)
+            return self._recover(content, index)
+
+        if not normalized:
+            self._recent.put(content, sorted({0, *self._boundaries(index, tree.body), len(content)}))
+        return self._describe_statements(content, index, tree.body)
+
+    def reparse(
+        self, old_content: str, old_functions: list[FunctionDescription], new_content: str
+    ) -> list[FunctionDescription]:
+        """
+        Заново разбираются только верхнеуровневые операторы, задетые правкой: участок между
+        началами операторов старой версии. Если участок не разбирается отдельно (правка
+        затронула отступ или скобки соседей), он расширяется на соседние операторы.
+        """
+        edit = compute_edit(old_content, new_content)
+        if edit is None:
+            return list(old_functions)
+        boundaries = self._recent.get(old_content)
+        if boundaries is None or _has_lone_cr(new_content):
+            return self.parse_content(new_content)
+
+        index = LineIndex(new_content)
+        for lo, hi in boundary_regions(boundaries, edit):
+            new_hi = hi + edit.char_delta
+            try:
+                tree = ast.parse(new_content[lo:new_hi])
+            except SyntaxError:
+                continue
+            # Участок начинается с начала строки: колонки ast совпадают с колонками в файле
+            ast.increment_lineno(tree, index.line(lo) - 1)
+            functions = splice(
+                old_functions, new_content, edit, index.position(lo), index.position(new_hi),
+                self._describe_statements(new_content, index, tree.body),
             )
-
-        def build_signature_text(
-            fn: ast.AST,
-            *,
-            decorators: list[str],
-            return_type: Optional[str],
-            parameters: list[str],
-            is_async: bool,
-        ) -> str:
-            deco_lines = "".join(f"@{d}\n" for d in decorators)
-            async_kw = "async " if is_async else ""
-            params_joined = ", ".join(parameters)
-            ret = f" -> {return_type}" if return_type else ""
-            return f"{deco_lines}{async_kw}def {fn.name}({params_joined}){ret}:"
-
-        def build_function_texts(fn: ast.AST) -> tuple[str, str, Optional[str], int, int]:
-            """return (full_text, function_text_wo_docstring, docstring, ds_lines, fn_lines)."""
-            assert isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))
-            start, end = node_span(fn)
-            full_text = slice_lines(start, end)
-
-            doc = ast.get_docstring(fn)  # извлекает docstring функции [web:188]
-            doc_lines = 0
-
-            # По умолчанию function_text == full_text
-            function_text = full_text
-
-            if fn.body and is_docstring_expr(fn.body[0]) and doc is not None:
-                ds_node = fn.body[0]
-                ds_start, ds_end = node_span(ds_node)
-                doc_lines = ds_end - ds_start + 1
-
-                # Убираем docstring из текста: header до docstring + тело после docstring
-                header = slice_lines(start, ds_start - 1)
-                tail_start = ds_end + 1
-                tail = slice_lines(tail_start, end) if tail_start <= end else ""
-                function_text = header + tail
-
-            fn_lines = end - start + 1
-            return full_text, function_text, doc, doc_lines, fn_lines
-
-        def build_modifiers(is_async: bool, decorators: list[str]) -> list[str]:
-            mods: list[str] = []
-            if is_async:
-                mods.append("async")
-            # "staticmethod"/"classmethod" как модификаторы для Python (по декораторам)
-            if any(d == "staticmethod" or d.endswith(".staticmethod") for d in decorators):
-                mods.append("staticmethod")
-            if any(d == "classmethod" or d.endswith(".classmethod") for d in decorators):
-                mods.append("classmethod")
-            return mods
-
-        def build_desc(
-            fn: ast.AST,
-            *,
-            is_method: bool,
-            class_name: Optional[str],
-            class_description: Optional[str],
-        ) -> FunctionDescription:
-            assert isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))
-
-            start, end = node_span(fn)
-            full_text, function_text, doc, doc_lines, full_lines = build_function_texts(fn)
-
-            is_async = isinstance(fn, ast.AsyncFunctionDef)  # async-функции
-            decorators = build_decorators(fn)
-            params = build_params(fn)
-            ret_type = build_return_type(fn)
-
-            qualified_name = f"{class_name}.{fn.name}" if class_name else fn.name
-            signature_text = build_signature_text(
-                fn,
-                decorators=decorators,
-                return_type=ret_type,
-                parameters=params,
-                is_async=is_async,
-            )
-
-            # Длины
-            full_len = full_lines
-            function_len = function_text.count("\n") + (0 if function_text.endswith("\n") or function_text == "" else 1)
-
-            return FunctionDescription(
-                language=str(Language.PYTHON),
-                full_function_text=full_text,
-                function_text=function_text,
-                docstring=doc,
-                full_function_lines_length=full_len,
-                function_lines_length=function_len,
-                docstring_lines_length=doc_lines,
-                name=fn.name,
-                qualified_name=qualified_name,
-                namespace=None,  # Python: можно будет позже вычислять по модулю/пакету
-                signature_text=signature_text,
-                return_type=ret_type,
-                parameters=params,
-                start_line=start,
-                end_line=end,
-                is_method=is_method,
-                class_name=class_name,
-                class_description=class_description,
-                decorators=decorators,
-                modifiers=build_modifiers(is_async, decorators),
-                visibility=None,
-                has_body=True,  # в Python у FunctionDef всегда есть body (даже если 'pass')
-                is_constructor=(is_method and fn.name == "__init__"),
-            )
-
-        def visit_class(cls: ast.ClassDef) -> None:
-            cls_doc = ast.get_docstring(cls)  # docstring класса [web:188]
-            for stmt in cls.body:
-                if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    out.append(
-                        build_desc(
-                            stmt,
-                            is_method=True,
-                            class_name=cls.name,
-                            class_description=cls_doc,
-                        )
-                    )
-                elif isinstance(stmt, ast.ClassDef):
-                    visit_class(stmt)       # Случай рекурсивных классов
-        #===========================КОНЕЦ ФУНКЦИЙ===========================
-
-        # Обходим и обрабатываем каждую найденную функцию
-        for stmt in tree.body:
-            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                out.append(
-                    build_desc(
-                        stmt,
-                        is_method=False,
-                        class_name=None,
-                        class_description=None,
-                    )
-                )
-            elif isinstance(stmt, ast.ClassDef):
-                visit_class(stmt)
-
+            if functions is None:
+                break
+            inner = self._boundaries(index, tree.body)
+            self._recent.put(new_content, merge_boundaries(boundaries, lo, hi, edit.char_delta, inner))
+            return functions
+        return self.parse_content(new_content)
+
+    def _recover(self, content: str, index: LineIndex) -> list[FunctionDescription]:
+        """
+        Описания функций файла с синтаксической ошибкой: блоки def/class верхнего уровня
+        разбираются по отдельности, у неразобранного класса — каждый метод. Функция, блок
+        которой не разбирается, описывается по тексту с пометкой parse_error.
+        """
+        blocks = PythonBlocks(content)
+        statements: list[ast.stmt] = []
+        broken: list[FunctionDescription] = []
+        for block in blocks.blocks(1, index.line_count, 0):
+            if block.kind:
+                statements.extend(self._recover_block(content, index, blocks, block, (), broken))
+        out = self._describe_statements(content, index, statements) + broken
+        out.sort(key=lambda fd: (fd.start_line, fd.start_column))
         return out
+
+    def _recover_block(
+        self,
+        content: str,
+        index: LineIndex,
+        blocks: PythonBlocks,
+        block: Block,
+        classes: tuple[ast.ClassDef, ...],
+        broken: list[FunctionDescription],
+    ) -> list[ast.stmt]:
+        """Операторы блока def/class; classes — восстановленные классы, в теле которых лежит блок."""
+        if not block.name:
+            # Заголовок без имени («class:», «def» в конце строки) не даёт ни функции, ни области имён
+            return []
+        try:
+            return _parse_block(content, index, block)
+        except SyntaxError as error:
+            if block.kind == "def":
+                broken.append(self._describe_broken(content, index, block, classes, error))
+                return []
+
+        # Класс целиком не разбирается: собираем его из разобранных операторов тела
+        recovered = ast.ClassDef(
+            name=block.name, bases=[], keywords=[], body=[], decorator_list=[],
+            lineno=block.header_line, col_offset=block.column,
+            end_lineno=block.end_line, end_col_offset=len(index.line_text(block.end_line)),
+        )
+        column = blocks.body_column(block.header_line, block.end_line, block.column)
+        if column is not None:
+            for i, inner in enumerate(blocks.blocks(block.header_line + 1, block.end_line, column)):
+                if inner.kind:
+                    recovered.body.extend(self._recover_block(
+                        content, index, blocks, inner, (*classes, recovered), broken,
+                    ))
+                elif i == 0:
+                    # Первый оператор тела может быть docstring класса
+                    try:
+                        recovered.body.extend(_parse_block(content, index, inner))
+                    except SyntaxError:
+                        pass
+        return [recovered]
+
+    @staticmethod
+    def _describe_broken(
+        content: str, index: LineIndex, block: Block, classes: tuple[ast.ClassDef, ...], error: SyntaxError
+    ) -> FunctionDescription:
+        """Описание функции, блок которой не разбирается: текст, позиция, имя и сообщение об ошибке."""
+        text = SourceSpan(content, index.offset(block.header_line), _line_end(content, index, block.end_line))
+        name = block.name
+        cls = classes[-1] if classes else None
+        info = class_description(cls) if cls is not None else None
+        class_name = cls.name if cls is not None else None
+        lines = block.end_line - block.header_line + 1
+        return FunctionDescription(
+            language=str(Language.PYTHON),
+            full_function_text=text,
+            function_text=text,
+            full_function_lines_length=lines,
+            function_lines_length=lines,
+            name=name,
+            qualified_name=".".join([*(c.name for c in classes), name]),
+            signature_text=index.line_text(block.header_line).strip(),
+            start_line=block.header_line,
+            end_line=block.end_line,
+            start_column=block.column,
+            end_column=len(index.line_text(block.end_line)),
+            is_method=cls is not None,
+            class_name=class_name,
+            class_description=ClassDescription.docstring.raw(info) if info is not None else None,
+            class_info=info,
+            modifiers=["async"] if block.is_async else [],
+            is_constructor=(cls is not None and name == "__init__"),
+            parse_error=f"{error.msg} (line {error.lineno})" if error.lineno else error.msg,
+        )
+
+    @staticmethod
+    def _boundaries(index: LineIndex, statements: list[ast.stmt]) -> list[int]:
+        """Смещения начал строк, с которых начинаются операторы с колонки 0 (вместе с декораторами)."""
+        result = []
+        for stmt in statements:
+            if stmt.col_offset == 0:
+                line = min([stmt.lineno] + [d.lineno for d in getattr(stmt, "decorator_list", ())])
+                result.append(index.offset(line))
+        return result
+
+    def _describe_statements(
+        self, content: str, index: LineIndex, statements: list[ast.stmt]
+    ) -> list[FunctionDescription]:
+        """Описания функций верхнеуровневых операторов statements (по настройкам self.config)."""
+        visitor = FunctionVisitor(
+            PythonSource(content, index),
+            scope=self.config.scope,
+            max_depth=self.config.max_depth,
+            lambdas=self.config.lambdas,
+        )
+        return visitor.describe(statements)
+
+
+def _line_end(content: str, index: LineIndex, line: int) -> int:
+    """Смещение сразу за строкой line (вместе с переводом строки)."""
+    return index.offset(line + 1) if line < index.line_count else len(content)
+
+
+def _parse_block(content: str, index: LineIndex, block: Block) -> list[ast.stmt]:
+    """ast-операторы блока с номерами строк файла; SyntaxError — тоже с номером строки файла."""
+    chunk = content[index.offset(block.start_line):_line_end(content, index, block.end_line)]
+    # Блок из тела класса разбирается внутри подставного класса: колонки остаются как в файле
+    shift = block.start_line - 1 if block.column == 0 else block.start_line - 2
+    try:
+        tree = ast.parse(chunk if block.column == 0 else "class _:\n" + chunk)
+    except SyntaxError as error:
+        if error.lineno is not None:
+            error.lineno += shift
+        raise
+    ast.increment_lineno(tree, shift)
+    return tree.body if block.column == 0 else tree.body[0].body
+
+
+def _has_lone_cr(content: str) -> bool:
+    return content.count("\r") != content.count("\r\n")
@@ -0,0 +1,466 @@
+"""
+Общий движок парсеров на tree-sitter.
+
+- Грамматики загружаются один раз на процесс, запросы компилируются один раз на грамматику
+- tree_sitter.Parser хранит нативное состояние, поэтому парсеры помечены THREAD_SAFE = False:
+  ParserFactory держит по экземпляру (и по Parser) на поток и переиспользует их
+- Функции и методы находятся скомпилированным запросом tree-sitter (обход дерева — в C),
+  а Python только заполняет FunctionDescription по найденным узлам
+- tree-sitter считает смещения в байтах UTF-8; наружу отдаются смещения в символах
+- reparse правит дерево прошлой версии (Tree.edit) и разбирает файл инкрементально,
+  а описывает заново только функции верхнеуровневых узлов, задетых правкой
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Iterable, Optional, Union
+
+from src.models.function_description import ClassDescription, Deferred, FunctionDescription, SourceSpan
+from src.parsers.base_parser import BaseParser
+from src.parsers.incremental import RecentParses, splice
+from src.utils.line_index import LineIndex
+from src.utils.text_edit import TextEdit, compute_edit
+
+try:
+    import tree_sitter
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    tree_sitter = None
+    TREE_SITTER_AVAILABLE = False
+
+# QueryCursor появился в tree-sitter 0.25; раньше matches вызывались у самого Query
+_QueryCursor = getattr(tree_sitter, "QueryCursor", None)
+
+# Грамматика -> (модуль пакета, функция, возвращающая указатель на язык)
+GRAMMARS: dict[str, tuple[str, str]] = {
+    "go": ("tree_sitter_go", "language"),
+    "javascript": ("tree_sitter_javascript", "language"),
+    "tsx": ("tree_sitter_typescript", "language_tsx"),
+    "csharp": ("tree_sitter_c_sharp", "language"),
+}
+
+
+@lru_cache(maxsize=None)
+def load_language(grammar: str) -> Any:
+    """tree_sitter.Language грамматики; загружается один раз на процесс."""
+    if not TREE_SITTER_AVAILABLE:
+        raise NotImplementedError("tree-sitter is not installed")
+    module_name, attr = GRAMMARS[grammar]
+    try:
+        module = import_module(module_name)
+    except ImportError as e:
+        raise NotImplementedError(f"tree-sitter grammar '{grammar}' is not installed: {e}") from e
+    return tree_sitter.Language(getattr(module, attr)())
+
+
+@lru_cache(maxsize=None)
+def compile_query(grammar: str, source: str) -> Any:
+    """Скомпилированный запрос; Query неизменяем и разделяется всеми потоками."""
+    return tree_sitter.Query(load_language(grammar), source)
+
+
+def run_query(
+    query: Any, node: Any, byte_range: Optional[tuple[int, int]] = None
+) -> list[tuple[int, dict[str, list[Any]]]]:
+    """
+    Совпадения запроса в поддереве node: [(номер шаблона, {захват: [узлы]})].
+    byte_range ограничивает поиск совпадениями, пересекающими диапазон; старые версии
+    tree-sitter его не поддерживают и возвращают все совпадения.
+    """
+    if _QueryCursor is not None:
+        cursor = _QueryCursor(query)
+        if byte_range is not None:
+            cursor.set_byte_range(*byte_range)
+        return cursor.matches(node)
+    return query.matches(node)
+
+
+def collapse_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+def clean_comment(text: Union[str, SourceSpan, None]) -> Optional[str]:
+    """
+    Очищает комментарий от маркеров ///, //, /**, /*, */ и ведущих звёздочек.
+    Внутренние пустые строки сохраняются, крайние — удаляются.
+    """
+    if not text:
+        return None
+
+    lines = []
+    for line in str(text).splitlines():
+        line = line.strip()
+        if line.startswith("///"):
+            line = line[3:]
+        elif line.startswith("//"):
+            line = line[2:]
+        else:
+            if line.startswith("/**"):
+                line = line[3:]
+            elif line.startswith("/*"):
+                line = line[2:]
+            if line.endswith("*/"):
+                line = line[:-2]
+            if line.startswith("*"):
+                line = line[1:]
+        lines.append(line.strip())
+
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+
+    return "\n".join(lines) if lines else None
+
+
+def line_count(text: Optional[str]) -> Optional[int]:
+    """Число строк очищенного комментария; None — если комментария нет."""
+    return text.count("\n") + 1 if text else None
+
+
+def signature_text(content: str, start: int, end: int) -> str:
+    """Заголовок объявления content[start:end] одной строкой, без `;` и стрелки `=>` в конце."""
+    signature = collapse_whitespace(content[start:end]).rstrip(";")
+    if signature.endswith("=>"):
+        signature = signature[:-2].rstrip()
+    return signature
+
+
+class SourceText:
+    """Исходник файла: перевод байтовых позиций узлов tree-sitter в символьные смещения."""
+
+    __slots__ = ("text", "data", "index", "_ascii")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.data = text.encode("utf-8", "surrogatepass")
+        self.index = LineIndex(text)
+        # Для ASCII байтовые и символьные смещения совпадают
+        self._ascii = len(self.data) == len(text)
+
+    def offset(self, byte_offset: int, point: Any) -> int:
+        if self._ascii:
+            return byte_offset
+        row, column = point
+        line = self.index.line_text(row + 1)
+        if not line.isascii():
+            column = len(line.encode("utf-8", "surrogatepass")[:column].decode("utf-8", "surrogatepass"))
+        return self.index.offset(row + 1, column)
+
+    def byte_offset(self, offset: int) -> int:
+        """Байтовое смещение для символьного (обратное к offset)."""
+        if self._ascii:
+            return offset
+        return len(self.text[:offset].encode("utf-8", "surrogatepass"))
+
+    def start(self, node: Any) -> int:
+        return self.offset(node.start_byte, node.start_point)
+
+    def end(self, node: Any) -> int:
+        return self.offset(node.end_byte, node.end_point)
+
+    def node_text(self, node: Optional[Any]) -> Optional[str]:
+        if node is None:
+            return None
+        return self.data[node.start_byte:node.end_byte].decode("utf-8", "surrogatepass")
+
+
+class TreeSitterParser(BaseParser):
+    """
+    Базовый класс парсеров на tree-sitter.
+    Подкласс задаёт грамматику, язык и запрос, а в _describe_matches
+    превращает совпадения запроса в FunctionDescription.
+    """
+
+    VERSION = "2"
+    THREAD_SAFE = False
+
+    GRAMMAR: str = ""
+    LANGUAGE: str = ""
+    QUERY: str = ""
+    # Комментарии, которые считаются документацией объявления
+    DOC_PREFIXES: tuple[str, ...] = ("//", "/**")
+    # Верхнеуровневые узлы, от которых зависят описания функций во всём файле
+    # (пакет, типы с документацией для методов); их правка описывает файл заново
+    SHARED_NODES: frozenset[str] = frozenset()
+    # Узлы-контейнеры (тип -> поле тела), внутрь которых спускается поиск участка,
+    # если правка целиком внутри тела (например, namespace { ... } в C#)
+    CONTAINER_NODES: dict[str, str] = {}
+
+    def __init__(self):
+        self._query = compile_query(self.GRAMMAR, self.QUERY)
+        self._parser = tree_sitter.Parser(load_language(self.GRAMMAR))
+        # Деревья последних разобранных версий: содержимое -> (дерево, запрос)
+        self._recent = RecentParses()
+
+    def parse_content(self, content: str) -> list[FunctionDescription]:
+        source = SourceText(content)
+        tree, query = self._parse(source)
+        self._recent.put(content, (tree, query))
+        return self._describe_matches(source, run_query(query, tree.root_node))
+
+    def reparse(
+        self, old_content: str, old_functions: list[FunctionDescription], new_content: str
+    ) -> list[FunctionDescription]:
+        """
+        Дерево прошлой версии правится (Tree.edit) и передаётся парсеру для инкрементального разбора.
+        Запрос выполняется только по участку из верхнеуровневых узлов, задетых правкой (с соседями
+        и примыкающими комментариями), и по узлам SHARED_NODES; остальные описания сдвигаются.
+        Если дерева прошлой версии нет (его разбирал другой поток или процесс), файл описывается целиком.
+        """
+        edit = compute_edit(old_content, new_content)
+        if edit is None:
+            return list(old_functions)
+
+        source = SourceText(new_content)
+        old_tree = None
+        cached = self._recent.pop(old_content)
+        if cached is not None and cached[1] is self._query:
+            old_tree = cached[0]
+            tree_edit = self._tree_edit(old_content, source, edit)
+            # Удалённый узел SHARED_NODES в новом дереве не найти, поэтому правка общих узлов
+            # проверяется по старому дереву: тогда файл описывается целиком
+            valid = not old_tree.root_node.has_error and not any(
+                child.type in self.SHARED_NODES
+                and child.start_byte <= tree_edit["old_end_byte"] and tree_edit["start_byte"] <= child.end_byte
+                for child in old_tree.root_node.children
+            )
+            old_tree.edit(**tree_edit)
+        tree, query = self._parse(source, old_tree)
+        # Восстановление после ошибок зависит от истории разбора и перестраивает дерево далеко
+        # от правки: дерево с ошибками строится заново, а описания склеиваются только между
+        # версиями, разобранными без ошибок
+        region = None
+        if old_tree is not None and tree.root_node.has_error:
+            tree, query = self._parse(source)
+        elif old_tree is not None and valid:
+            region = self._region(source, tree.root_node, edit)
+        self._recent.put(new_content, (tree, query))
+
+        if region is not None:
+            start, end = region
+            start_byte, end_byte = source.byte_offset(start), source.byte_offset(end)
+            root = tree.root_node
+            matches = [
+                match for child in root.children if child.type in self.SHARED_NODES
+                for match in run_query(query, child)
+            ]
+            matches.extend(
+                match for match in run_query(query, root, (start_byte, end_byte))
+                if "function" not in match[1] or start_byte <= match[1]["function"][0].start_byte < end_byte
+            )
+            functions = splice(
+                old_functions, new_content, edit,
+                source.index.position(start), source.index.position(end),
+                self._describe_matches(source, matches),
+            )
+            if functions is not None:
+                return functions
+        return self._describe_matches(source, run_query(query, tree.root_node))
+
+    def _parse(self, source: SourceText, old_tree: Optional[Any] = None) -> tuple[Any, Any]:
+        """Дерево файла и запрос к нему; old_tree — отредактированное дерево прошлой версии."""
+        if old_tree is not None:
+            return self._parser.parse(source.data, old_tree), self._query
+        return self._parser.parse(source.data), self._query
+
+    @staticmethod
+    def _tree_edit(old_content: str, source: SourceText, edit: TextEdit) -> dict[str, Any]:
+        """Аргументы Tree.edit: правка в байтах и точках (строка, колонка в байтах)."""
+        start_byte = source.byte_offset(edit.start)
+        start_point = (edit.start_line - 1, 0)           # правка начинается с начала строки
+
+        def end_of(text: str) -> tuple[int, tuple[int, int]]:
+            data = text.encode("utf-8", "surrogatepass")
+            tail = data.rfind(b"\n") + 1
+            return start_byte + len(data), (start_point[0] + data.count(b"\n"), len(data) - tail)
+
+        old_end_byte, old_end_point = end_of(old_content[edit.start:edit.old_end])
+        new_end_byte, new_end_point = end_of(source.text[edit.start:edit.new_end])
+        return {
+            "start_byte": start_byte,
+            "old_end_byte": old_end_byte,
+            "new_end_byte": new_end_byte,
+            "start_point": start_point,
+            "old_end_point": old_end_point,
+            "new_end_point": new_end_point,
+        }
+
+    def _region(self, source: SourceText, root: Any, edit: TextEdit) -> Optional[tuple[int, int]]:
+        """
+        Участок новой версии (символьные смещения), функции которого описываются заново:
+        верхнеуровневые узлы (или узлы тела контейнера, в котором целиком лежит правка), задетые правкой, по соседу с каждой стороны (от них зависит
+        документация) и примыкающие комментарии. None — если задет узел из SHARED_NODES.
+        """
+        start, end = edit.start, edit.new_end
+        lo_byte, hi_byte = source.byte_offset(start), source.byte_offset(end)
+        parent = root
+        while True:
+            inner = next((c for c in parent.children if c.start_byte <= lo_byte and hi_byte <= c.end_byte), None)
+            body = inner.child_by_field_name(self.CONTAINER_NODES[inner.type]) if (
+                inner is not None and inner.type in self.CONTAINER_NODES
+            ) else None
+            if body is None or not (body.start_byte < lo_byte and hi_byte < body.end_byte):
+                break
+            parent = body
+        children = parent.children
+        if not children:
+            return start, end
+        first = next((i for i, child in enumerate(children) if child.end_byte >= lo_byte), len(children))
+        last = next((i for i in range(len(children) - 1, -1, -1) if children[i].start_byte <= hi_byte), -1)
+        first, last = max(first - 1, 0), min(last + 1, len(children) - 1)
+        while first > 0 and children[first - 1].type == "comment":
+            first -= 1
+        while last < len(children) - 1 and children[last].type == "comment":
+            last += 1
+        if first > last:
+            return start, end
+        if any(child.type in self.SHARED_NODES for child in children[first:last + 1]):
+            return None
+        return min(start, source.start(children[first])), max(end, source.end(children[last]))
+
+    def _describe_matches(
+        self, source: SourceText, matches: list[tuple[int, dict[str, list[Any]]]]
+    ) -> list[FunctionDescription]:
+        raise NotImplementedError
+
+    # ---------------- общие помощники для подклассов ----------------
+
+    @staticmethod
+    def _functions(matches: Iterable[tuple[int, dict[str, list[Any]]]]) -> list[dict[str, Any]]:
+        """Совпадения с захватом @function в порядке следования в файле (по одному узлу на захват)."""
+        found = [
+            {name: nodes[0] for name, nodes in captures.items()}
+            for _, captures in matches
+            if "function" in captures
+        ]
+        found.sort(key=lambda captures: captures["function"].start_byte)
+        return found
+
+    def _leading_doc(self, source: SourceText, node: Any) -> tuple[Optional[Deferred], Optional[Any]]:
+        """
+        Документация объявления: идущие подряд комментарии вплотную над узлом.
+        Комментарий в хвосте строки с кодом не учитывается.
+        Возвращает очищенный текст (по требованию) и первый узел комментария.
+        """
+        first = None
+        row = node.start_point[0]
+        sibling = node.prev_sibling
+        while sibling is not None and sibling.type == "comment" and sibling.end_point[0] >= row - 1:
+            text = source.node_text(sibling)
+            if not text.startswith(self.DOC_PREFIXES):
+                break
+            previous = sibling.prev_sibling
+            if previous is not None and previous.end_point[0] == sibling.start_point[0]:
+                break
+            first, row, sibling = sibling, sibling.start_point[0], previous
+        if first is None:
+            return None, None
+        return Deferred(clean_comment, SourceSpan(source.text, source.start(first), source.end(node.prev_sibling))), first
+
+    def _class_info(
+        self,
+        source: SourceText,
+        node: Any,
+        name: str,
+        kind: str,
+        classes: dict[int, ClassDescription],
+        doc_node: Optional[Any] = None,
+    ) -> ClassDescription:
+        """
+        Общее описание класса node для его методов: одно на узел в пределах classes
+        (словарь одного разбора). Документация ищется над doc_node, по умолчанию — над node.
+        """
+        info = classes.get(node.start_byte)
+        if info is None:
+            docstring, _ = self._leading_doc(source, doc_node if doc_node is not None else node)
+            info = classes[node.start_byte] = ClassDescription(
+                name=name,
+                kind=kind,
+                docstring=docstring,
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+            )
+        return info
+
+    @staticmethod
+    def _parameters(source: SourceText, params: Optional[Any]) -> list[str]:
+        if params is None:
+            return []
+        return [
+            collapse_whitespace(source.node_text(child))
+            for child in params.named_children
+            if child.type != "comment"
+        ]
+
+    def _describe(
+        self,
+        source: SourceText,
+        *,
+        node: Any,
+        outer: Any,
+        body: Optional[Any],
+        signature_start: int,
+        name: str,
+        class_name: Optional[str] = None,
+        class_info: Optional[ClassDescription] = None,
+        namespace: Optional[str] = None,
+        return_type: Optional[str] = None,
+        parameters: Optional[list[str]] = None,
+        decorators: Optional[list[str]] = None,
+        modifiers: Optional[list[str]] = None,
+        visibility: Optional[str] = None,
+        is_method: bool = False,
+        is_constructor: bool = False,
+    ) -> FunctionDescription:
+        """
+        FunctionDescription по узлу функции. outer — узел, над которым ищется документация
+        (например, export_statement вокруг функции); полный текст начинается с документации,
+        а если перед ней в строке только отступ — с начала строки.
+        """
+        content = source.text
+        index = source.index
+        docstring, first_comment = self._leading_doc(source, outer)
+
+        decl_start = source.start(first_comment if first_comment is not None else outer)
+        start = index.line_start(decl_start)
+        if content[start:decl_start].strip():
+            start = decl_start
+        end = source.end(outer if outer.end_byte > node.end_byte else node)
+
+        full_text = SourceSpan(content, start, end)
+        function_text = SourceSpan(content, source.start(outer), end)
+        signature_end = source.start(body) if body is not None else end
+        start_line, start_column = index.position(decl_start)
+        end_line, end_column = index.position(end)
+
+        return FunctionDescription(
+            language=self.LANGUAGE,
+            full_function_text=full_text,
+            function_text=function_text,
+            docstring=docstring,
+            full_function_lines_length=full_text.count("\n") + 1,
+            function_lines_length=function_text.count("\n") + 1,
+            docstring_lines_length=docstring.then(line_count) if docstring else None,
+            name=name,
+            qualified_name=f"{class_name}.{name}" if class_name else name,
+            namespace=namespace,
+            signature_text=Deferred(signature_text, content, signature_start, signature_end),
+            return_type=return_type,
+            parameters=parameters or [],
+            start_line=start_line,
+            end_line=end_line,
+            start_column=start_column,
+            end_column=end_column,
+            is_method=is_method,
+            class_name=class_name,
+            class_description=ClassDescription.docstring.raw(class_info) if class_info is not None else None,
+            class_info=class_info,
+            decorators=decorators or [],
+            modifiers=modifiers or [],
+            visibility=visibility,
+            has_body=body is not None,
+            is_constructor=is_constructor,
+        )
@@ -0,0 +1,59 @@
+"""
+Индекс начал строк исходного текста.
+
+Строится один раз на файл за линейный проход; номер строки и колонка для
+смещения ищутся бинарным поиском, поэтому позиция каждой функции стоит O(log n),
+а не пересчёт переводов строк в префиксе файла.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+
+
+class LineIndex:
+    """Номера строк (с 1) и колонки (с 0, в символах) по смещению в тексте."""
+
+    __slots__ = ("text", "_starts")
+
+    def __init__(self, text: str):
+        self.text = text
+        starts = [0]
+        append = starts.append
+        find = text.find
+        pos = find("\n")
+        while pos != -1:
+            append(pos + 1)
+            pos = find("\n", pos + 1)
+        self._starts = starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self._starts)
+
+    def line(self, offset: int) -> int:
+        """Номер строки, в которой находится символ со смещением offset."""
+        return bisect_right(self._starts, offset)
+
+    def column(self, offset: int) -> int:
+        """Колонка символа со смещением offset внутри его строки."""
+        return offset - self._starts[self.line(offset) - 1]
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """(строка, колонка) для смещения."""
+        line = self.line(offset)
+        return line, offset - self._starts[line - 1]
+
+    def offset(self, line: int, column: int = 0) -> int:
+        """Смещение по номеру строки и колонке (обратное к position)."""
+        return self._starts[line - 1] + column
+
+    def line_start(self, offset: int) -> int:
+        """Смещение начала строки, в которой находится offset."""
+        return self._starts[self.line(offset) - 1]
+
+    def line_text(self, line: int) -> str:
+        """Текст строки без перевода строки."""
+        start = self._starts[line - 1]
+        end = self._starts[line] - 1 if line < len(self._starts) else len(self.text)
+        return self.text[start:end]
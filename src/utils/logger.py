@@ -1,64 +1,202 @@
+"""
+Логирование сервиса: error_logger — ошибки, process_logger — ход обработки.
+
+Файл и консоль пишет отдельный поток (QueueListener): в обработчике запроса SimpleLogger
+только проверяет уровень, обрезает крупные данные и кладёт запись в очередь, а сериализация
+и ввод-вывод происходят в потоке слушателя. Запись — одна строка JSON.
+Настройки — LoggingConfig; configure_logging применяет их к обоим логгерам. До этого
+(и в процессах пула парсинга, где приложение не создаётся) логгеры пишут только в stderr,
+без файлов и потока записи.
+"""
+
+import atexit
 import json
-import os
 import logging
-from typing import Dict, Any
-from src.config import LoggingConfig
-from datetime import datetime, timedelta
+import logging.handlers
+import queue
+import random
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import LoggerConfig, LoggingConfig
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Запись одной строкой JSON; данные SimpleLogger (dict в msg) становятся полями записи."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {"time": self.formatTime(record), "level": record.levelname, "logger": record.name}
+        if isinstance(record.msg, dict):
+            data.update(record.msg)
+        else:
+            data["message"] = record.getMessage()
+        if record.exc_info:
+            data["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт запись в очередь как есть: форматирует её обработчик в потоке слушателя.
+    Если очередь полна (диск или консоль не успевают), запись отбрасывается, а не ждёт.
+    """
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def truncate(value: Any, max_chars: int, max_items: int, depth: int = 4) -> Any:
+    """
+    Копия value для записи в лог: строки длиннее max_chars обрезаются, у списков и словарей
+    остаются первые max_items элементов, объекты приводятся к строке, глубже depth — тоже строкой.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}…[+{len(value) - max_chars} chars]"
+    if depth > 0 and isinstance(value, dict):
+        result = {
+            str(key): truncate(item, max_chars, max_items, depth - 1)
+            for key, item in list(value.items())[:max_items]
+        }
+        if len(value) > max_items:
+            result["…"] = f"+{len(value) - max_items} items"
+        return result
+    if depth > 0 and isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        result = [truncate(item, max_chars, max_items, depth - 1) for item in items[:max_items]]
+        if len(items) > max_items:
+            result.append(f"…[+{len(items) - max_items} items]")
+        return result
+    return truncate(str(value), max_chars, max_items)
+
 
 class SimpleLogger:
-    def __init__(self, name):
-        # Создаем логгер
+    def __init__(
+        self, name: str, config: Optional[LoggerConfig] = None, logging_config: Optional[LoggingConfig] = None
+    ):
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self._handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        if config is not None:
+            self.configure(config, logging_config or LoggingConfig())
+        else:
+            self._use_stderr()
+
+    def _use_stderr(self) -> None:
+        """Без настроек: записи сразу в stderr, без файлов и потока записи."""
+        self.config = LoggerConfig(file=None, console=True)
+        defaults = LoggingConfig()
+        self._max_chars = defaults.max_string_chars
+        self._max_items = defaults.max_items
+        self.logger.setLevel(logging.getLevelName(self.config.level.upper()))
+        self._handler = logging.StreamHandler()
+        self._handler.setFormatter(JsonLineFormatter())
+        self.logger.addHandler(self._handler)
+
+    def configure(self, config: LoggerConfig, logging_config: LoggingConfig) -> None:
+        """Пересоздать обработчики и поток записи по настройкам; недописанные записи сбрасываются в старые."""
+        level = logging.getLevelName(config.level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level '{config.level}'")
+        self.stop()
+
+        formatter = JsonLineFormatter()
+        handlers: list[logging.Handler] = []
+        if config.file:
+            Path(logging_config.log_dir).mkdir(parents=True, exist_ok=True)
+            # delay: файл создаётся при первой записи
+            handlers.append(logging.FileHandler(Path(logging_config.log_dir) / config.file, encoding="utf-8", delay=True))
+        if config.console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
 
-        if not self.logger.handlers:
-            # Формат сообщений
-            formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
+        self.config = config
+        self._max_chars = logging_config.max_string_chars
+        self._max_items = logging_config.max_items
+        self.logger.setLevel(level)
+        self._handler = _QueueHandler(queue.Queue(logging_config.queue_size))
+        self.logger.addHandler(self._handler)
+        self._listener = logging.handlers.QueueListener(self._handler.queue, *handlers)
+        self._listener.start()
 
-            # 1. Обработчик для записи в файл
-            file_handler = logging.FileHandler(name + ".log")
-            file_handler.setLevel(logging.DEBUG)
-            file_handler.setFormatter(formatter)
+    def stop(self) -> None:
+        """Дописать записи из очереди, остановить поток записи и закрыть файлы."""
+        if self._handler is not None:
+            self.logger.removeHandler(self._handler)
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+        self._handler = None
+        self._listener = None
 
-            # 2. Обработчик для вывода в консоль
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.DEBUG)
-            console_handler.setFormatter(formatter)
+    @property
+    def dropped(self) -> int:
+        """Сколько записей отброшено из-за переполненной очереди."""
+        return getattr(self._handler, "dropped", 0)
 
-            # Добавляем обработчики к логгеру
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+    def enabled(self, level: int) -> bool:
+        """Будет ли записана запись уровня level; DEBUG — с учётом debug_sample_rate."""
+        if not self.logger.isEnabledFor(level):
+            return False
+        rate = self.config.debug_sample_rate
+        return level > logging.DEBUG or rate >= 1 or random.random() < rate
 
     def log_error(self, problem: str, context: Dict[str, Any] = None) -> None:
         """Логирует ошибку."""
-        error_data = {
-            "problem": str(problem),
-            "context": context or {},
-        }
-        self._log_data(error_data, "ERROR")
+        if self.enabled(logging.ERROR):
+            self._log(logging.ERROR, {"problem": str(problem), "context": context or {}})
 
     def log_exception(self, error: Exception, context: Dict[str, Any] = None) -> None:
         """Логирует ошибку."""
-        error_data = {
-            "error": str(error),
-            "type": type(error).__name__,
-            "context": context or {},
-        }
-        self._log_data(error_data, "ERROR")
+        if self.enabled(logging.ERROR):
+            self._log(logging.ERROR, {"error": str(error), "type": type(error).__name__, "context": context or {}})
 
-    def debug(self, context: str = None) -> None:
-        """Логирует дебаг информацию."""
-        debug_data = {
-            "context": context or {},
-        }
-        self._log_data(debug_data, "DEBUG")
+    def debug(self, context: str = None, *args: Any) -> None:
+        """
+        Логирует дебаг информацию. С args context — шаблон (%s, как в logging), который
+        подставляется, только если запись действительно пишется.
+        """
+        if self.enabled(logging.DEBUG):
+            if args:
+                context = context % args
+            self._log(logging.DEBUG, {"context": context or {}})
 
-    def _log_data(self, data: Dict[str, Any], log_type: str) -> None:
-        """Записывает данные в лог файл."""
-        self.logger.debug(f"{log_type}: {json.dumps(data, ensure_ascii=False, indent=2)}")
+    def _log(self, level: int, data: Dict[str, Any]) -> None:
+        self.logger.log(level, truncate(data, self._max_chars, self._max_items))
 
     def get_logger(self):
         return self.logger
-    
+
+
+# Файлы и поток записи подключает configure_logging (create_app), а не импорт модуля
 error_logger = SimpleLogger("err")
-process_logger = SimpleLogger("process")
\ No newline at end of file
+process_logger = SimpleLogger("process")
+
+
+def configure_logging(config: LoggingConfig) -> None:
+    """Применить настройки к error_logger и process_logger."""
+    error_logger.configure(config.error, config)
+    process_logger.configure(config.process, config)
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Дописать очереди обоих логгеров; вызывается и при выходе из процесса."""
+    error_logger.stop()
+    process_logger.stop()
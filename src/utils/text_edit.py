@@ -0,0 +1,163 @@
+"""
+Правка текста между двумя версиями файла.
+
+TextEdit описывает одну непрерывную замену, выровненную по границам строк:
+общие префикс и суффикс версий не меняются, всё между ними считается изменённым.
+apply_unified_diff восстанавливает новую версию по старой и unified diff.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+
+class DiffError(ValueError):
+    """Diff не разобран или не применяется к базовой версии."""
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """Замена old[start:old_end] на new[start:new_end]; смещения в символах, по началам строк."""
+
+    start: int
+    old_end: int
+    new_end: int
+    start_line: int         # первая изменённая строка (с 1), одинакова в обеих версиях
+    old_end_line: int       # последняя заменённая строка старой версии (start_line - 1, если ничего не удалено)
+    new_end_line: int       # последняя вставленная строка новой версии
+
+    @property
+    def char_delta(self) -> int:
+        return self.new_end - self.old_end
+
+    @property
+    def line_delta(self) -> int:
+        return self.new_end_line - self.old_end_line
+
+
+def common_prefix_length(a: Sequence, b: Sequence) -> int:
+    """Длина общего префикса; сравнение срезами (memcmp), а не по элементу."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def common_suffix_length(a: Sequence, b: Sequence, limit: int) -> int:
+    """Длина общего суффикса, не больше limit."""
+    lo, hi = 0, min(len(a), len(b), limit)
+    la, lb = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:] == b[lb - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def compute_edit(old: str, new: str) -> Optional[TextEdit]:
+    """Правка, переводящая old в new, или None, если версии совпадают."""
+    if old == new:
+        return None
+    prefix = common_prefix_length(old, new)
+    suffix = common_suffix_length(old, new, min(len(old), len(new)) - prefix)
+
+    start = old.rfind("\n", 0, prefix) + 1
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+
+    def aligned(text: str, end: int) -> bool:
+        return end == start or text[end - 1] == "\n"
+
+    if not (aligned(old, old_end) and aligned(new, new_end)):
+        # Дотягиваем до конца строки; суффиксы совпадают, поэтому сдвиг одинаков
+        newline = old.find("\n", old_end)
+        step = (newline + 1 if newline != -1 else len(old)) - old_end
+        old_end += step
+        new_end += step
+
+    start_line = old.count("\n", 0, start) + 1
+
+    def end_line(text: str, end: int) -> int:
+        if end == start:
+            return start_line - 1
+        return start_line + text.count("\n", start, end - 1)
+
+    return TextEdit(
+        start=start,
+        old_end=old_end,
+        new_end=new_end,
+        start_line=start_line,
+        old_end_line=end_line(old, old_end),
+        new_end_line=end_line(new, new_end),
+    )
+
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def apply_unified_diff(base: str, diff: str) -> str:
+    """Применить unified diff (одного файла) к base; контекст и удаляемые строки сверяются."""
+    old_lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0                         # индекс следующей непрочитанной строки base
+    lines = diff.splitlines(keepends=True)
+    i = 0
+    seen_hunk = False
+
+    while i < len(lines):
+        match = _HUNK_RE.match(lines[i])
+        if match is None:
+            if seen_hunk and lines[i].strip():
+                raise DiffError(f"Unexpected line outside of a hunk: {lines[i].rstrip()!r}")
+            i += 1                  # заголовки ---/+++, diff --git и т.п.
+            continue
+        seen_hunk = True
+        old_start = int(match.group(1))
+        old_count = int(match.group(2)) if match.group(2) is not None else 1
+        new_count = int(match.group(4)) if match.group(4) is not None else 1
+        # Для пустого диапазона номер строки указывает на строку перед вставкой
+        hunk_pos = old_start - 1 if old_count > 0 else old_start
+        if hunk_pos < pos or hunk_pos > len(old_lines):
+            raise DiffError(f"Hunk at line {old_start} is out of order or out of range")
+        out.extend(old_lines[pos:hunk_pos])
+        pos = hunk_pos
+        i += 1
+
+        removed = added = 0
+        while i < len(lines) and (removed < old_count or added < new_count):
+            line = lines[i]
+            tag, text = line[:1], line[1:]
+            if i + 1 < len(lines) and lines[i + 1].startswith("\\"):
+                # "\ No newline at end of file" относится к предыдущей строке
+                text = text.rstrip("\r\n")
+            if tag in (" ", "-"):
+                if pos >= len(old_lines) or old_lines[pos] != text:
+                    raise DiffError(f"Diff does not apply at base line {pos + 1}")
+                pos += 1
+                removed += 1
+                if tag == " ":
+                    out.append(text)
+                    added += 1
+            elif tag == "+":
+                out.append(text)
+                added += 1
+            elif tag != "\\":
+                raise DiffError(f"Malformed hunk line: {line.rstrip()!r}")
+            i += 1
+        while i < len(lines) and lines[i].startswith("\\"):
+            i += 1
+        if removed != old_count or added != new_count:
+            raise DiffError(f"Hunk at line {old_start} is truncated")
+
+    if not seen_hunk and diff.strip():
+        raise DiffError("No hunks found in diff")
+    out.extend(old_lines[pos:])
+    return "".join(out)
@@ -0,0 +1,61 @@
+"""
+Повторное извлечение после правки одной функции: BaseParser.reparse против полного parse_content
+на синтетических файлах из bench_parsers. Правка — новая строка в теле метода посередине файла.
+
+Запуск: python -m tests.benchmarks.bench_incremental [--lines 20000] [--repeat 5] [--languages python java]
+"""
+
+import argparse
+import time
+
+from src.core.parser_factory import ParserFactory
+from src.models import Language
+from tests.benchmarks.bench_parsers import source_for
+
+
+def edited(source: str) -> str:
+    """Копия source с пустой строкой, вставленной в середину файла."""
+    middle = source.index("\n", len(source) // 2) + 1
+    return source[:middle] + "\n" + source[middle:]
+
+
+def main() -> None:
+    parser_args = argparse.ArgumentParser(description=__doc__)
+    parser_args.add_argument("--lines", type=int, default=20000)
+    parser_args.add_argument("--repeat", type=int, default=5)
+    parser_args.add_argument(
+        "--languages", nargs="+",
+        default=[str(language) for language in (
+            Language.PYTHON, Language.JAVA, Language.GO, Language.JAVASCRIPT, Language.CSHARP, Language.CPP,
+        )],
+    )
+    args = parser_args.parse_args()
+
+    factory = ParserFactory()
+    print(f"{'language':>12} {'lines':>8} {'full, s':>10} {'reparse, s':>11} {'speedup':>8}")
+    for value in args.languages:
+        language = Language(value)
+        try:
+            parser = factory.get_parser(language)
+        except NotImplementedError as e:
+            print(f"{value:>12} skipped: {e}")
+            continue
+        old = source_for(language, args.lines)
+        new = edited(old)
+
+        full = reparse = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            parser.parse_content(new)
+            full = min(full, time.perf_counter() - started)
+
+            old_functions = parser.parse_content(old)
+            started = time.perf_counter()
+            parser.reparse(old, old_functions, new)
+            reparse = min(reparse, time.perf_counter() - started)
+
+        print(f"{value:>12} {old.count(chr(10)):>8} {full:>10.4f} {reparse:>11.4f} {full / reparse:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Бенчмарк JavaParser: время разбора должно расти линейно с размером файла.
+
+Запуск: python -m tests.benchmarks.bench_java_parser [--lines 2500 5000 10000 20000 40000]
+"""
+
+import argparse
+import time
+
+from src.parsers.java_parser import JavaParser
+
+
+def java_source(lines: int) -> str:
+    """Синтетический файл примерно из `lines` строк: классы с методами, вложенными блоками и строками."""
+    method = (
+        "    /**\n"
+        "     * Method {i}.\n"
+        "     * @param value input\n"
+        "     */\n"
+        "    @Override\n"
+        "    public Map<String, List<Integer>> method{i}(int value, String... names) throws IOException {{\n"
+        "        String s = \"{{ not a brace }}\";\n"
+        "        for (int k = 0; k < value; k++) {{\n"
+        "            if (k % 2 == 0) {{ s += '{{'; }}\n"
+        "        }}\n"
+        "        return null;\n"
+        "    }}\n"
+        "\n"
+    )
+    per_method = method.count("\n")
+    methods_per_class = 50
+
+    parts = []
+    written, i = 0, 0
+    while written < lines:
+        parts.append(f"public class Generated{i} {{\n")
+        for m in range(methods_per_class):
+            parts.append(method.format(i=m))
+        parts.append("    static class Inner {\n        void run() {}\n    }\n}\n\n")
+        written += methods_per_class * per_method + 6
+        i += 1
+    return "".join(parts)
+
+
+def measure(parser: JavaParser, source: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parser.parse_content(source)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser_args = argparse.ArgumentParser(description=__doc__)
+    parser_args.add_argument("--lines", type=int, nargs="+", default=[2500, 5000, 10000, 20000, 40000])
+    parser_args.add_argument("--repeat", type=int, default=3)
+    args = parser_args.parse_args()
+
+    parser = JavaParser()
+    print(f"{'lines':>8} {'functions':>10} {'seconds':>10} {'us/line':>10}")
+    for lines in args.lines:
+        source = java_source(lines)
+        actual = source.count("\n")
+        functions = len(parser.parse_content(source))
+        seconds = measure(parser, source, args.repeat)
+        print(f"{actual:>8} {functions:>10} {seconds:>10.4f} {seconds / actual * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
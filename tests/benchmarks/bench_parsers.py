@@ -0,0 +1,155 @@
+"""
+Пропускная способность парсеров по языкам: строк и функций в секунду на синтетических файлах
+одинакового размера. Парсеры на tree-sitter и libclang сравниваются с PythonParser (ast) и JavaParser (лексер).
+
+Запуск: python -m tests.benchmarks.bench_parsers [--lines 20000] [--repeat 3] [--languages go javascript]
+"""
+
+import argparse
+import time
+
+from src.core.parser_factory import ParserFactory
+from src.models import Language
+from tests.benchmarks.bench_java_parser import java_source
+
+_TEMPLATES = {
+    Language.PYTHON: (
+        "class Service{c}:\n",
+        "    def method{i}(self, value: int, *names: str) -> dict:\n"
+        "        \"\"\"Method {i}.\"\"\"\n"
+        "        result = {{\"key\": value}}\n"
+        "        for name in names:\n"
+        "            if name:\n"
+        "                result[name] = len(name)\n"
+        "        return result\n"
+        "\n",
+        "\n",
+    ),
+    Language.GO: (
+        "type Service{c} struct{{}}\n\n",
+        "// Method{i} does work.\n"
+        "func (s *Service{c}) Method{i}(value int, names ...string) (map[string]int, error) {{\n"
+        "\tresult := map[string]int{{\"key\": value}}\n"
+        "\tfor _, name := range names {{\n"
+        "\t\tif name != \"\" {{ result[name] = len(name) }}\n"
+        "\t}}\n"
+        "\treturn result, nil\n"
+        "}}\n"
+        "\n",
+        "\n",
+    ),
+    Language.JAVASCRIPT: (
+        "/** Service {c}. */\nexport class Service{c} {{\n",
+        "  /** Method {i}. */\n"
+        "  async method{i}(value, ...names) {{\n"
+        "    const result = {{ key: value }};\n"
+        "    for (const name of names) {{\n"
+        "      if (name) {{ result[name] = name.length; }}\n"
+        "    }}\n"
+        "    return result;\n"
+        "  }}\n"
+        "\n",
+        "}}\n\n",
+    ),
+    Language.CPP: (
+        "namespace app{c} {{\nclass Service{c} {{\npublic:\n",
+        "    /// Method {i}.\n"
+        "    std::map<std::string, int> method{i}(int value, const std::vector<std::string>& names) const {{\n"
+        "        std::map<std::string, int> result{{{{\"key\", value}}}};\n"
+        "        for (const auto& name : names) {{\n"
+        "            if (!name.empty()) {{ result[name] = name.size(); }}\n"
+        "        }}\n"
+        "        return result;\n"
+        "    }}\n"
+        "\n",
+        "}};\n}}\n\n",
+    ),
+    Language.C: (
+        "/* Module {c}. */\n",
+        "/* Function {i}. */\n"
+        "static int module{c}_function{i}(int value, const char **names, int count) {{\n"
+        "    int result = value;\n"
+        "    for (int k = 0; k < count; k++) {{\n"
+        "        if (names[k]) {{ result += 1; }}\n"
+        "    }}\n"
+        "    return result;\n"
+        "}}\n"
+        "\n",
+        "\n",
+    ),
+    Language.CSHARP: (
+        "namespace App{c} {{\npublic class Service{c} {{\n",
+        "    /// <summary>Method {i}.</summary>\n"
+        "    public async Task<Dictionary<string, int>> Method{i}(int value, params string[] names) {{\n"
+        "        var result = new Dictionary<string, int> {{ [\"key\"] = value }};\n"
+        "        foreach (var name in names) {{\n"
+        "            if (name != null) {{ result[name] = name.Length; }}\n"
+        "        }}\n"
+        "        return result;\n"
+        "    }}\n"
+        "\n",
+        "}}\n}}\n\n",
+    ),
+}
+
+
+def source_for(language: Language, lines: int) -> str:
+    """Синтетический файл примерно из `lines` строк: классы по 50 методов."""
+    if language == Language.JAVA:
+        return java_source(lines)
+    head, method, tail = _TEMPLATES[language]
+    prefix = "package bench\n\n" if language == Language.GO else ""
+    parts = [prefix]
+    written, c = 0, 0
+    while written < lines:
+        parts.append(head.format(c=c))
+        parts.extend(method.format(c=c, i=i) for i in range(50))
+        parts.append(tail.format(c=c))
+        written += head.count("\n") + 50 * method.count("\n") + tail.count("\n")
+        c += 1
+    return "".join(parts)
+
+
+def measure(parser, source: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parser.parse_content(source)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser_args = argparse.ArgumentParser(description=__doc__)
+    parser_args.add_argument("--lines", type=int, default=20000)
+    parser_args.add_argument("--repeat", type=int, default=3)
+    parser_args.add_argument(
+        "--languages", nargs="+",
+        default=[str(language) for language in (
+            Language.PYTHON, Language.JAVA, Language.GO, Language.JAVASCRIPT, Language.CSHARP,
+            Language.C, Language.CPP,
+        )],
+    )
+    args = parser_args.parse_args()
+
+    factory = ParserFactory()
+    print(f"{'language':>12} {'lines':>8} {'functions':>10} {'seconds':>10} {'klines/s':>10} {'funcs/s':>10}")
+    for value in args.languages:
+        language = Language(value)
+        try:
+            parser = factory.get_parser(language)
+        except NotImplementedError as e:
+            print(f"{value:>12} skipped: {e}")
+            continue
+        source = source_for(language, args.lines)
+        actual = source.count("\n")
+        functions = len(parser.parse_content(source))
+        seconds = measure(parser, source, args.repeat)
+        print(
+            f"{value:>12} {actual:>8} {functions:>10} {seconds:>10.4f}"
+            f" {actual / seconds / 1000:>10.1f} {functions / seconds:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
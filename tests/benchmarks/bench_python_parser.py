@@ -0,0 +1,83 @@
+"""
+Бенчмарк PythonParser на большом модуле из множества небольших функций с аннотациями,
+декораторами и docstring. ast.parse меряется отдельно от описания функций по готовому дереву;
+описание — само по себе, вместе с чтением всех полей (to_dict) и только полей,
+нужных для списка сигнатур (to_dict(fields)).
+
+Запуск: python -m tests.benchmarks.bench_python_parser [--functions 2000 10000] [--repeat 5]
+"""
+
+import argparse
+import ast
+import time
+
+from src.parsers.python_parser import PythonParser
+from src.utils.line_index import LineIndex
+
+_FUNCTION = (
+    "@register(\"handler{i}\")\n"
+    "@cached\n"
+    "def handler{i}(request: Request, *, limit: Optional[int] = None, **extra: Any) -> Dict[str, int]:\n"
+    "    \"\"\"Handler {i}.\"\"\"\n"
+    "    return {{\"id\": {i}}}\n"
+    "\n"
+)
+_METHOD = (
+    "    @staticmethod\n"
+    "    def method{i}(value: int, names: List[str]) -> Tuple[int, ...]:\n"
+    "        return (value, len(names))\n"
+    "\n"
+)
+# Поля, которые запрашивает большинство клиентов /extract
+_SIGNATURE_FIELDS = ["name", "qualified_name", "start_line", "end_line", "signature_text"]
+
+
+def python_source(functions: int) -> str:
+    """Модуль из `functions` функций: поровну свободных функций и методов классов по 50."""
+    parts = []
+    for i in range(functions // 2):
+        parts.append(_FUNCTION.format(i=i))
+    for i in range(functions - functions // 2):
+        if i % 50 == 0:
+            parts.append(f"class Service{i // 50}:\n    \"\"\"Service.\"\"\"\n\n")
+        parts.append(_METHOD.format(i=i))
+    return "".join(parts)
+
+
+def best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser_args = argparse.ArgumentParser(description=__doc__)
+    parser_args.add_argument("--functions", type=int, nargs="+", default=[2000, 10000])
+    parser_args.add_argument("--repeat", type=int, default=5)
+    args = parser_args.parse_args()
+
+    parser = PythonParser()
+    print(f"{'functions':>10} {'lines':>8} {'ast.parse, s':>13} {'describe, s':>12} {'+to_dict, s':>12} {'+fields, s':>11}")
+    for functions in args.functions:
+        source = python_source(functions)
+        index = LineIndex(source)
+        statements = ast.parse(source).body
+        parse = best_of(args.repeat, lambda: ast.parse(source))
+        describe = best_of(args.repeat, lambda: parser._describe_statements(source, index, statements))
+        full = best_of(args.repeat, lambda: [
+            fd.to_dict() for fd in parser._describe_statements(source, index, statements)
+        ])
+        projected = best_of(args.repeat, lambda: [
+            fd.to_dict(_SIGNATURE_FIELDS) for fd in parser._describe_statements(source, index, statements)
+        ])
+        print(
+            f"{functions:>10} {source.count(chr(10)):>8} {parse:>13.4f} {describe:>12.4f}"
+            f" {full:>12.4f} {projected:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
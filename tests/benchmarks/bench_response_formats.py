@@ -0,0 +1,70 @@
+"""
+Сериализация ответа /extract: модель ExtractResponse + jsonable_encoder (как раньше) против
+ResponseEncoder — JSON (orjson, если установлен), MessagePack, Arrow IPC, Parquet — и сжатия gzip/zstd.
+Записи — результат разбора синтетического Python-файла из bench_parsers.
+
+Запуск: python -m tests.benchmarks.bench_response_formats [--lines 20000] [--files 10] [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from src.core.parser_factory import ParserFactory
+from src.core.response_formats import (
+    ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, PARQUET_MEDIA_TYPE,
+    ResponseEncoder, available_media_types,
+)
+from src.dto.commenters import ExtractResponse
+from src.models import Language
+from tests.benchmarks.bench_parsers import source_for
+
+
+def best(repeat: int, func) -> tuple[float, object]:
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main() -> None:
+    parser_args = argparse.ArgumentParser(description=__doc__)
+    parser_args.add_argument("--lines", type=int, default=20000)
+    parser_args.add_argument("--files", type=int, default=10)
+    parser_args.add_argument("--repeat", type=int, default=3)
+    args = parser_args.parse_args()
+
+    parser = ParserFactory().get_parser(Language.PYTHON)
+    functions = [fd.to_dict() for fd in parser.parse_content(source_for(Language.PYTHON, args.lines))]
+    results = [
+        {"file": f"f{i}.py", "language": "python", "content_hash": str(i), "count": len(functions),
+         "functions": functions}
+        for i in range(args.files)
+    ]
+    print(f"{args.files} files x {len(functions)} functions")
+
+    def pydantic_json() -> bytes:
+        return json.dumps(jsonable_encoder(ExtractResponse(results=results))).encode("utf-8")
+
+    encoder = ResponseEncoder()
+    print(f"{'format':>38} {'encode, s':>10} {'bytes':>12} {'gzip':>12} {'zstd':>12}")
+    elapsed, body = best(args.repeat, pydantic_json)
+    print(f"{'ExtractResponse + jsonable_encoder':>38} {elapsed:>10.3f} {len(body):>12}")
+    for media_type in (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE):
+        if media_type not in available_media_types():
+            print(f"{media_type:>38} {'not installed':>10}")
+            continue
+        elapsed, body = best(args.repeat, lambda: encoder.encode(media_type, results))
+        sizes = []
+        for encoding in ("gzip", "zstd"):
+            compressed, applied = encoder.compress(body, encoding)
+            sizes.append(len(compressed) if applied else "-")
+        print(f"{media_type:>38} {elapsed:>10.3f} {len(body):>12} {sizes[0]:>12} {sizes[1]:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_health_ok(client):
     r = client.get("/health")
     assert r.status_code == 200
@@ -25,6 +28,19 @@ def test_status_supported_languages(client):
         "python",
     ]
 
+def test_status_reports_llm_pool(client):
+    r = client.get("/status")
+    assert r.status_code == 200
+
+    pool = r.json()["llm_client"]
+    assert pool["started"] is True
+    assert pool["in_flight"] == 0
+    assert pool["max_connections"] > 0
+
+    batcher = r.json()["generation_batcher"]
+    assert batcher["started"] is True
+    assert batcher["queue_depth"] == 0
+
 def test_extract_python_one_function(client):
     py = b"""\
 def f(a: int, b) -> int:
@@ -46,6 +62,104 @@ def f(a: int, b) -> int:
     assert item["functions"][0]["docstring"] == "doc"
 
 
+def test_extract_repeated_upload_hits_cache(client):
+    py = b"def g():\n    pass\n"
+    for _ in range(2):
+        r = client.post("/extract", files={"files": ("repeat.py", py, "text/x-python")})
+        assert r.status_code == 200
+        assert r.json()["results"][0]["functions"][0]["name"] == "g"
+
+    cache = client.get("/status").json()["parse_cache"]
+    assert cache["misses"] == 1
+    assert cache["memory_hits"] == 1
+
+
+def test_extract_returns_only_requested_fields(client):
+    py = b"class A:\n    \"\"\"Doc.\"\"\"\n\n    def m(self, x):\n        return x\n"
+    r = client.post(
+        "/extract",
+        params={"fields": ["name,qualified_name", "start_line"]},
+        files={"files": ("fields.py", py, "text/x-python")},
+    )
+    assert r.status_code == 200
+    assert r.json()["results"][0]["functions"] == [{"name": "m", "qualified_name": "A.m", "start_line": 4}]
+
+    r = client.post(
+        "/extract",
+        params={"fields": "name,source"},
+        files={"files": ("fields.py", py, "text/x-python")},
+    )
+    assert r.status_code == 400
+    assert "source" in r.json()["detail"]
+
+
+def test_extract_normalized_shape(client):
+    py = b"class A:\n    \"\"\"Doc.\"\"\"\n\n    def m(self):\n        pass\n\n    def n(self):\n        pass\n"
+    r = client.post(
+        "/extract",
+        params={"shape": "normalized", "fields": "name,class_description"},
+        files={"files": ("shape.py", py, "text/x-python")},
+    )
+    assert r.status_code == 200
+    item = r.json()["results"][0]
+    assert item["count"] == 2
+    assert item["scopes"] == [
+        {"id": 0, "kind": "class", "name": "A", "docstring": "Doc.", "start_line": 1, "end_line": 8},
+    ]
+    assert item["functions"] == [{"name": "m", "class_id": 0}, {"name": "n", "class_id": 0}]
+
+    r = client.post("/extract", params={"shape": "tree"}, files={"files": ("shape.py", py, "text/x-python")})
+    assert r.status_code == 400
+
+
+def test_extract_compressed_json(client):
+    py = b"".join(b"def f%d(a: int) -> int:\n    return a\n\n" % i for i in range(50))
+    r = client.post(
+        "/extract",
+        headers={"Accept": "application/json", "Accept-Encoding": "gzip"},
+        files={"files": ("many.py", py, "text/x-python")},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    # httpx распаковывает gzip сам
+    assert r.json()["results"][0]["count"] == 50
+
+
+def test_extract_msgpack_or_not_acceptable(client):
+    py = b"def f():\n    pass\n"
+    r = client.post(
+        "/extract",
+        headers={"Accept": "application/msgpack"},
+        files={"files": ("m.py", py, "text/x-python")},
+    )
+    try:
+        import msgpack
+    except ImportError:
+        assert r.status_code == 406
+        return
+    assert r.status_code == 200
+    assert msgpack.unpackb(r.content)["results"][0]["functions"][0]["name"] == "f"
+
+
+def test_extract_arrow_is_flat(client):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    py = b"class A:\n    def m(self):\n        pass\n\n    def n(self):\n        pass\n"
+    r = client.post(
+        "/extract",
+        params={"shape": "normalized", "fields": "name,class_name"},
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+        files={"files": ("arrow.py", py, "text/x-python")},
+    )
+    assert r.status_code == 200
+    table = pyarrow.ipc.open_stream(r.content).read_all()
+    assert table.column("name").to_pylist() == ["m", "n"]
+    assert table.column("class_name").to_pylist() == ["A", "A"]
+
+
 def test_extract_unsupported_extension(client):
     r = client.post("/extract", files={"files": ("test.xyz", b"123", "application/octet-stream")})
     assert r.status_code == 200
@@ -92,4 +206,49 @@ def test_extract_unsupported_extension(client):
 # #     data = response.json()
 # #     assert data["language"] == "python"
 # #     assert len(data["functions"]) == 1
-# #     assert data["functions"]["name"] == "greet"
\ No newline at end of file
+# #     assert data["functions"]["name"] == "greet"
+
+def test_extract_incremental_with_diff(client):
+    base = "def f():\n    return 1\n\n\ndef g():\n    return 2\n"
+    r = client.post("/extract", files={"files": ("inc.py", base.encode(), "text/x-python")})
+    base_hash = r.json()["results"][0]["content_hash"]
+
+    diff = (
+        "--- a/inc.py\n+++ b/inc.py\n"
+        "@@ -1,2 +1,4 @@\n+import os\n+\n def f():\n     return 1\n"
+    )
+    r = client.post("/extract/incremental", json={"file": "inc.py", "base_hash": base_hash, "diff": diff})
+    assert r.status_code == 200
+
+    item = r.json()["results"][0]
+    assert item["mode"] == "incremental"
+    assert item["base_hash"] == base_hash
+    assert [(fn["name"], fn["start_line"]) for fn in item["functions"]] == [("f", 3), ("g", 7)]
+
+    # Новая версия сама становится базой; повтор той же правки отдаётся из кеша
+    r = client.post("/extract/incremental", json={"file": "inc.py", "base_hash": base_hash, "diff": diff})
+    assert r.json()["results"][0]["mode"] == "cached"
+    assert r.json()["results"][0]["content_hash"] == item["content_hash"]
+
+
+def test_extract_incremental_with_content_and_unknown_base(client):
+    r = client.post("/extract/incremental", json={
+        "file": "new.py", "base_hash": "0" * 64, "content": "def h():\n    pass\n",
+    })
+    assert r.status_code == 200
+    item = r.json()["results"][0]
+    assert item["mode"] == "full"
+    assert item["functions"][0]["name"] == "h"
+
+
+def test_extract_incremental_errors(client):
+    r = client.post("/extract/incremental", json={"file": "x.py", "base_hash": "0" * 64, "diff": "@@ -1 +1 @@\n-a\n+b\n"})
+    assert r.status_code == 409
+
+    r = client.post("/extract/incremental", json={"file": "x.py", "base_hash": "0" * 64})
+    assert r.status_code == 422
+
+    base = "a = 1\n"
+    base_hash = client.post("/extract", files={"files": ("d.py", base.encode(), "text/x-python")}).json()["results"][0]["content_hash"]
+    r = client.post("/extract/incremental", json={"file": "d.py", "base_hash": base_hash, "diff": "@@ -1 +1 @@\n-b = 2\n+c = 3\n"})
+    assert r.status_code == 422
@@ -0,0 +1,124 @@
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+FILES = {
+    "pkg/a.py": b"def a():\n    pass\n",
+    "pkg/b.py": b"def b1():\n    pass\n\ndef b2():\n    pass\n",
+    "vendor/lib.py": b"def vendored():\n    pass\n",
+    "README.md": b"# readme\n",
+}
+
+
+def make_zip(files=FILES) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def make_tar(files=FILES, mode="w:gz") -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode=mode) as tf:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def counts(response) -> dict:
+    return {item["file"]: item.get("count") for item in response.json()["results"]}
+
+
+def test_zip_archive(client):
+    r = client.post("/extract/archive", content=make_zip())
+    assert r.status_code == 200
+    # vendor/ исключён по умолчанию, README.md не имеет парсера
+    assert counts(r) == {"pkg/a.py": 1, "pkg/b.py": 2}
+
+
+def test_tar_gz_archive(client):
+    r = client.post("/extract/archive", content=make_tar())
+    assert r.status_code == 200
+    assert counts(r) == {"pkg/a.py": 1, "pkg/b.py": 2}
+
+
+def test_tar_zst_archive(client):
+    zstandard = pytest.importorskip("zstandard")
+    body = zstandard.ZstdCompressor().compress(make_tar(mode="w"))
+    r = client.post("/extract/archive", content=body)
+    assert r.status_code == 200
+    assert counts(r) == {"pkg/a.py": 1, "pkg/b.py": 2}
+
+
+def test_include_exclude_globs(client):
+    r = client.post(
+        "/extract/archive",
+        params={"include": ["pkg/*"], "exclude": ["*/b.py"]},
+        content=make_zip(),
+    )
+    assert r.status_code == 200
+    assert counts(r) == {"pkg/a.py": 1}
+
+
+def test_entry_size_limit(client):
+    files = {"small.py": b"def s():\n    pass\n", "big.py": b"def big():\n    pass\n" + b"#" * 200}
+    r = client.post("/extract/archive", params={"max_entry_bytes": 100}, content=make_tar(files))
+    assert r.status_code == 200
+
+    by_file = {item["file"]: item for item in r.json()["results"]}
+    assert by_file["small.py"]["count"] == 1
+    assert by_file["big.py"]["error"] == "Entry too large"
+
+
+def test_archive_stream(client):
+    r = client.post("/extract/archive?stream=true", content=make_zip())
+    assert r.status_code == 200
+    records = [json.loads(line) for line in r.text.splitlines() if line]
+    assert {record["file"] for record in records} == {"pkg/a.py", "pkg/b.py"}
+
+
+def test_invalid_archive(client):
+    r = client.post("/extract/archive", content=b"definitely not an archive")
+    assert r.status_code == 400
+
+
+def test_unknown_format(client):
+    r = client.post("/extract/archive", params={"format": "rar"}, content=make_zip())
+    assert r.status_code == 400
+
+
+def test_cancel_while_worker_reads_archive():
+    import asyncio
+    from src.core.archive_reader import EntryFilter, iter_archive
+
+    data = make_tar(mode="w")
+
+    async def run():
+        reached, gate = asyncio.Event(), asyncio.Event()
+
+        async def chunks():
+            yield data[:512]
+            # Рабочий поток ждёт следующий чанк: генератор записей ещё выполняется
+            reached.set()
+            await gate.wait()
+            yield data[512:]
+
+        async def consume():
+            async for _ in iter_archive(chunks(), EntryFilter()):
+                pass
+
+        task = asyncio.create_task(consume())
+        await reached.wait()
+        task.cancel()
+        await asyncio.sleep(0.05)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
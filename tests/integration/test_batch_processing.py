@@ -0,0 +1,39 @@
+import json
+
+
+def py_file(name: str, functions: int):
+    code = "".join(f"def {name}_{i}():\n    pass\n\n" for i in range(functions))
+    return ("files", (f"{name}.py", code.encode(), "text/x-python"))
+
+
+def test_extract_many_files_keeps_upload_order(client):
+    files = [py_file(f"m{i}", i + 1) for i in range(5)]
+    r = client.post("/extract", files=files)
+    assert r.status_code == 200
+
+    results = r.json()["results"]
+    assert [item["file"] for item in results] == [f"m{i}.py" for i in range(5)]
+    assert [item["count"] for item in results] == [1, 2, 3, 4, 5]
+
+
+def test_extract_stream_by_accept_header(client):
+    files = [py_file("a", 1), py_file("b", 2), ("files", ("c.xyz", b"?", "application/octet-stream"))]
+    r = client.post("/extract", files=files, headers={"Accept": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+
+    records = [json.loads(line) for line in r.text.splitlines() if line]
+    by_file = {record["file"]: record for record in records}
+    assert set(by_file) == {"a.py", "b.py", "c.xyz"}
+    assert by_file["b.py"]["count"] == 2
+    assert by_file["c.xyz"]["error"] == "Unsupported file extension"
+
+
+def test_extract_stream_by_query_flag(client):
+    r = client.post("/extract?stream=true", files=[py_file("only", 3)])
+    assert r.status_code == 200
+
+    records = [json.loads(line) for line in r.text.splitlines() if line]
+    assert len(records) == 1
+    assert records[0]["file"] == "only.py"
+    assert [f["name"] for f in records[0]["functions"]] == ["only_0", "only_1", "only_2"]
@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import AdmissionConfig, AppConfig
+from src.main import create_app
+
+PROMPT = "Опиши функцию\ndef twice(a):\n    return a * 2\n"
+
+
+@pytest.fixture()
+def backend():
+    """Подставной LLM-бэкенд: handler задаётся в тесте, запросы к нему копятся в requests."""
+
+    class Backend:
+        requests: list[httpx.Request] = []
+        handler = staticmethod(lambda request: httpx.Response(200, json={"comment": "Doubles a."}))
+
+    def transport_handler(request: httpx.Request) -> httpx.Response:
+        Backend.requests.append(request)
+        return Backend.handler(request)
+
+    Backend.transport = httpx.MockTransport(transport_handler)
+    return Backend
+
+
+@pytest.fixture()
+def client(backend):
+    app = create_app()
+    app.state.llm_client._transport = backend.transport
+    with TestClient(app) as c:
+        yield c
+
+
+def sse_events(response) -> list:
+    events = []
+    for block in response.text.split("\n\n"):
+        if block.startswith("data: "):
+            payload = block[len("data: "):]
+            events.append(payload if payload == "[DONE]" else json.loads(payload))
+    return events
+
+
+def test_prompt_returns_comment(client, backend):
+    r = client.post("/prompt", json={"prompt": PROMPT})
+    assert r.status_code == 200
+    assert r.json()["choices"][0]["message"]["content"] == "Doubles a."
+    assert json.loads(backend.requests[0].content)["task"] == "Опиши функцию"
+
+
+def test_prompt_streams_backend_tokens(client, backend):
+    backend.handler = staticmethod(lambda request: httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        content=b'data: {"token": "Doubles"}\n\ndata: {"token": " a."}\n\ndata: [DONE]\n\n',
+    ))
+    r = client.post("/prompt", json={"prompt": PROMPT, "stream": True})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    events = sse_events(r)
+    assert events[-1] == "[DONE]"
+    chunks = events[:-1]
+    assert len({chunk["id"] for chunk in chunks}) == 1
+    assert chunks[0]["object"] == "text_completion.chunk"
+    assert chunks[0]["choices"][0]["delta"]["role"] == "assistant"
+    assert "".join(chunk["choices"][0]["delta"]["content"] or "" for chunk in chunks) == "Doubles a."
+    assert chunks[-1]["choices"][0]["finish_reason"] == "Generation success."
+    assert json.loads(backend.requests[0].content)["stream"] is True
+
+
+def test_prompt_stream_backend_unavailable(client, backend):
+    backend.handler = staticmethod(lambda request: httpx.Response(502))
+    r = client.post("/prompt", json={"prompt": PROMPT, "stream": True})
+    assert r.status_code == 503
+
+
+def test_prompt_cache_hits_for_reformatted_code(client, backend):
+    first = client.post("/prompt", json={"prompt": PROMPT})
+    assert first.headers["x-cache"] == "miss"
+
+    reformatted = "Опиши   функцию\ndef twice(a):\n    # удвоение\n    return a*2\n"
+    second = client.post("/prompt", json={"prompt": reformatted})
+    assert second.headers["x-cache"] == "hit"
+    assert second.json()["choices"][0]["message"]["content"] == "Doubles a."
+    assert len(backend.requests) == 1
+
+    fresh = client.post("/prompt", json={"prompt": PROMPT}, headers={"Cache-Control": "no-cache"})
+    assert fresh.headers["x-cache"] == "miss"
+    assert len(backend.requests) == 2
+
+    stats = client.get("/status").json()["comment_cache"]
+    assert stats["memory_hits"] == 1
+
+
+def test_prompt_stream_is_cached(client, backend):
+    backend.handler = staticmethod(lambda request: httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=b"data: Doubles\n\ndata:  a.\n\n",
+    ))
+    first = client.post("/prompt", json={"prompt": PROMPT, "stream": True})
+    assert first.headers["x-cache"] == "miss"
+
+    second = client.post("/prompt", json={"prompt": PROMPT, "stream": True})
+    assert second.headers["x-cache"] == "hit"
+    contents = [e["choices"][0]["delta"]["content"] for e in sse_events(second)[:-1]]
+    assert "".join(c or "" for c in contents) == "Doubles a."
+    assert len(backend.requests) == 1
+
+    plain = client.post("/prompt", json={"prompt": PROMPT})
+    assert plain.json()["choices"][0]["message"]["content"] == "Doubles a."
+
+
+def test_prompt_rejected_when_generation_is_saturated(backend):
+    config = AppConfig(admission=AdmissionConfig(
+        algorithm="fixed", initial_limit=1, min_limit=1, max_queue=0, default_latency_s=20,
+    ))
+    app = create_app(config)
+    app.state.llm_client._transport = backend.transport
+    with TestClient(app) as c:
+        # Единственное место занято другой генерацией
+        ticket = asyncio.run(app.state.admission.acquire())
+        r = c.post("/prompt", json={"prompt": PROMPT}, headers={"Cache-Control": "no-store"})
+        assert r.status_code == 429
+        assert r.headers["retry-after"] == "20"
+        assert backend.requests == []
+
+        ticket.release(None)
+        r = c.post("/prompt", json={"prompt": PROMPT})
+        assert r.status_code == 200
+
+        admission = c.get("/status").json()["admission"]
+        assert admission["rejected_total"] == 1
+        assert admission["in_flight"] == 0
+
+
+def test_prompt_unknown_priority(client):
+    r = client.post("/prompt", json={"prompt": PROMPT}, headers={"X-Priority": "urgent"})
+    assert r.status_code == 400
+
+
+def test_prompt_stream_releases_admission(client, backend):
+    backend.handler = staticmethod(lambda request: httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=b'data: {"token": "ok"}\n\n',
+    ))
+    r = client.post("/prompt", json={"prompt": PROMPT, "stream": True}, headers={"X-Priority": "low"})
+    assert r.status_code == 200
+    admission = client.get("/status").json()["admission"]
+    assert admission["admitted_total"] == 1
+    assert admission["in_flight"] == 0
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from src.config import AdmissionConfig
+from src.core.admission import AdmissionController, AdmissionRejectedError, PRIORITIES, parse_priority
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_controller(**config) -> tuple[AdmissionController, Clock]:
+    clock = Clock()
+    config.setdefault("min_limit", 1)
+    return AdmissionController(AdmissionConfig(**config), clock=clock), clock
+
+
+def test_requests_over_limit_wait_for_a_slot():
+    controller, _ = make_controller(algorithm="fixed", initial_limit=1)
+
+    async def run():
+        first = await controller.acquire()
+        waiting = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        assert controller.stats()["queue_depth"] == 1
+
+        first.release(True)
+        second = await waiting
+        assert controller.in_flight == 1
+        second.release(True)
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert stats["in_flight"] == 0
+    assert stats["admitted_total"] == 2
+    assert stats["queued_total"] == 1
+
+
+def test_higher_priority_is_served_first():
+    controller, _ = make_controller(algorithm="fixed", initial_limit=1)
+    order = []
+
+    async def wait(name: str, priority: int):
+        ticket = await controller.acquire(priority)
+        order.append(name)
+        ticket.release(True)
+
+    async def run():
+        first = await controller.acquire()
+        tasks = [
+            asyncio.create_task(wait("low", PRIORITIES["low"])),
+            asyncio.create_task(wait("normal", PRIORITIES["normal"])),
+            asyncio.create_task(wait("high", PRIORITIES["high"])),
+        ]
+        await asyncio.sleep(0)
+        first.release(True)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["high", "normal", "low"]
+
+
+def test_full_queue_rejects_with_retry_after():
+    controller, _ = make_controller(algorithm="fixed", initial_limit=2, max_queue=0, default_latency_s=10)
+
+    async def run():
+        tickets = [await controller.acquire(), await controller.acquire()]
+        with pytest.raises(AdmissionRejectedError) as e:
+            await controller.acquire()
+        for ticket in tickets:
+            ticket.release(True)
+        return e.value
+
+    error = asyncio.run(run())
+    # 10 сек. на ответ, два места, очередь пуста: место освободится примерно через 5 сек.
+    assert error.retry_after == 5
+    assert controller.stats()["rejected_total"] == 1
+
+
+def test_full_queue_displaces_lower_priority():
+    controller, _ = make_controller(algorithm="fixed", initial_limit=1, max_queue=1)
+
+    async def run():
+        first = await controller.acquire()
+        low = asyncio.create_task(controller.acquire(PRIORITIES["low"]))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(controller.acquire(PRIORITIES["high"]))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError):
+            await low
+        first.release(True)
+        (await high).release(True)
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert stats["evicted_total"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_queue_wait_is_bounded():
+    controller, _ = make_controller(algorithm="fixed", initial_limit=1, max_queue_ms=10)
+
+    async def run():
+        ticket = await controller.acquire()
+        with pytest.raises(AdmissionRejectedError):
+            await controller.acquire()
+        ticket.release(True)
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert stats["timed_out_total"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    controller, _ = make_controller(algorithm="fixed", initial_limit=1)
+
+    async def run():
+        ticket = await controller.acquire()
+        waiting = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        ticket.release(None)
+        (await controller.acquire()).release(None)
+
+    asyncio.run(run())
+    assert controller.stats()["queue_depth"] == 0
+    assert controller.in_flight == 0
+
+
+def run_requests(controller: AdmissionController, clock: Clock, latency: float, count: int, ok: bool = True):
+    async def run():
+        for _ in range(count):
+            tickets = [await controller.acquire() for _ in range(int(controller.limit))]
+            clock.now += latency
+            for ticket in tickets:
+                ticket.release(ok)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("algorithm", ["gradient", "aimd"])
+def test_limit_follows_backend_latency(algorithm):
+    controller, clock = make_controller(algorithm=algorithm, initial_limit=10, max_limit=100)
+
+    run_requests(controller, clock, latency=1.0, count=5)
+    grown = controller.limit
+    assert grown > 10
+
+    run_requests(controller, clock, latency=5.0, count=5)
+    assert controller.limit < grown
+
+
+def test_errors_shrink_limit():
+    controller, clock = make_controller(algorithm="gradient", initial_limit=20, min_limit=4)
+    run_requests(controller, clock, latency=1.0, count=20, ok=False)
+    assert controller.limit == 4
+
+
+def test_fixed_limit_does_not_change():
+    controller, clock = make_controller(algorithm="fixed", initial_limit=10)
+    run_requests(controller, clock, latency=1.0, count=3)
+    run_requests(controller, clock, latency=9.0, count=3, ok=False)
+    assert controller.limit == 10
+
+
+def test_admit_counts_errors_as_backend_failures():
+    controller, _ = make_controller(algorithm="aimd", initial_limit=10, backoff_ratio=0.5)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with controller.admit():
+                raise RuntimeError("backend failed")
+
+    asyncio.run(run())
+    assert controller.limit == 5
+    assert controller.in_flight == 0
+
+
+def test_parse_priority():
+    assert parse_priority(None) == parse_priority("normal") == PRIORITIES["normal"]
+    assert parse_priority(" High ") == PRIORITIES["high"]
+    with pytest.raises(ValueError):
+        parse_priority("urgent")
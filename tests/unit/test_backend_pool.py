@@ -0,0 +1,113 @@
+import pytest
+
+from src.config import BackendPoolConfig
+from src.core.backend_pool import BackendPool, NoBackendAvailableError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_pool(urls=("http://a", "http://b"), **config) -> tuple[BackendPool, Clock]:
+    clock = Clock()
+    return BackendPool(urls, BackendPoolConfig(**config), clock=clock), clock
+
+
+def test_least_outstanding_backend_is_chosen():
+    pool, _ = make_pool(("http://a", "http://b", "http://c"))
+    first = pool.acquire()
+    second = pool.acquire()
+    third = pool.acquire()
+    assert len({first.url, second.url, third.url}) == 3
+
+    pool.release(second, failed=False)
+    assert pool.acquire() is second
+
+
+def test_failures_eject_backend_until_cooldown():
+    pool, clock = make_pool(failure_threshold=2, open_seconds=10)
+    a, b = pool.backends
+
+    for _ in range(2):
+        pool.acquire(exclude=(b,))
+        pool.release(a, failed=True)
+    assert a.state == "open"
+    assert a.ejections_total == 1
+    assert {pool.acquire().url for _ in range(4)} == {"http://b"}
+
+    clock.now = 10
+    trial = pool.acquire(exclude=(b,))
+    assert trial is a and a.state == "half_open"
+    # Пока идёт пробный запрос, других на реплику не отправляем
+    assert not pool.can_acquire(exclude=(b,))
+
+    pool.release(a, failed=False)
+    assert a.state == "closed"
+    assert a.consecutive_failures == 0
+
+
+def test_failed_trial_ejects_again():
+    pool, clock = make_pool(("http://a",), failure_threshold=1, open_seconds=5)
+    backend = pool.acquire()
+    pool.release(backend, failed=True)
+    with pytest.raises(NoBackendAvailableError):
+        pool.acquire()
+
+    clock.now = 5
+    pool.release(pool.acquire(), failed=True)
+    assert backend.state == "open"
+    assert backend.ejections_total == 2
+
+
+def test_cancelled_request_is_not_a_verdict():
+    pool, _ = make_pool(("http://a",), failure_threshold=1)
+    backend = pool.acquire()
+    pool.release(backend, failed=None)
+    assert backend.state == "closed"
+    assert backend.outstanding == 0
+    assert backend.failures_total == 0
+
+
+def test_probes_eject_and_restore_backend():
+    pool, clock = make_pool(failure_threshold=1, open_seconds=10)
+    a = pool.backends[0]
+
+    pool.record_probe(a, ok=False)
+    assert a.state == "open" and a.healthy is False
+
+    pool.record_probe(a, ok=True)
+    assert a.state == "open"
+    clock.now = 10
+    pool.record_probe(a, ok=True)
+    assert a.state == "closed" and a.healthy is True
+
+
+def test_hedge_delay_is_latency_percentile():
+    pool, _ = make_pool(hedge=True, hedge_min_samples=10, hedge_min_delay_ms=0)
+    for i in range(1, 10):
+        pool.record_latency("generate", i / 100)
+    assert pool.hedge_delay("generate") is None
+
+    pool.record_latency("generate", 1.0)
+    assert pool.hedge_delay("generate") == 1.0
+    for _ in range(10):
+        pool.record_latency("generate", 0.01)
+    assert pool.hedge_delay("generate") == pytest.approx(0.09)
+    assert pool.hedge_delay("batch") is None
+
+
+def test_no_hedging_with_one_backend_or_when_disabled():
+    single, _ = make_pool(("http://a",), hedge=True, hedge_min_samples=1)
+    disabled, _ = make_pool(hedge=False, hedge_min_samples=1)
+    for pool in (single, disabled):
+        pool.record_latency("generate", 0.5)
+        assert pool.hedge_delay("generate") is None
+
+
+def test_pool_needs_backends():
+    with pytest.raises(ValueError):
+        BackendPool([])
@@ -0,0 +1,183 @@
+import asyncio
+
+from src.config import CommentCacheConfig
+from src.core.comment_cache import CommentCache, comment_key, normalize_code
+from src.models import Language
+
+
+def test_key_ignores_whitespace_and_comments():
+    a = "def f(a, b):\n    # сумма\n    return a+b\n"
+    b = "def f(a,b):  # сумма двух чисел\n\n    return a + b"
+    assert comment_key("Опиши  функцию", a, Language.PYTHON, "1") == comment_key(" опиши функцию", b, Language.PYTHON, "1")
+
+    java_a = "int f(int a) { /* doc */ return a; // x\n}"
+    java_b = "int f(int a)\n{\n    return a;\n}"
+    assert normalize_code(java_a, Language.JAVA) == normalize_code(java_b, Language.JAVA)
+
+
+def test_key_distinguishes_code_task_and_version():
+    base = comment_key("task", "def f():\n    return 1\n", Language.PYTHON, "1")
+    assert base != comment_key("task", "def f():\n    return 2\n", Language.PYTHON, "1")
+    assert base != comment_key("other", "def f():\n    return 1\n", Language.PYTHON, "1")
+    assert base != comment_key("task", "def f():\n    return 1\n", Language.PYTHON, "2")
+    # Строки и отступы Python значимы
+    assert normalize_code("x = 'a  b'", Language.PYTHON) != normalize_code("x = 'a b'", Language.PYTHON)
+    inside = "if x:\n    y()\n    z()\n"
+    outside = "if x:\n    y()\nz()\n"
+    assert normalize_code(inside, Language.PYTHON) != normalize_code(outside, Language.PYTHON)
+    # // в Python — деление, а не комментарий
+    assert normalize_code("a // b", Language.PYTHON) != normalize_code("a", Language.PYTHON)
+
+
+def test_normalize_code_falls_back_on_broken_python():
+    assert normalize_code("def f(:\n    '''x", Language.PYTHON)
+
+
+def test_single_flight_collapses_concurrent_requests():
+    cache = CommentCache()
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"comment": "ok"}
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_generate("k", generate) for _ in range(5)))
+        again = await cache.get_or_generate("k", generate)
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert calls == 1
+    assert sorted(status for _, status in results) == ["miss", "shared", "shared", "shared", "shared"]
+    assert all(response == {"comment": "ok"} for response, _ in results)
+    assert again == ({"comment": "ok"}, "hit")
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_errors_reach_all_waiters_and_are_not_cached():
+    cache = CommentCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_generate("k", failing) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_waiters_retry_after_leader_only_error():
+    cache = CommentCache()
+    calls = []
+
+    class Rejected(Exception):
+        pass
+
+    def generator(name: str):
+        async def generate():
+            calls.append(name)
+            await asyncio.sleep(0.01)
+            if name == "leader":
+                raise Rejected("leader is not admitted")
+            return {"comment": name}
+        return generate
+
+    async def run():
+        leader = asyncio.ensure_future(cache.get_or_generate("k", generator("leader"), retry_errors=(Rejected,)))
+        await asyncio.sleep(0)
+        followers = [
+            cache.get_or_generate("k", generator(f"follower{i}"), retry_errors=(Rejected,)) for i in range(3)
+        ]
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader, *followers = asyncio.run(run())
+    assert isinstance(leader, Rejected)
+    # Первый из ждавших начинает новый вызов, остальные ждут уже его
+    assert calls == ["leader", "follower0"]
+    assert [status for _, status in followers] == ["miss", "shared", "shared"]
+    assert all(response == {"comment": "follower0"} for response, _ in followers)
+
+
+def test_bypass_and_refresh():
+    cache = CommentCache()
+    answers = iter([{"comment": "first"}, {"comment": "second"}, {"comment": "third"}])
+
+    async def generate():
+        return next(answers)
+
+    async def run():
+        await cache.get_or_generate("k", generate)
+        refreshed = await cache.get_or_generate("k", generate, read=False)
+        bypassed = await cache.get_or_generate("k", generate, read=False, write=False)
+        cached = await cache.get("k")
+        return refreshed, bypassed, cached
+
+    refreshed, bypassed, cached = asyncio.run(run())
+    assert refreshed == ({"comment": "second"}, "miss")
+    assert bypassed == ({"comment": "third"}, "bypass")
+    assert cached == {"comment": "second"}
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = CommentCache(CommentCacheConfig(ttl_seconds=60))
+    now = [1000.0]
+    monkeypatch.setattr("src.core.comment_cache.time.time", lambda: now[0])
+    asyncio.run(cache.put("k", {"comment": "ok"}))
+    now[0] += 59
+    assert asyncio.run(cache.get("k")) == {"comment": "ok"}
+    now[0] += 2
+    assert asyncio.run(cache.get("k")) is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    config = CommentCacheConfig(disk_path=str(tmp_path / "comments.sqlite"))
+    first = CommentCache(config)
+    asyncio.run(first.put("k", {"comment": "persisted"}))
+    first.close()
+
+    second = CommentCache(config)
+    assert asyncio.run(second.get("k")) == {"comment": "persisted"}
+    assert second.stats()["disk_hits"] == 1
+    second.close()
+
+
+def test_expired_memory_entry_falls_through_to_disk(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.core.comment_cache.time.time", lambda: now[0])
+    config = CommentCacheConfig(ttl_seconds=60, disk_path=str(tmp_path / "comments.sqlite"))
+    worker, other = CommentCache(config), CommentCache(config)
+    asyncio.run(worker.put("k", {"comment": "old"}))
+
+    # Другой воркер обновил ключ в общем SQLite, когда запись в памяти уже просрочена
+    now[0] += 61
+    asyncio.run(other.put("k", {"comment": "new"}))
+    assert asyncio.run(worker.get("k")) == {"comment": "new"}
+    stats = worker.stats()
+    assert (stats["expired"], stats["disk_hits"], stats["misses"]) == (1, 1, 0)
+
+    now[0] += 61
+    assert asyncio.run(worker.get("k")) is None
+    assert worker.stats()["memory_entries"] == 0
+    worker.close()
+    other.close()
+
+
+def test_disabled_cache_always_generates():
+    cache = CommentCache(CommentCacheConfig(enabled=False))
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return {"comment": "ok"}
+
+    async def run():
+        return [await cache.get_or_generate("k", generate) for _ in range(2)]
+
+    assert [status for _, status in asyncio.run(run())] == ["bypass", "bypass"]
+    assert len(calls) == 2
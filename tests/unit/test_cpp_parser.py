@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("clang.cindex")
+
+from src.parsers.c_parser import CParser
+from src.parsers.cpp_parser import CppParser
+
+
+@pytest.fixture
+def parser():
+    return CppParser()
+
+
+def test_class_methods_and_out_of_line_definition(parser):
+    cpp_code = """#include <string>
+namespace app {
+/// A widget.
+class Widget {
+public:
+    /// Builds a widget.
+    Widget(int x) : x_(x) {}
+    std::string name(const std::string& prefix = "w") const { return prefix; }
+    static int count();
+    virtual void draw() const = 0;
+private:
+    int x_;
+};
+
+int Widget::count() { return 1; }
+}
+"""
+    funcs = parser.parse_content(cpp_code)
+    assert [f.qualified_name for f in funcs] == [
+        "Widget::Widget", "Widget::name", "Widget::count", "Widget::draw", "Widget::count",
+    ]
+
+    ctor, name, count_decl, draw, count_def = funcs
+    assert ctor.is_constructor
+    assert ctor.docstring == "Builds a widget."
+    assert ctor.full_function_text == "    /// Builds a widget.\n    Widget(int x) : x_(x) {}"
+    assert ctor.class_description == "A widget."
+    assert ctor.namespace == "app"
+
+    # Типы из ненайденных заголовков берутся из исходника, а не как int из clang
+    assert name.return_type == "std::string"
+    assert name.parameters == ['const std::string& prefix = "w"']
+    assert name.signature_text == 'std::string name(const std::string& prefix = "w") const'
+    assert name.modifiers == ["const"]
+    assert name.visibility == "public"
+
+    assert not count_decl.has_body
+    assert count_decl.modifiers == ["static"]
+    assert draw.modifiers == ["virtual", "const", "pure"]
+    assert count_def.has_body
+    assert count_def.function_text == "int Widget::count() { return 1; }"
+    assert count_def.start_line == 15
+
+
+def test_free_functions_and_extern_c(parser):
+    cpp_code = 'extern "C" { int cfunc(int a, char** b, ...); }\n\ntemplate <typename T>\nT ident(T v) { return v; }\n'
+    cfunc, ident = parser.parse_content(cpp_code)
+    assert not cfunc.is_method and cfunc.visibility is None
+    assert cfunc.parameters == ["int a", "char** b", "..."]
+    assert ident.return_type == "T"
+    assert ident.parameters == ["T v"]
+    assert ident.start_line == 3
+
+
+def test_extract_skips_bodies_when_no_body_field_is_requested(parser, monkeypatch):
+    from clang.cindex import TranslationUnit
+
+    code = (
+        "namespace ns {\n/// Виджет.\nclass Widget {\npublic:\n    Widget(int a) : a_(a) { if (a) { a_ = 2; } }\n"
+        "    static int count() { return 1; }\nprivate:\n    int a_;\n};\n}\n"
+        "/* Складывает. */\nstatic int add(int a, int b) {\n    return a + b;\n}\n"
+    )
+    options = []
+    parse = parser._index.parse
+    monkeypatch.setattr(parser._index, "parse", lambda *args, **kwargs: options.append(kwargs["options"]) or parse(*args, **kwargs))
+
+    fields = ["name", "qualified_name", "parameters", "modifiers", "docstring", "start_line", "class_name"]
+    skipped = parser.extract(code, fields)
+    full = parser.extract(code, fields + ["function_text"])
+    assert options[0] & TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+    assert not options[1] & TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+    assert [fd.to_dict(fields) for fd in skipped] == [fd.to_dict(fields) for fd in full]
+    assert full[-1].function_text.endswith("return a + b;\n}")
+
+
+def test_c_parser_with_unicode_comment():
+    c_code = "#include <stdio.h>\n/* Складывает. */\nstatic int add(int a, int b) {\n    return a + b;\n}\nvoid noop(void);\n"
+    add, noop = CParser().parse_content(c_code)
+    assert add.language == "c"
+    assert add.docstring == "Складывает."
+    assert add.full_function_text.startswith("/* Складывает. */\nstatic int add(")
+    assert add.modifiers == ["static"]
+    assert (add.start_line, add.end_line) == (2, 5)
+    assert noop.parameters == []
+    assert not noop.has_body
@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("tree_sitter_c_sharp")
+
+from src.parsers.csharp_parser import CSharpParser
+
+
+@pytest.fixture
+def parser():
+    return CSharpParser()
+
+
+def test_methods_constructors_and_docs(parser):
+    cs_code = """
+namespace App.Core {
+    /// <summary>Thing.</summary>
+    public class Thing {
+        /// <summary>Adds.</summary>
+        [Obsolete]
+        public static int Add(int a, params string[] rest) { return a; }
+
+        public Thing(int x) : base(x) {}
+
+        int Get() => 1;
+
+        public interface IStore { void Save(); }
+    }
+}
+"""
+    funcs = parser.parse_content(cs_code)
+    assert [f.qualified_name for f in funcs] == [
+        "Thing.Add", "Thing.Thing", "Thing.Get", "Thing.IStore.Save",
+    ]
+
+    add = funcs[0]
+    assert add.namespace == "App.Core"
+    assert add.docstring == "<summary>Adds.</summary>"
+    assert add.decorators == ["[Obsolete]"]
+    assert add.modifiers == ["public", "static"]
+    assert add.visibility == "public"
+    assert add.return_type == "int"
+    assert add.parameters == ["int a", "params string[] rest"]
+    assert add.class_description == "<summary>Thing.</summary>"
+    assert add.signature_text == "public static int Add(int a, params string[] rest)"
+
+    assert funcs[1].is_constructor
+    assert funcs[2].visibility == "private"
+    assert funcs[2].has_body
+    assert funcs[3].visibility == "public"
+    assert not funcs[3].has_body
+
+
+def test_file_scoped_namespace_and_local_function(parser):
+    cs_code = "namespace A.B;\n\nclass C {\n    void Outer() {\n        int Local(int y) { return y; }\n    }\n}\n"
+    outer, local = parser.parse_content(cs_code)
+    assert outer.namespace == local.namespace == "A.B"
+    assert outer.is_method and outer.class_name == "C"
+    assert not local.is_method and local.class_name is None
+    assert local.start_line == 5
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.config import GenerationBatchConfig, LLMClientConfig
+from src.core.generation_batcher import GenerationBatcher, GenerationQueueFullError
+from src.core.llm_client import LLMClient
+from src.dto.commenters import CommentRequest
+
+
+def make_request(i: int) -> CommentRequest:
+    return CommentRequest(task="Опиши функцию", code=f"def f{i}(): pass", function=f"f{i}()")
+
+
+def batch_backend(calls: list, supports_batch: bool = True):
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(body)
+        if "batch" in body:
+            if not supports_batch:
+                return httpx.Response(422, json={"detail": "task is required"})
+            return httpx.Response(200, json=[{"comment": item["code"]} for item in body["batch"]])
+        return httpx.Response(200, json={"comment": body["code"]})
+
+    return LLMClient(LLMClientConfig(base_url="http://backend"), transport=httpx.MockTransport(handler))
+
+
+async def run_batcher(client: LLMClient, config: GenerationBatchConfig, count: int):
+    await client.start()
+    batcher = GenerationBatcher(client, config)
+    await batcher.start()
+    try:
+        results = await asyncio.gather(*(batcher.generate(make_request(i)) for i in range(count)))
+        return results, batcher.stats()
+    finally:
+        await batcher.close()
+        await client.close()
+
+
+def test_concurrent_requests_share_one_backend_call():
+    calls = []
+    config = GenerationBatchConfig(max_batch_size=8, max_wait_ms=50)
+    results, stats = asyncio.run(run_batcher(batch_backend(calls), config, 5))
+
+    assert [r["comment"] for r in results] == [f"def f{i}(): pass" for i in range(5)]
+    assert len(calls) == 1 and len(calls[0]["batch"]) == 5
+    assert stats["batches_total"] == 1
+    assert stats["items_total"] == 5
+    assert stats["peak_batch_size"] == 5
+    assert stats["queue_depth"] == 0
+
+
+def test_batches_are_capped_by_size():
+    calls = []
+    config = GenerationBatchConfig(max_batch_size=2, max_wait_ms=50)
+    results, stats = asyncio.run(run_batcher(batch_backend(calls), config, 5))
+
+    assert len(results) == 5
+    assert sorted(len(call.get("batch", [call])) for call in calls) == [1, 2, 2]
+    assert stats["peak_batch_size"] == 2
+
+
+def test_falls_back_to_per_item_without_batch_support():
+    calls = []
+    config = GenerationBatchConfig(max_batch_size=8, max_wait_ms=50)
+    results, stats = asyncio.run(run_batcher(batch_backend(calls, supports_batch=False), config, 3))
+
+    assert [r["comment"] for r in results] == [f"def f{i}(): pass" for i in range(3)]
+    assert stats["mode"] == "per_item"
+    assert stats["fallbacks_total"] == 1
+    assert sum("batch" not in call for call in calls) == 3
+
+
+def test_per_item_mode_never_batches():
+    calls = []
+    config = GenerationBatchConfig(mode="per_item", max_batch_size=8, max_wait_ms=50)
+    results, stats = asyncio.run(run_batcher(batch_backend(calls), config, 4))
+
+    assert len(results) == 4
+    assert all("batch" not in call for call in calls)
+    assert stats["batches_total"] == 1
+
+
+def test_queue_overflow_is_rejected():
+    calls = []
+    client = batch_backend(calls)
+
+    async def run():
+        await client.start()
+        batcher = GenerationBatcher(client, GenerationBatchConfig(max_queue=2, max_wait_ms=50))
+        await batcher.start()
+        try:
+            tasks = [asyncio.create_task(batcher.generate(make_request(i))) for i in range(4)]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            return results, batcher.stats()
+        finally:
+            await batcher.close()
+            await client.close()
+
+    results, stats = asyncio.run(run())
+    assert sum(isinstance(r, GenerationQueueFullError) for r in results) >= 1
+    assert stats["rejected_total"] >= 1
+
+
+def test_cancelled_request_leaves_batch():
+    calls = []
+    client = batch_backend(calls)
+
+    async def run():
+        await client.start()
+        batcher = GenerationBatcher(client, GenerationBatchConfig(max_wait_ms=50))
+        await batcher.start()
+        try:
+            gone = asyncio.create_task(batcher.generate(make_request(0)))
+            kept = asyncio.create_task(batcher.generate(make_request(1)))
+            await asyncio.sleep(0)
+            gone.cancel()
+            return await kept
+        finally:
+            await batcher.close()
+            await client.close()
+
+    assert asyncio.run(run()) == {"comment": "def f1(): pass"}
+    assert calls == [{"task": "Опиши функцию", "code": "def f1(): pass", "function": "f1()"}]
+
+
+def test_not_started_batcher_calls_backend_directly():
+    calls = []
+    client = batch_backend(calls)
+
+    async def run():
+        await client.start()
+        try:
+            return await GenerationBatcher(client).generate(make_request(0))
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == {"comment": "def f0(): pass"}
+    assert len(calls) == 1
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        GenerationBatcher(LLMClient(), GenerationBatchConfig(mode="bulk"))
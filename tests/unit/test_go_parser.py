@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("tree_sitter_go")
+
+from src.parsers.go_parser import GoParser
+
+
+@pytest.fixture
+def parser():
+    return GoParser()
+
+
+def test_function_and_method(parser):
+    go_code = """package server
+
+// Server serves requests.
+type Server struct{}
+
+// Start starts
+// the server.
+func (s *Server) Start(ctx context.Context, a, b int, rest ...string) (int, error) {
+	return 0, nil
+}
+
+func helper[T any](x T) {} // not a doc
+"""
+    funcs = parser.parse_content(go_code)
+    assert [f.name for f in funcs] == ["Start", "helper"]
+
+    start = funcs[0]
+    assert start.qualified_name == "Server.Start"
+    assert start.class_name == "Server"
+    assert start.class_description == "Server serves requests."
+    assert start.namespace == "server"
+    assert start.is_method
+    assert start.visibility == "public"
+    assert start.parameters == ["ctx context.Context", "a int", "b int", "rest ...string"]
+    assert start.return_type == "(int, error)"
+    assert start.docstring == "Start starts\nthe server."
+    assert start.full_function_text.startswith("// Start starts")
+    assert start.function_text.startswith("func (s *Server) Start(")
+    assert (start.start_line, start.end_line) == (6, 10)
+
+    helper = funcs[1]
+    assert not helper.is_method
+    assert helper.visibility == "package-private"
+    assert helper.docstring is None
+    assert helper.signature_text == "func helper[T any](x T)"
+
+
+def test_declaration_without_body(parser):
+    funcs = parser.parse_content("package p\n\nfunc asm(x int) int\n")
+    assert len(funcs) == 1
+    assert not funcs[0].has_body
+    assert funcs[0].return_type == "int"
+
+
+def test_generic_receiver_and_unicode_columns(parser):
+    go_code = 'package p\n\nvar s = "ключ"; func (l *List[T]) Len() int { return 0 }\n'
+    f = parser.parse_content(go_code)[0]
+    assert f.class_name == "List"
+    assert f.start_column == go_code.splitlines()[2].index("func")
+    assert f.function_text == "func (l *List[T]) Len() int { return 0 }"
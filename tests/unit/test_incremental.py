@@ -0,0 +1,221 @@
+import pytest
+
+from src.models.function_description import to_normalized
+from src.parsers.java_parser import JavaParser
+from src.parsers.python_parser import PythonParser
+
+PY = '''\
+import os
+
+
+def first(a):
+    """First."""
+    return a
+
+
+class Service:
+    """Service doc."""
+
+    @staticmethod
+    def run(x: int) -> int:
+        return x
+
+
+def last():
+    pass
+'''
+
+JAVA = '''\
+package demo;
+
+/** Alpha doc. */
+public class Alpha {
+    public int add(int a, int b) { return a + b; }
+}
+
+class Beta {
+    /** Doc. */
+    void run() { String s = "}"; }
+}
+
+interface Gamma {
+    void g();
+}
+'''
+
+
+def dicts(functions):
+    # Нормализованная форма сверяет и общие описания классов (позиции, комментарии)
+    return [fd.to_dict() for fd in functions], to_normalized(functions)
+
+
+def reparse_only(parser, old, new):
+    """reparse без полного разбора: parse_content после первого разбора запрещён."""
+    old_functions = parser.parse_content(old)
+
+    def fail(content):
+        raise AssertionError("full parse")
+
+    parser.parse_content = fail
+    try:
+        return parser.reparse(old, old_functions, new)
+    finally:
+        del parser.parse_content
+
+
+@pytest.mark.parametrize("new", [
+    PY.replace("return a", "return a + 1\n    # more"),
+    PY.replace("def last():", "def helper():\n    return 1\n\n\ndef last():"),
+    PY.replace('    """Service doc."""\n', ""),
+    PY.replace("\n\ndef first(a):", "\n\nasync def first(a, b):"),
+])
+def test_python_reparse_matches_full_parse(new):
+    functions = reparse_only(PythonParser(), PY, new)
+    assert dicts(functions) == dicts(PythonParser().parse_content(new))
+    # Тексты неизменённых функций ссылаются на новую версию файла
+    assert functions[-1].span("full_function_text").source is new
+
+
+def test_python_reparse_widens_on_indentation_change():
+    new = PY.replace("    pass\n", "    pass\n    return 1\n")
+    parser = PythonParser()
+    assert dicts(parser.reparse(PY, parser.parse_content(PY), new)) == dicts(PythonParser().parse_content(new))
+
+
+def test_python_reparse_syntax_error_falls_back():
+    parser = PythonParser()
+    new = PY.replace("def last():", "def last(:")
+    functions = parser.reparse(PY, parser.parse_content(PY), new)
+    assert dicts(functions) == dicts(PythonParser().parse_content(new))
+    assert [fd.parse_error is not None for fd in functions] == [False, False, True]
+
+
+@pytest.mark.parametrize("new", [
+    JAVA.replace("return a + b;", "return a + b + 1;"),
+    JAVA.replace("    void run()", "    /** More. */\n    int other() { return 0; }\n\n    void run()"),
+    JAVA.replace("/** Alpha doc. */\n", ""),
+    JAVA + "\nclass Delta { void d() {} }\n",
+])
+def test_java_reparse_matches_full_parse(new):
+    functions = reparse_only(JavaParser(), JAVA, new)
+    assert dicts(functions) == dicts(JavaParser().parse_content(new))
+
+
+def test_java_reparse_unclosed_comment_falls_back():
+    new = JAVA.replace("class Beta {", "/* class Beta {")
+    parser = JavaParser()
+    assert dicts(parser.reparse(JAVA, parser.parse_content(JAVA), new)) == dicts(JavaParser().parse_content(new))
+
+
+GO = '''\
+package demo
+
+// Point doc.
+type Point struct{ X int }
+
+// Norm doc.
+func (p *Point) Norm() int { return p.X }
+
+func Add(a, b int) int { return a + b }
+
+func Sub(a, b int) int { return a - b }
+'''
+
+
+@pytest.mark.parametrize("new", [
+    GO.replace("return a + b", "return a + b + 1"),
+    GO.replace("func Add", "// Add doc.\nfunc Add"),
+    GO.replace("// Point doc.", "// Point documentation."),
+    GO.replace("return a - b }", "return a - b }\n\nfunc Mul(a, b int) int { return a * b }"),
+])
+def test_go_reparse_matches_full_parse(new):
+    pytest.importorskip("tree_sitter_go")
+    from src.parsers.go_parser import GoParser
+
+    functions = reparse_only(GoParser(), GO, new)
+    assert dicts(functions) == dicts(GoParser().parse_content(new))
+
+
+GO_FAR = '''\
+package main
+
+// Point doc.
+type Point struct{}
+
+func A() {}
+
+func B() {}
+
+func C() {}
+
+func (p Point) Norm() int { return 0 }
+'''
+
+
+@pytest.mark.parametrize("new", [
+    GO_FAR.replace("package main\n", ""),
+    GO_FAR.replace("type Point struct{}\n", ""),
+])
+def test_go_reparse_after_removing_shared_node_matches_full_parse(new):
+    # Удалённого общего узла нет в новом дереве: правку выдаёт только старое
+    pytest.importorskip("tree_sitter_go")
+    from src.parsers.go_parser import GoParser
+
+    functions = reparse_only(GoParser(), GO_FAR, new)
+    assert dicts(functions) == dicts(GoParser().parse_content(new))
+
+
+def test_javascript_reparse_reuses_tree():
+    pytest.importorskip("tree_sitter_javascript")
+    from src.parsers.javascript_parser import JavaScriptParser
+
+    old = "/** A. */\nfunction a() { return 1; }\n\nclass K {\n  m() {}\n}\n\nconst b = () => 2;\n"
+    new = old.replace("return 1;", "return 'ü';\n  // two")
+    functions = reparse_only(JavaScriptParser(), old, new)
+    assert dicts(functions) == dicts(JavaScriptParser().parse_content(new))
+
+
+def test_csharp_reparse_inside_class_keeps_one_class_description():
+    pytest.importorskip("tree_sitter_c_sharp")
+    from src.parsers.csharp_parser import CSharpParser
+
+    old = (
+        "namespace Demo {\n    /// <summary>K.</summary>\n    class K {\n"
+        "        void A() {}\n\n        void B() {}\n\n        void C() {}\n    }\n}\n"
+    )
+    new = old.replace("void B() {}", "void B() {\n            return;\n        }")
+    functions = reparse_only(CSharpParser(), old, new)
+    assert dicts(functions) == dicts(CSharpParser().parse_content(new))
+    info = functions[0].class_info
+    assert (info.start_line, info.end_line) == (3, 11)
+    assert all(fd.class_info is info for fd in functions)
+
+
+CS = '''\
+namespace App;
+
+class A {
+    void Run() {}
+}
+
+class B {
+    void Run() {}
+}
+
+class C {
+    void Run() {}
+}
+'''
+
+
+@pytest.mark.parametrize("new", [
+    CS.replace("void Run() {}\n}\n\nclass C", "void Run() { }\n}\n\nclass C"),
+    CS.replace("namespace App;\n", ""),
+    CS.replace("namespace App;", "namespace Other;"),
+])
+def test_csharp_reparse_file_scoped_namespace_matches_full_parse(new):
+    pytest.importorskip("tree_sitter_c_sharp")
+    from src.parsers.csharp_parser import CSharpParser
+
+    functions = reparse_only(CSharpParser(), CS, new)
+    assert dicts(functions) == dicts(CSharpParser().parse_content(new))
@@ -67,6 +67,27 @@ def test_nested_classes(parser):
     assert f.qualified_name == "Outer.Inner.innerMethod"
 
 
+def test_methods_share_one_class_description(parser):
+    java_code = """\
+/** Outer doc. */
+public class Outer {
+    void a() {}
+    void b() {}
+
+    interface Inner {
+        void c();
+    }
+}
+"""
+    a, b, c = parser.parse_content(java_code)
+    assert a.class_info is b.class_info
+    assert (a.class_info.kind, a.class_info.start_line, a.class_info.end_line) == ("class", 2, 9)
+    assert a.class_info.docstring == "Outer doc."
+    assert (c.class_info.name, c.class_info.kind, c.class_info.start_line, c.class_info.end_line) == (
+        "Outer.Inner", "interface", 6, 8,
+    )
+
+
 def test_interface_methods(parser):
     java_code = """
     public interface MyInterface {
@@ -243,4 +264,48 @@ def test_java_parsing(parser):
     assert f.qualified_name == "None.getByIndex"
     assert f.return_type == "Node<E>"
     assert f.parameters == ["int index"]
-    assert f.visibility == "private"
\ No newline at end of file
+    assert f.visibility == "private"
+
+def test_braces_in_literals_and_comments(parser):
+    java_code = '''
+    public class Literals {
+        private static final String OPEN = "{";
+
+        public String first() {
+            char c = '}';
+            // } in a comment
+            String block = """
+                } still text {
+                """;
+            return "}" + c + block;
+        }
+
+        public void second() {}
+    }
+    '''
+    funcs = parser.parse_content(java_code)
+    assert [f.qualified_name for f in funcs] == ["Literals.first", "Literals.second"]
+    assert funcs[0].function_text.endswith('return "}" + c + block;\n        }')
+
+
+def test_constructor_and_trailing_comment(parser):
+    java_code = """
+    public class Point {
+        private int x; // not a docstring
+
+        /** Creates a point. */
+        public Point(int x) {
+            this.x = x;
+        }
+    }
+    """
+    funcs = parser.parse_content(java_code)
+    assert len(funcs) == 1
+    f = funcs[0]
+    assert f.is_constructor
+    assert f.docstring == "Creates a point."
+    assert f.modifiers == ["public"]
+    assert f.start_line == 5
+    assert f.end_line == 8
+    assert f.start_column == 8
+    assert f.end_column == 9
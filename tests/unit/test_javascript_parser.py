@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("tree_sitter_javascript")
+
+from src.parsers.javascript_parser import JavaScriptParser
+
+
+@pytest.fixture
+def parser():
+    return JavaScriptParser()
+
+
+def test_functions_and_class_methods(parser):
+    js_code = """
+/** Adds numbers. */
+export async function add(a, b = 1, ...rest) { return a + b; }
+
+const mul = (a, b) => a * b;
+
+/** A widget. */
+class Widget extends Base {
+  constructor(name) { super(); }
+  static *ids() {}
+  #secret() {}
+  handle = event => event;
+}
+"""
+    funcs = parser.parse_content(js_code)
+    assert [f.qualified_name for f in funcs] == [
+        "add", "mul", "Widget.constructor", "Widget.ids", "Widget.#secret", "Widget.handle",
+    ]
+
+    add = funcs[0]
+    assert add.docstring == "Adds numbers."
+    assert add.modifiers == ["export", "async"]
+    assert add.parameters == ["a", "b = 1", "...rest"]
+    assert add.full_function_text.startswith("/** Adds numbers. */\nexport async function")
+
+    assert funcs[1].full_function_text == "const mul = (a, b) => a * b;"
+    assert not funcs[1].is_method
+
+    ctor, ids, secret, handle = funcs[2:]
+    assert ctor.is_constructor and ctor.class_description == "A widget."
+    assert ids.modifiers == ["static", "generator"]
+    assert secret.visibility == "private"
+    assert handle.is_method and handle.parameters == ["event"]
+
+
+def test_typescript_falls_back_to_tsx_grammar(parser):
+    ts_code = """
+export function parse<T>(text: string, strict?: boolean): Promise<T> { return null; }
+
+abstract class Repo {
+  @cached() private static load(id: number): void {}
+  abstract save(item: Item): boolean;
+}
+
+interface Store { get(key: string): string; }
+declare function external(x: number): void;
+const View = () => <div/>;
+"""
+    funcs = parser.parse_content(ts_code)
+    by_name = {f.qualified_name: f for f in funcs}
+    assert list(by_name) == ["parse", "Repo.load", "Repo.save", "Store.get", "external", "View"]
+
+    parse = by_name["parse"]
+    assert parse.return_type == "Promise<T>"
+    assert parse.parameters == ["text: string", "strict?: boolean"]
+    assert parse.signature_text == "function parse<T>(text: string, strict?: boolean): Promise<T>"
+
+    load = by_name["Repo.load"]
+    assert load.decorators == ["@cached()"]
+    assert load.visibility == "private"
+    assert load.function_text.startswith("@cached()")
+
+    assert not by_name["Repo.save"].has_body
+    assert not by_name["Store.get"].has_body
+    assert by_name["external"].modifiers == ["declare"]
+    assert by_name["View"].has_body
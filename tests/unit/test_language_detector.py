@@ -52,3 +52,22 @@ def test_unknown_extension(detector):
 def test_case_insensitive(detector):
     assert detector.detect_language("A.PY") == Language.PYTHON
     assert detector.detect_language("/tmp/HELLO.CPP") == Language.CPP
+
+
+def test_detect_patterns(detector):
+    assert detector.detect_language_patterns("def add(a, b):\n    return a + b\n") == Language.PYTHON
+    assert detector.detect_language_patterns("package main\n\nfunc main() {\n\tx := 1\n}\n") == Language.GO
+    assert detector.detect_language_patterns("const f = (a) => a;\nconsole.log(f(1));\n") == Language.JAVASCRIPT
+    assert detector.detect_language_patterns("just some text") is None
+
+
+def test_detect_patterns_overlapping_matches(detector):
+    # Паттерны разных языков в одной строке засчитываются каждый сам по себе
+    code = "def f(x): y := x => 1\nconst a = 1\nconsole.log(a)\n"
+    assert detector.detect_language_patterns(code) == Language.JAVASCRIPT
+
+
+def test_detect_patterns_scans_bounded_prefix(detector):
+    code = "def f(x):\n    pass\n" + "function g() {}\n" * 10 + "console.log(g())\n"
+    assert detector.detect_language_patterns(code, max_chars=20) == Language.PYTHON
+    assert detector.detect_language_patterns(code) == Language.JAVASCRIPT
@@ -0,0 +1,20 @@
+from src.utils.line_index import LineIndex
+
+
+def test_positions():
+    index = LineIndex("ab\ncd\n\nef")
+    assert index.line_count == 4
+    assert index.position(0) == (1, 0)
+    assert index.position(2) == (1, 2)    # сам перевод строки относится к своей строке
+    assert index.position(3) == (2, 0)
+    assert index.position(7) == (4, 0)
+    assert index.position(9) == (4, 2)    # конец текста
+    assert index.line_start(4) == 3
+
+
+def test_offset_and_line_text():
+    index = LineIndex("ab\ncd\n\nef")
+    assert index.offset(2, 1) == 4
+    assert index.line_text(2) == "cd"
+    assert index.line_text(3) == ""
+    assert index.line_text(4) == "ef"
@@ -0,0 +1,298 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.config import BackendPoolConfig, LLMClientConfig
+from src.core.llm_client import LLMClient
+from src.dto.commenters import CommentRequest
+
+
+def make_request() -> CommentRequest:
+    return CommentRequest(task="Опиши функцию", code="def f(): pass", function="f()")
+
+
+def test_generate_uses_shared_client():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"comment": "ok"})
+
+    client = LLMClient(LLMClientConfig(base_url="http://backend"), transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        first = await client.generate(make_request())
+        second = await client.generate(make_request())
+        inner = client._client
+        await client.close()
+        return first, second, inner
+
+    first, second, inner = asyncio.run(run())
+    assert first == second == {"comment": "ok"}
+    assert inner is not None
+    assert [str(r.url) for r in seen] == ["http://backend/generate"] * 2
+
+    stats = client.stats()
+    assert stats["requests_total"] == 2
+    assert stats["errors_total"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["started"] is False
+
+
+def test_generate_counts_errors():
+    transport = httpx.MockTransport(lambda request: httpx.Response(500))
+    client = LLMClient(LLMClientConfig(base_url="http://backend"), transport=transport)
+
+    async def run():
+        await client.start()
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.generate(make_request())
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert client.stats()["errors_total"] == 1
+
+
+def test_generate_requires_start():
+    client = LLMClient()
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.generate(make_request()))
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+    client = LLMClient(LLMClientConfig(http2=True))
+
+    async def run():
+        await client.start()
+        stats = client.stats()
+        await client.close()
+        return stats
+
+    assert asyncio.run(run())["http2"] is False
+
+
+def collect_stream(response: httpx.Response) -> tuple[list[str], dict]:
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = request.content
+        seen["accept"] = request.headers["accept"]
+        return response
+
+    client = LLMClient(LLMClientConfig(base_url="http://backend"), transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        try:
+            return [text async for text in client.generate_stream(make_request())]
+        finally:
+            await client.close()
+
+    texts = asyncio.run(run())
+    assert client.stats()["in_flight"] == 0
+    return texts, seen
+
+
+def test_generate_stream_sse():
+    body = (
+        b'data: {"token": "Returns"}\n\n'
+        b'data: {"choices": [{"delta": {"content": " the"}}]}\n\n'
+        b": keep-alive\n\n"
+        b"data:  argument\n\n"
+        b"data: [DONE]\n\n"
+    )
+    texts, seen = collect_stream(httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body))
+    assert texts == ["Returns", " the", " argument"]
+    assert b'"stream": true' in seen["body"] or b'"stream":true' in seen["body"]
+    assert "text/event-stream" in seen["accept"]
+
+
+def test_generate_stream_ndjson_and_plain_text():
+    body = b'{"comment": "a"}\n{"comment": "b"}\n'
+    texts, _ = collect_stream(httpx.Response(200, headers={"content-type": "application/x-ndjson"}, content=body))
+    assert texts == ["a", "b"]
+
+    texts, _ = collect_stream(httpx.Response(200, headers={"content-type": "text/plain"}, content=b"whole text"))
+    assert "".join(texts) == "whole text"
+
+
+def test_generate_stream_falls_back_to_json():
+    texts, _ = collect_stream(httpx.Response(200, json={"comment": "ok"}))
+    assert texts == ["ok"]
+
+
+def test_generate_stream_close_cancels_upstream():
+    state = {"closed": False}
+
+    async def body():
+        try:
+            yield b"data: first\n\n"
+            await asyncio.sleep(3600)
+            yield b"data: never\n\n"
+        finally:
+            state["closed"] = True
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body())
+
+    client = LLMClient(LLMClientConfig(base_url="http://backend"), transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        chunks = client.generate_stream(make_request())
+        first = await anext(chunks)
+        assert client.stats()["in_flight"] == 1
+        # Клиент отключился: генератор закрывается посреди генерации
+        await asyncio.wait_for(chunks.aclose(), timeout=5)
+        await client.close()
+        return first
+
+    assert asyncio.run(run()) == "first"
+    assert client.stats()["in_flight"] == 0
+    assert state["closed"] is True
+
+
+def pool_config(*urls: str, **pool) -> LLMClientConfig:
+    return LLMClientConfig(pool=BackendPoolConfig(urls=list(urls), health_interval=0, **pool))
+
+
+def test_requests_are_spread_over_backends():
+    hosts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"comment": request.url.host})
+
+    client = LLMClient(pool_config("http://a", "http://b"), transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        try:
+            return await asyncio.gather(*(client.generate(make_request()) for _ in range(4)))
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert sorted(hosts) == ["a", "a", "b", "b"]
+    assert [backend["requests_total"] for backend in client.stats()["backends"]] == [2, 2]
+
+
+def test_failing_backend_is_ejected():
+    hosts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        if request.url.host == "a":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"comment": "ok"})
+
+    client = LLMClient(pool_config("http://a", "http://b", failure_threshold=1), transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        try:
+            results = []
+            for _ in range(4):
+                try:
+                    results.append(await client.generate(make_request()))
+                except httpx.ConnectError:
+                    results.append(None)
+            return results
+        finally:
+            await client.close()
+
+    results = asyncio.run(run())
+    assert hosts.count("a") == 1
+    assert results.count({"comment": "ok"}) == 3
+    a, b = client.stats()["backends"]
+    assert a["state"] == "open" and a["ejections_total"] == 1
+    assert b["state"] == "closed"
+
+
+def test_check_backends_marks_unhealthy():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/health"
+        return httpx.Response(503 if request.url.host == "a" else 200)
+
+    client = LLMClient(pool_config("http://a", "http://b", failure_threshold=1), transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        try:
+            await client.check_backends()
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    a, b = client.stats()["backends"]
+    assert (a["healthy"], a["state"]) == (False, "open")
+    assert (b["healthy"], b["state"]) == (True, "closed")
+
+
+def test_slow_backend_is_hedged():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "slow":
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"comment": request.url.host})
+
+    config = pool_config("http://slow", "http://fast", hedge=True, hedge_min_samples=1, hedge_min_delay_ms=10)
+    client = LLMClient(config, transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        try:
+            client.pool.record_latency("generate", 0.01)
+            slow = client.pool.backends[0]
+            # Первый запрос — на медленную реплику, дубль — на быструю
+            client.pool.backends[1].outstanding += 1
+            try:
+                response = await asyncio.wait_for(client.generate(make_request()), 2)
+            finally:
+                client.pool.backends[1].outstanding -= 1
+            return response, slow.outstanding
+        finally:
+            await client.close()
+
+    response, slow_outstanding = asyncio.run(run())
+    assert response == {"comment": "fast"}
+    assert slow_outstanding == 0
+    stats = client.stats()
+    assert stats["hedged_total"] == 1
+    assert stats["hedge_wins_total"] == 1
+    assert stats["backends"][0]["state"] == "closed"
+
+
+def test_cancelled_requests_leave_no_outstanding_backends():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"comment": "late"})
+
+    config = pool_config("http://a", "http://b", hedge=True, hedge_min_samples=1, hedge_min_delay_ms=10)
+    client = LLMClient(config, transport=httpx.MockTransport(handler))
+
+    async def run():
+        await client.start()
+        try:
+            client.pool.record_latency("generate", 0.01)
+            # Отменён до первого шага: реплика не должна остаться занятой
+            never_started = asyncio.ensure_future(client.generate(make_request()))
+            never_started.cancel()
+            # Отменён, когда идут и исходный запрос, и дубль
+            hedged = asyncio.ensure_future(client.generate(make_request()))
+            while client.stats()["hedged_total"] == 0:
+                await asyncio.sleep(0.005)
+            hedged.cancel()
+            await asyncio.gather(never_started, hedged, return_exceptions=True)
+            await asyncio.sleep(0)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert [backend["outstanding"] for backend in client.stats()["backends"]] == [0, 0]
+    assert client.stats()["in_flight"] == 0
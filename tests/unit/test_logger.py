@@ -0,0 +1,113 @@
+import json
+import logging
+
+import pytest
+
+from src.config import LoggerConfig, LoggingConfig
+from src.utils.logger import SimpleLogger, truncate
+
+
+@pytest.fixture()
+def make_logger(tmp_path):
+    loggers = []
+
+    def make(name="test", **overrides):
+        logging_config = LoggingConfig(log_dir=str(tmp_path), **overrides)
+        logger = SimpleLogger(name, LoggerConfig(file=f"{name}.log", console=False), logging_config)
+        loggers.append(logger)
+        return logger
+
+    yield make
+    for logger in loggers:
+        logger.stop()
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_single_line_json(make_logger, tmp_path):
+    logger = make_logger("lines")
+    logger.log_error("boom", context={"file": "a.py", "text": "line 1\nline 2"})
+    logger.log_exception(ValueError("bad"), context={"n": 1})
+    logger.debug("value=%s", 42)
+    logger.stop()
+
+    first, second, third = read_lines(tmp_path / "lines.log")
+    assert first["level"] == "ERROR" and first["logger"] == "lines"
+    assert first["problem"] == "boom"
+    assert first["context"] == {"file": "a.py", "text": "line 1\nline 2"}
+    assert second["type"] == "ValueError" and second["error"] == "bad"
+    assert third["level"] == "DEBUG" and third["context"] == "value=42"
+
+
+def test_disabled_level_skips_record_construction(make_logger, tmp_path):
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted while DEBUG is disabled")
+
+    logger = make_logger("quiet")
+    logger.configure(LoggerConfig(file="quiet.log", level="INFO", console=False), LoggingConfig(log_dir=str(tmp_path)))
+    logger.debug("payload=%s", Expensive())
+    logger.log_error("kept")
+    logger.stop()
+
+    assert [record["level"] for record in read_lines(tmp_path / "quiet.log")] == ["ERROR"]
+
+
+def test_debug_sampling(make_logger, tmp_path):
+    logger = make_logger("sampled")
+    logger.configure(
+        LoggerConfig(file="sampled.log", console=False, debug_sample_rate=0.0), LoggingConfig(log_dir=str(tmp_path))
+    )
+    assert not logger.enabled(logging.DEBUG)
+    assert logger.enabled(logging.ERROR)
+
+
+def test_large_payloads_are_truncated(make_logger, tmp_path):
+    logger = make_logger("large", max_string_chars=10, max_items=3)
+    logger.log_error("x" * 100, context={"items": list(range(10))})
+    logger.stop()
+
+    (record,) = read_lines(tmp_path / "large.log")
+    assert record["problem"] == "x" * 10 + "…[+90 chars]"
+    assert record["context"]["items"] == [0, 1, 2, "…[+7 items]"]
+
+
+def test_truncate_copies_nested_values():
+    data = {"a": {"b": ["long text", object()]}, "c": None}
+    result = truncate(data, max_chars=4, max_items=10)
+    assert result["a"]["b"][0] == "long…[+5 chars]"
+    assert isinstance(result["a"]["b"][1], str)
+    assert result["c"] is None
+    assert data["a"]["b"][0] == "long text"
+
+
+def test_unknown_level_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SimpleLogger("bad", LoggerConfig(level="LOUD", console=False), LoggingConfig(log_dir=str(tmp_path)))
+
+
+def test_unconfigured_logger_writes_stderr_only(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    logger = SimpleLogger("bare")
+    try:
+        logger.log_error("to stderr")
+        assert logger._listener is None
+        assert not (tmp_path / "logs").exists()
+        assert json.loads(capsys.readouterr().err)["problem"] == "to stderr"
+    finally:
+        logger.stop()
+
+
+def test_import_starts_no_listener_thread():
+    import subprocess
+    import sys
+
+    code = (
+        "import threading, src.utils.logger as log; "
+        "assert log.error_logger._listener is None and log.process_logger._listener is None; "
+        "print(threading.active_count())"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "1"
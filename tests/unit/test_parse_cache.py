@@ -0,0 +1,98 @@
+import asyncio
+
+from src.config import ParseCacheConfig
+from src.core.parse_cache import ParseCache
+from src.models import FunctionDescription, Language
+from src.parsers.python_parser import PythonParser
+
+CODE = "def f(a):\n    return a\n"
+
+
+def parsed() -> list[FunctionDescription]:
+    return PythonParser().parse_content(CODE)
+
+
+def test_memory_hit_after_put():
+    cache = ParseCache(ParseCacheConfig())
+
+    async def run():
+        assert await cache.get(Language.PYTHON, "1", CODE) is None
+        await cache.put(Language.PYTHON, "1", CODE, parsed())
+        return await cache.get(Language.PYTHON, "1", CODE)
+
+    functions = asyncio.run(run())
+    assert functions == parsed()
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+
+
+def test_parser_version_is_part_of_key():
+    assert ParseCache.make_key(Language.PYTHON, "1", CODE) != ParseCache.make_key(Language.PYTHON, "2", CODE)
+    assert ParseCache.make_key(Language.PYTHON, "1", CODE) != ParseCache.make_key(Language.JAVA, "1", CODE)
+
+
+def test_memory_tier_evicts_by_size():
+    cache = ParseCache(ParseCacheConfig(memory_max_bytes=1500))
+
+    async def run():
+        for i in range(5):
+            await cache.put(Language.PYTHON, "1", CODE + "#" * i, parsed())
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 1500
+    assert stats["memory_evictions"] > 0
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    config = ParseCacheConfig(disk_path=str(tmp_path / "cache.sqlite"))
+    first = ParseCache(config)
+    asyncio.run(first.put(Language.PYTHON, "1", CODE, parsed()))
+    first.close()
+
+    second = ParseCache(config)
+    functions = asyncio.run(second.get(Language.PYTHON, "1", CODE))
+    second.close()
+    assert functions == parsed()
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_disabled_cache_never_stores():
+    cache = ParseCache(ParseCacheConfig(enabled=False))
+
+    async def run():
+        await cache.put(Language.PYTHON, "1", CODE, parsed())
+        return await cache.get(Language.PYTHON, "1", CODE)
+
+    assert asyncio.run(run()) is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_projection_is_cached_separately_and_full_result_serves_it():
+    cache = ParseCache(ParseCacheConfig())
+    fields = ["name", "start_line"]
+
+    async def run():
+        await cache.put(Language.PYTHON, "1", CODE, [fd.project(fields) for fd in parsed()], fields)
+        assert await cache.get(Language.PYTHON, "1", CODE) is None
+        projected = await cache.get(Language.PYTHON, "1", CODE, fields)
+        await cache.put(Language.PYTHON, "1", CODE, parsed())
+        return projected, await cache.get(Language.PYTHON, "1", CODE, ["name"])
+
+    projected, full = asyncio.run(run())
+    assert [fd.to_dict() for fd in projected] == [fd.project(fields).to_dict() for fd in parsed()]
+    assert full == parsed()
+
+
+def test_cached_methods_share_class_description():
+    cache = ParseCache(ParseCacheConfig())
+    code = "class A:\n    \"\"\"Doc.\"\"\"\n\n    def f(self):\n        pass\n\n    def g(self):\n        pass\n"
+
+    async def run():
+        await cache.put(Language.PYTHON, "1", code, PythonParser().parse_content(code))
+        return await cache.get(Language.PYTHON, "1", code)
+
+    f, g = asyncio.run(run())
+    assert f.class_info is g.class_info
+    assert (f.class_name, f.class_description, f.class_info.end_line) == ("A", "Doc.", 8)
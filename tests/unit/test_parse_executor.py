@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from src.config import ParseExecutorConfig
+from src.core.parse_executor import ParseExecutor
+from src.models import Language
+
+
+def python_source(functions: int) -> str:
+    return "".join(f"def f{i}(a, b):\n    return a + b\n\n" for i in range(functions))
+
+
+def run_parse(config: ParseExecutorConfig, content: str):
+    executor = ParseExecutor(config)
+
+    async def run():
+        await executor.start()
+        try:
+            return await executor.parse(Language.PYTHON, content)
+        finally:
+            await executor.close()
+
+    return executor, asyncio.run(run())
+
+
+def test_small_input_parsed_inline():
+    executor, functions = run_parse(ParseExecutorConfig(mode="thread"), python_source(1))
+    assert [f.name for f in functions] == ["f0"]
+    assert executor.stats()["completed_inline"] == 1
+
+
+def test_medium_input_parsed_in_thread_pool():
+    config = ParseExecutorConfig(mode="process", inline_threshold=10, thread_threshold=10**6)
+    executor, functions = run_parse(config, python_source(50))
+    assert len(functions) == 50
+    stats = executor.stats()
+    assert stats["completed_thread"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_large_input_parsed_in_process_pool():
+    config = ParseExecutorConfig(mode="process", max_workers=1, inline_threshold=10, thread_threshold=100)
+    executor, functions = run_parse(config, python_source(50))
+    assert len(functions) == 50
+    assert functions[-1].name == "f49"
+    assert executor.stats()["completed_process"] == 1
+
+
+def test_inline_mode_never_offloads():
+    config = ParseExecutorConfig(mode="inline", inline_threshold=0)
+    executor, functions = run_parse(config, python_source(3))
+    assert len(functions) == 3
+    assert executor.stats()["completed_inline"] == 1
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        ParseExecutor(ParseExecutorConfig(mode="gpu"))
+
+
+def test_process_pool_returns_projected_functions():
+    config = ParseExecutorConfig(mode="process", max_workers=1, inline_threshold=10, thread_threshold=100)
+    executor = ParseExecutor(config)
+
+    async def run():
+        await executor.start()
+        try:
+            return await executor.parse(Language.PYTHON, python_source(50), ["name", "end_line"])
+        finally:
+            await executor.close()
+
+    functions = asyncio.run(run())
+    assert functions[-1].to_dict(["name", "end_line"]) == {"name": "f49", "end_line": 149}
+    assert functions[-1].full_function_text is None
+    assert functions[-1].signature_text == ""
@@ -1,5 +1,8 @@
+import threading
+
 import pytest
 
+from src.config import ParserFactoryConfig, PythonParserConfig
 from src.core.language_detector import Language
 from src.core.parser_factory import ParserFactory
 from src.parsers.python_parser import PythonParser
@@ -18,6 +21,43 @@ def test_factory_returns_python_parser(factory):
     assert isinstance(parser, JavaParser)
 
 
-def test_factory_unsupported_language_raises(factory):
+def test_factory_unsupported_language_raises(factory, monkeypatch):
+    monkeypatch.delitem(ParserFactory._registry, Language.C)
+    with pytest.raises(NotImplementedError):
+        factory.get_parser(Language.C)
+
+
+def test_factory_missing_dependency_raises(factory, monkeypatch):
+    monkeypatch.setitem(ParserFactory._registry, Language.C, "src.parsers.missing_parser:MissingParser")
     with pytest.raises(NotImplementedError):
-        factory.get_parser(Language.JAVASCRIPT)
+        factory.get_parser(Language.C)
+
+
+def test_factory_reuses_parser_instances(factory):
+    assert factory.get_parser(Language.PYTHON) is factory.get_parser(Language.PYTHON)
+
+
+def test_factory_thread_unsafe_parser_per_thread(factory, monkeypatch):
+    monkeypatch.setattr(PythonParser, "THREAD_SAFE", False)
+    main = factory.get_parser(Language.PYTHON)
+    other = []
+    thread = threading.Thread(target=lambda: other.append(factory.get_parser(Language.PYTHON)))
+    thread.start()
+    thread.join()
+
+    assert factory.get_parser(Language.PYTHON) is main
+    assert other[0] is not main
+
+
+def test_factory_warm_up_selected_languages(monkeypatch):
+    monkeypatch.delitem(ParserFactory._registry, Language.C)
+    factory = ParserFactory(ParserFactoryConfig(prewarm_languages=["python"]))
+    assert factory.warm_up() == [Language.PYTHON]
+    assert factory.warm_up([Language.JAVA, Language.C]) == [Language.JAVA]
+
+
+def test_factory_passes_parser_config():
+    factory = ParserFactory(ParserFactoryConfig(python=PythonParserConfig(scope="all", max_depth=1)))
+    parser = factory.get_parser(Language.PYTHON)
+    assert parser.config.scope == "all"
+    assert parser.VERSION != PythonParser.VERSION
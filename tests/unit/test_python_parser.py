@@ -1,4 +1,5 @@
 import pytest
+from src.config import PythonParserConfig
 from src.parsers.python_parser import PythonParser
 
 
@@ -62,6 +63,8 @@ def    f  ( a : int , b )  ->  int  :
     assert fd.qualified_name == "f"
     assert fd.start_line == 1
     assert fd.end_line == 2
+    assert fd.start_column == 0
+    assert fd.end_column == 12
     assert fd.docstring == None
     assert fd.docstring_lines_length == 0
     assert "def f(a: int, b) -> int:" in fd.signature_text
@@ -97,3 +100,211 @@ class A:
     assert fd.class_name == "A"
     assert fd.class_description == "class doc"
     assert fd.is_constructor is True
+
+
+def test_syntax_error_recovers_other_functions(parser):
+    code = '''\
+import os
+
+def ok(a):
+    return a
+
+def broken(x y):
+    pass
+
+<<<<<<< HEAD
+@dec
+def after():
+    print "py2"
+=======
+def after():
+    return 2
+>>>>>>> branch
+'''
+    res = parser.parse_content(code)
+    assert [(fd.name, fd.start_line) for fd in res] == [("ok", 3), ("broken", 6), ("after", 11), ("after", 14)]
+    assert res[0].parse_error is None and res[3].parse_error is None
+    assert res[0].full_function_text == "def ok(a):\n    return a\n"
+    assert res[1].parse_error.endswith("(line 6)")
+    assert res[1].full_function_text == "def broken(x y):\n    pass\n"
+    assert res[2].parse_error is not None
+    assert res[2].signature_text == "def after():"
+
+
+def test_syntax_error_in_method_keeps_class_methods(parser):
+    code = '''\
+class A:
+    """class doc"""
+
+    def good(self, x: int) -> int:
+        return x
+
+    async def bad(self):
+        return [
+
+    class Inner:
+        def deep(self):
+            pass
+'''
+    res = parser.parse_content(code)
+    assert [fd.qualified_name for fd in res] == ["A.good", "A.bad", "A.Inner.deep"]
+    good, bad, deep = res
+    assert good.parse_error is None
+    assert good.signature_text == "def good(self, x: int) -> int:"
+    assert good.class_description == "class doc"
+    assert bad.parse_error is not None
+    assert bad.is_method and bad.class_description == "class doc"
+    assert bad.modifiers == ["async"]
+    assert (bad.start_line, bad.start_column) == (7, 4)
+    assert deep.parse_error is None
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("def ok():\n    pass\n\nclass\n    def m(self):\n        pass\n    def n(self) pass\n", ["ok"]),
+    ("class :\n    def m(self):\n        pass\n\ndef ok():\n    pass\n", ["ok"]),
+    ("class A:\n    def\n    def m(self):\n        pass\n    def n(self) pass\n", ["A.m", "A.n"]),
+])
+def test_syntax_error_skips_headers_without_name(parser, code, expected):
+    res = parser.parse_content(code)
+    assert [fd.qualified_name for fd in res] == expected
+    assert all(fd.name for fd in res)
+
+
+def test_annotations_and_decorators_are_sliced_from_source(parser):
+    code = '''\
+@app.route("/x",methods=["GET"])
+def f(a: Dict[str,int], *rest: 'Name') -> "Out":
+    """doc"""
+    return a
+'''
+    fd = parser.parse_content(code)[0]
+    assert fd.decorators == ['app.route("/x",methods=["GET"])']
+    assert fd.parameters == ["a: Dict[str,int]", "*rest: 'Name'"]
+    assert fd.return_type == '"Out"'
+    assert fd.signature_text == '@app.route("/x",methods=["GET"])\ndef f(a: Dict[str,int], *rest: \'Name\') -> "Out":'
+    assert fd.function_text == "def f(a: Dict[str,int], *rest: 'Name') -> \"Out\":\n    return a\n"
+
+
+NESTED = '''\
+class A:
+    key = lambda self, x: x
+
+    class Inner:
+        def deep(self):
+            pass
+
+
+def outer(a):
+    def inner(b):
+        def innermost():
+            pass
+        return b
+
+    class Local:
+        """Local doc."""
+        def m(self):
+            pass
+
+    if a:
+        async def branch():
+            pass
+    square = lambda v: v * v
+    return inner
+'''
+
+
+def test_default_scope_skips_nested_functions(parser):
+    res = parser.parse_content(NESTED)
+    assert [fd.qualified_name for fd in res] == ["A.Inner.deep", "outer"]
+    assert res[0].class_name == "Inner"
+
+
+def test_all_scope_emits_nested_functions_with_qualified_names():
+    res = PythonParser(PythonParserConfig(scope="all", lambdas=True)).parse_content(NESTED)
+    assert [fd.qualified_name for fd in res] == [
+        "A.key",
+        "A.Inner.deep",
+        "outer",
+        "outer.<locals>.inner",
+        "outer.<locals>.inner.<locals>.innermost",
+        "outer.<locals>.Local.m",
+        "outer.<locals>.branch",
+        "outer.<locals>.square",
+    ]
+    by_name = {fd.qualified_name: fd for fd in res}
+    assert by_name["outer.<locals>.inner"].is_method is False
+    assert by_name["outer.<locals>.Local.m"].class_description == "Local doc."
+    lam = by_name["outer.<locals>.square"]
+    assert lam.modifiers == ["lambda"]
+    assert lam.parameters == ["v"]
+    assert lam.signature_text == "square = lambda v:"
+    assert lam.full_function_text == "    square = lambda v: v * v\n"
+
+
+def test_all_scope_max_depth():
+    res = PythonParser(PythonParserConfig(scope="all", max_depth=1)).parse_content(NESTED)
+    names = [fd.qualified_name for fd in res]
+    assert "outer.<locals>.inner" in names and "outer.<locals>.Local.m" in names
+    assert "outer.<locals>.inner.<locals>.innermost" not in names
+
+
+PROJECTED = '''\
+class A:
+    """Class doc."""
+
+    @staticmethod
+    def m(a: int) -> int:
+        """Method doc."""
+        return a
+'''
+
+
+def test_extract_projects_fields_without_computing_the_rest(parser):
+    fd = parser.extract(PROJECTED, ["name", "signature_text"])[0]
+    assert fd.to_dict(["signature_text", "name"]) == {
+        "name": "m",
+        "signature_text": "@staticmethod\ndef m(a: int) -> int:",
+    }
+    # Неотобранные поля — значения по умолчанию
+    assert fd.docstring is None
+    assert fd.class_description is None
+    assert fd.full_function_text is None
+    assert fd.start_line == -1
+    assert fd.parameters == []
+
+
+def test_projection_drops_unresolved_deferred_fields(parser):
+    from src.models.function_description import Deferred, FunctionDescription
+
+    full = parser.parse_content(PROJECTED)[0]
+    raw = FunctionDescription.docstring.raw(full)
+    assert isinstance(raw, Deferred)
+    projected = full.project(["name", "start_line"])
+    assert projected.to_dict(["name", "start_line"]) == {"name": "m", "start_line": 5}
+    # docstring так и не вычислен
+    assert raw.func is not None
+    assert full.docstring == "Method doc."
+    assert raw.func is None
+
+
+def test_normalized_form_lists_each_class_once(parser):
+    from src.models.function_description import from_normalized, to_normalized
+
+    code = PROJECTED + "\n    def n(self):\n        pass\n\n\ndef free():\n    pass\n"
+    functions = parser.parse_content(code)
+    assert functions[0].class_info is functions[1].class_info
+
+    data = to_normalized(functions)
+    assert data["scopes"] == [
+        {"id": 0, "kind": "class", "name": "A", "docstring": "Class doc.", "start_line": 1, "end_line": 10},
+    ]
+    assert [(f["name"], f["class_id"]) for f in data["functions"]] == [("m", 0), ("n", 0), ("free", None)]
+    assert "class_description" not in data["functions"][0]
+
+    restored = from_normalized(data)
+    assert [fd.to_dict() for fd in restored] == [fd.to_dict() for fd in functions]
+    assert restored[0].class_info is restored[1].class_info
+
+    # Без class_description в таблице нет комментариев, и они не вычисляются
+    projected = to_normalized(parser.extract(code, ["name", "class_name"]), ["name", "class_name"])
+    assert projected["scopes"] == [{"id": 0, "kind": "class", "name": "A", "start_line": 1, "end_line": 10}]
@@ -0,0 +1,108 @@
+import gzip
+import json
+
+import pytest
+
+from src.config import ResponseConfig
+from src.core import response_formats
+from src.core.response_formats import (
+    ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, PARQUET_MEDIA_TYPE,
+    NotAcceptableError, ResponseEncoder, dumps, function_columns, negotiate,
+)
+
+RESULTS = [
+    {
+        "file": "a.py", "language": "python", "content_hash": "h1", "count": 2,
+        "functions": [
+            {"language": "python", "name": "f", "start_line": 1, "parameters": ["x"], "is_method": False},
+            {"language": "python", "name": "m", "start_line": 4, "parameters": [], "is_method": True},
+        ],
+    },
+    {"file": "b.py", "language": "python", "error": "Parse error: boom"},
+    {"file": "c.py", "language": "python", "content_hash": "h3", "count": 0, "functions": []},
+]
+
+
+def test_negotiate_defaults_to_json():
+    assert negotiate(None) == JSON_MEDIA_TYPE
+    assert negotiate("*/*") == JSON_MEDIA_TYPE
+    assert negotiate("text/html") == JSON_MEDIA_TYPE
+    assert negotiate("application/json;q=0.5, application/msgpack;q=0") == JSON_MEDIA_TYPE
+
+
+def test_negotiate_unavailable_format(monkeypatch):
+    monkeypatch.setattr(response_formats, "msgpack", None)
+    monkeypatch.setattr(response_formats, "pyarrow", None)
+    with pytest.raises(NotAcceptableError):
+        negotiate("application/x-msgpack")
+    assert negotiate("application/vnd.apache.parquet, application/json;q=0.1") == JSON_MEDIA_TYPE
+
+
+def test_negotiate_prefers_higher_quality(monkeypatch):
+    monkeypatch.setattr(response_formats, "msgpack", object())
+    assert negotiate("application/json;q=0.5, application/msgpack") == MSGPACK_MEDIA_TYPE
+    assert negotiate("application/json, application/msgpack") == JSON_MEDIA_TYPE
+
+
+def test_dumps_matches_json():
+    obj = {"results": [{"file": "ü.py", "functions": [{"parameters": ["a: int"], "x": None}]}]}
+    assert json.loads(dumps(obj)) == obj
+    # Одиночный суррогат экранируется, а не роняет сериализацию
+    assert json.loads(dumps({"s": "\ud800"})) == {"s": "\ud800"}
+
+
+def test_function_columns_row_per_function():
+    columns = function_columns(RESULTS)
+    assert list(columns) == [
+        "file", "language", "content_hash", "error", "name", "parameters", "start_line", "is_method",
+    ]
+    assert columns["file"] == ["a.py", "a.py", "b.py", "c.py"]
+    assert columns["name"] == ["f", "m", None, None]
+    assert columns["error"] == [None, None, "Parse error: boom", None]
+    assert columns["parameters"] == [["x"], [], None, None]
+
+
+def test_compress_gzip_and_threshold():
+    encoder = ResponseEncoder(ResponseConfig(compress_min_bytes=100))
+    body = dumps({"results": RESULTS}) * 4
+
+    compressed, encoding = encoder.compress(body, "br;q=1, gzip;q=0.5")
+    assert encoding == "gzip"
+    assert gzip.decompress(compressed) == body
+
+    assert encoder.compress(body, "identity") == (body, None)
+    assert encoder.compress(body, "gzip;q=0") == (body, None)
+    assert encoder.compress(body[:50], "gzip") == (body[:50], None)
+
+
+def test_compress_zstd():
+    zstandard = pytest.importorskip("zstandard")
+    encoder = ResponseEncoder(ResponseConfig(compress_min_bytes=0))
+    body = dumps({"results": RESULTS})
+    compressed, encoding = encoder.compress(body, "zstd, gzip")
+    assert encoding == "zstd"
+    assert zstandard.ZstdDecompressor().decompress(compressed, max_output_size=len(body)) == body
+
+
+def test_encode_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    body = ResponseEncoder().encode(MSGPACK_MEDIA_TYPE, RESULTS)
+    assert msgpack.unpackb(body) == {"results": RESULTS}
+
+
+def test_encode_arrow_and_parquet():
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    encoder = ResponseEncoder(ResponseConfig(arrow_batch_rows=2))
+    table = pyarrow.ipc.open_stream(encoder.encode(ARROW_MEDIA_TYPE, RESULTS)).read_all()
+    assert table.num_rows == 4
+    assert table.schema.field("start_line").type == pyarrow.int64()
+    assert table.schema.field("is_method").type == pyarrow.bool_()
+    assert pyarrow.types.is_dictionary(table.schema.field("file").type)
+    assert table.column("name").to_pylist() == ["f", "m", None, None]
+
+    body = encoder.encode(PARQUET_MEDIA_TYPE, RESULTS)
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(body))
+    assert table.column("parameters").to_pylist() == [["x"], [], None, None]
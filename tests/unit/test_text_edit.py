@@ -0,0 +1,58 @@
+import difflib
+
+import pytest
+
+from src.utils.text_edit import DiffError, apply_unified_diff, compute_edit
+
+OLD = "a = 1\ndef f():\n    return 1\n\nb = 2\n"
+
+
+def test_compute_edit_is_line_aligned():
+    new = OLD.replace("return 1", "return 42")
+    edit = compute_edit(OLD, new)
+    assert (edit.start, edit.start_line) == (OLD.index("    return"), 3)
+    assert OLD[edit.start:edit.old_end] == "    return 1\n"
+    assert new[edit.start:edit.new_end] == "    return 42\n"
+    assert (edit.old_end_line, edit.new_end_line, edit.line_delta) == (3, 3, 0)
+    assert edit.char_delta == 1
+
+
+def test_compute_edit_insert_and_delete_lines():
+    inserted = compute_edit(OLD, OLD.replace("b = 2\n", "c = 3\nb = 2\n"))
+    assert inserted.old_end == inserted.start         # строки только вставлены
+    assert (inserted.start_line, inserted.old_end_line, inserted.new_end_line) == (5, 4, 5)
+    assert inserted.line_delta == 1
+
+    deleted = compute_edit(OLD, OLD.replace("\nb = 2\n", "b = 2\n"))
+    assert deleted.line_delta == -1
+    assert compute_edit(OLD, OLD) is None
+
+
+def test_compute_edit_without_trailing_newline():
+    edit = compute_edit("x = 1\ny = 2", "x = 1\ny = 3")
+    assert (edit.start, edit.old_end, edit.new_end) == (6, 11, 11)
+    assert edit.line_delta == 0
+
+
+def test_apply_unified_diff_roundtrip():
+    new = OLD.replace("return 1", "return 42").replace("b = 2\n", "b = 2\nc = 3\n")
+    diff = "".join(difflib.unified_diff(
+        OLD.splitlines(keepends=True), new.splitlines(keepends=True), "a/x.py", "b/x.py", n=1
+    ))
+    assert apply_unified_diff(OLD, diff) == new
+
+
+def test_apply_unified_diff_no_newline_marker():
+    diff = (
+        "--- a/x.py\n+++ b/x.py\n"
+        "@@ -1,2 +1,2 @@\n x = 1\n-y = 2\n\\ No newline at end of file\n+y = 3\n\\ No newline at end of file\n"
+    )
+    assert apply_unified_diff("x = 1\ny = 2", diff) == "x = 1\ny = 3"
+
+
+def test_apply_unified_diff_rejects_mismatched_context():
+    diff = "@@ -1,2 +1,2 @@\n a = 1\n-def g():\n+def h():\n"
+    with pytest.raises(DiffError):
+        apply_unified_diff(OLD, diff)
+    with pytest.raises(DiffError):
+        apply_unified_diff(OLD, "not a diff")